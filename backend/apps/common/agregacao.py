@@ -0,0 +1,133 @@
+"""Agregacoes (``GROUP BY``) sob demanda para a API.
+
+``GET /api/<modulo>/agregado/?group_by=modalidade,ano&metrics=sum:valor,count``
+devolve um total por grupo, calculado em uma unica consulta. Os modelos
+declaram o que pode ser agrupado (``AGGREGATE_DIMENSIONS``) e somado
+(``AGGREGATE_MEASURES``); qualquer outro campo e recusado com ``400``.
+
+Parametros:
+
+- ``group_by``: dimensoes separadas por virgula (vazio: um unico total);
+- ``metrics``: ``count`` e ``sum|avg|min|max:<medida>`` (padrao ``count``);
+- ``<dimensao>=<valor>``: filtro exato pela dimensao (booleanos como nas
+  listagens: ``true``/``false``, ``True``/``False`` ou ``1``/``0``);
+- ``ordering``: coluna do resultado, com ``-`` para decrescente;
+- ``modelo``: nos modulos com mais de um modelo agregavel.
+
+O resultado fica em cache pela versao dos dados (``bloco_em_cache``).
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Avg, BooleanField, Count, DecimalField, Max, Min, Sum
+from django_filters import BooleanFilter
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import bloco_em_cache
+
+FUNCOES = {"sum": Sum, "avg": Avg, "min": Min, "max": Max}
+# Mesmo campo do ``BooleanFilter`` do django-filter usado nas listagens.
+BOOLEANO = BooleanFilter().field
+
+
+def _lista(valor: str) -> list[str]:
+    return list(dict.fromkeys(p.strip() for p in valor.split(",") if p.strip()))
+
+
+def _metricas(model, valor: str) -> dict:
+    """Coluna do resultado -> agregacao (``sum:valor`` -> ``sum_valor``)."""
+    metricas = {}
+    for metrica in _lista(valor) or ["count"]:
+        if metrica == "count":
+            metricas["count"] = Count("pk")
+            continue
+        funcao, _, campo = metrica.partition(":")
+        if funcao not in FUNCOES or campo not in model.AGGREGATE_MEASURES:
+            raise ValidationError({"metrics": f"Metrica invalida: {metrica}."})
+        metricas[f"{funcao}_{campo}"] = FUNCOES[funcao](campo)
+    return metricas
+
+
+def _filtros(model, params) -> dict:
+    filtros = {}
+    for dimensao in model.AGGREGATE_DIMENSIONS:
+        if dimensao in params:
+            campo = model._meta.get_field(dimensao)
+            if isinstance(campo, BooleanField):
+                valor = BOOLEANO.clean(params[dimensao])
+                if valor is not None:
+                    filtros[dimensao] = valor
+                continue
+            try:
+                filtros[dimensao] = campo.to_python(params[dimensao])
+            except DjangoValidationError as exc:
+                raise ValidationError({dimensao: exc.messages}) from exc
+    return filtros
+
+
+def _formatadores(model, metricas) -> dict:
+    # Medidas decimais saem como string, igual as listagens.
+    formatadores = {}
+    for coluna, agregacao in metricas.items():
+        if coluna == "count":
+            continue
+        campo = model._meta.get_field(agregacao.get_source_expressions()[0].name)
+        if isinstance(campo, DecimalField):
+            formatadores[coluna] = serializers.DecimalField(
+                max_digits=None, decimal_places=campo.decimal_places
+            ).to_representation
+    return formatadores
+
+
+def agregar(model, params) -> list[dict]:
+    """Linhas ``{dimensao..., metrica...}`` para os ``params`` da requisicao."""
+    dimensoes = _lista(params.get("group_by", ""))
+    invalidas = [d for d in dimensoes if d not in model.AGGREGATE_DIMENSIONS]
+    if invalidas:
+        raise ValidationError(
+            {"group_by": f"Dimensoes invalidas: {', '.join(invalidas)}."}
+        )
+    metricas = _metricas(model, params.get("metrics", ""))
+    queryset = model.objects.filter(**_filtros(model, params))
+
+    if dimensoes:
+        ordering = params.get("ordering", "")
+        if ordering.lstrip("-") not in (*dimensoes, *metricas):
+            ordering = None
+        linhas = list(
+            queryset.values(*dimensoes)
+            .annotate(**metricas)
+            .order_by(*filter(None, [ordering]), *dimensoes)
+        )
+    else:
+        linhas = [queryset.aggregate(**metricas)]
+
+    formatadores = _formatadores(model, metricas)
+    for linha in linhas:
+        for coluna, formatar in formatadores.items():
+            if linha[coluna] is not None:
+                linha[coluna] = formatar(linha[coluna])
+    return linhas
+
+
+class AgregadoAPIView(APIView):
+    """Endpoint ``agregado/`` de um modulo; ``modelos``: nome -> modelo."""
+
+    modelos = {}
+
+    def get(self, request):
+        nome = request.query_params.get("modelo") or next(iter(self.modelos))
+        model = self.modelos.get(nome)
+        if model is None:
+            opcoes = ", ".join(self.modelos)
+            raise ValidationError({"modelo": f"Use um de: {opcoes}."})
+        params = request.query_params
+        linhas = bloco_em_cache(
+            f"agregado:{model._meta.label_lower}",
+            params,
+            lambda: agregar(model, params),
+            ignorar=("modelo", "format"),
+        )
+        return Response({"modelo": nome, "results": linhas})
@@ -0,0 +1,56 @@
+"""Automato de Aho-Corasick para busca de varios padroes de uma vez."""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Acha todos os ``padroes`` contidos em um texto em uma unica passada.
+
+    O custo de ``encontrar`` e linear no tamanho do texto mais o numero de
+    ocorrencias, independente de quantos padroes existem.
+    """
+
+    def __init__(self, padroes):
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saida = [frozenset()]
+        for padrao in padroes:
+            if padrao:
+                self._inserir(padrao)
+        self._ligar_falhas()
+
+    def _inserir(self, padrao):
+        estado = 0
+        for ch in padrao:
+            proximo = self._transicoes[estado].get(ch)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saida.append(frozenset())
+                self._transicoes[estado][ch] = proximo
+            estado = proximo
+        self._saida[estado] = self._saida[estado] | {padrao}
+
+    def _ligar_falhas(self):
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for ch, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and ch not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                self._falha[proximo] = self._transicoes[falha].get(ch, 0)
+                self._saida[proximo] |= self._saida[self._falha[proximo]]
+
+    def encontrar(self, texto: str) -> set:
+        """Padroes que aparecem em ``texto``."""
+        achados = set()
+        estado = 0
+        for ch in texto:
+            while estado and ch not in self._transicoes[estado]:
+                estado = self._falha[estado]
+            estado = self._transicoes[estado].get(ch, 0)
+            achados |= self._saida[estado]
+        return achados
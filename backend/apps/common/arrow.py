@@ -0,0 +1,89 @@
+"""Exportacao em Arrow IPC e Parquet com colunas tipadas.
+
+``pyarrow`` vem em ``requirements.txt``; num ambiente sem ele
+``disponivel()`` e falso e as exportacoes colunares respondem ``406`` (CSV e
+NDJSON seguem funcionando). Os tipos
+saem dos campos do modelo: ``decimal128`` para dinheiro, ``date32`` para
+datas e ``timestamp`` em UTC para data e hora.
+"""
+
+import io
+from itertools import islice
+
+from django.db import models
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - ambiente sem pyarrow
+    pa = pq = None
+
+
+def disponivel() -> bool:
+    return pa is not None
+
+
+def _tipo(campo):
+    if isinstance(campo, models.ForeignKey):
+        campo = campo.target_field
+    if isinstance(campo, models.DecimalField):
+        return pa.decimal128(campo.max_digits, campo.decimal_places)
+    if isinstance(campo, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(campo, models.DateField):
+        return pa.date32()
+    if isinstance(campo, (models.IntegerField, models.AutoField)):
+        return pa.int64()
+    if isinstance(campo, models.FloatField):
+        return pa.float64()
+    if isinstance(campo, models.BooleanField):
+        return pa.bool_()
+    return pa.string()
+
+
+def schema(campos: dict):
+    """``campos``: coluna -> campo do modelo (ou ``output_field``)."""
+    return pa.schema([(coluna, _tipo(campo)) for coluna, campo in campos.items()])
+
+
+def _lote(linhas, esquema):
+    arrays = []
+    for valores, campo in zip(zip(*linhas, strict=True), esquema, strict=True):
+        if pa.types.is_string(campo.type):
+            valores = [None if v is None else str(v) for v in valores]
+        arrays.append(pa.array(valores, type=campo.type))
+    return pa.record_batch(arrays, schema=esquema)
+
+
+def _lotes(linhas, esquema, tamanho):
+    linhas = iter(linhas)
+    while lote := list(islice(linhas, tamanho)):
+        yield _lote(lote, esquema)
+
+
+def _gravar(abrir, linhas, esquema, tamanho):
+    # Cada lote vai para o buffer e e entregue logo em seguida; os dois
+    # formatos so acrescentam bytes, entao o buffer nunca volta atras.
+    buffer = io.BytesIO()
+
+    def drenar():
+        dados = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return dados
+
+    with abrir(buffer, esquema) as writer:
+        for lote in _lotes(linhas, esquema, tamanho):
+            writer.write_batch(lote)
+            yield drenar()
+    yield drenar()
+
+
+def arrow_stream(linhas, esquema, tamanho):
+    """Bytes de um stream Arrow IPC, um record batch por lote de ``linhas``."""
+    return _gravar(pa.ipc.new_stream, linhas, esquema, tamanho)
+
+
+def parquet(linhas, esquema, tamanho):
+    """Bytes de um arquivo Parquet, um row group por lote de ``linhas``."""
+    return _gravar(pq.ParquetWriter, linhas, esquema, tamanho)
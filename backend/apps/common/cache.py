@@ -0,0 +1,180 @@
+"""Cache de paginas e blocos versionado pela ultima atualizacao dos dados.
+
+Os dados so mudam quando uma carga termina. A versao e o instante da ultima
+atualizacao: o maior ``finalizado_em`` de ``SyncRun`` com sucesso ou o maior
+``calculado_em`` dos ``KpiSnapshot`` (recalculados tambem pelo monitoramento).
+Ela entra em todas as chaves, entao uma carga nova invalida tudo sem depender
+de TTL; o timeout so serve para descartar chaves antigas.
+
+A versao fica no proprio cache e e publicada por ``finalizar_execucao`` e
+``recalcular_kpis``. Com cache local (sem Redis) cada processo a rele do
+banco a cada ``WEB_CACHE_VERSAO_TTL`` segundos.
+
+A mesma versao gera ``ETag``/``Last-Modified`` (``GetCondicionalMixin``):
+``GET`` condicional com a versao atual recebe ``304`` antes de qualquer
+consulta ou template. Chaves e ``ETag`` tambem levam o identificador do
+deploy (``WEB_CACHE_BUILD``), entao um deploy novo nao serve o HTML nem
+responde ``304`` com o conteudo anterior.
+"""
+
+import hashlib
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from apps.ingestao.models import SyncRun
+from apps.monitoramento.models import KpiSnapshot
+
+CHAVE_VERSAO = "dados:versao"
+PARAMETROS_PAGINACAO = ("page", "cursor")
+
+
+def _ultima_atualizacao_no_banco() -> datetime | None:
+    momentos = [
+        SyncRun.objects.filter(status="sucesso").aggregate(ultimo=Max("finalizado_em"))[
+            "ultimo"
+        ],
+        KpiSnapshot.objects.aggregate(ultimo=Max("calculado_em"))["ultimo"],
+    ]
+    return max((m for m in momentos if m is not None), default=None)
+
+
+def ultima_atualizacao() -> datetime | None:
+    """Instante da ultima atualizacao dos dados (``None`` sem nenhuma carga)."""
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        versao = _ultima_atualizacao_no_banco() or ""
+        cache.set(CHAVE_VERSAO, versao, settings.WEB_CACHE_VERSAO_TTL)
+    return versao or None
+
+
+def publicar_atualizacao(momento: datetime):
+    """Avanca a versao dos dados para ``momento`` (nunca volta).
+
+    Dentro de uma transacao, so publica apos o commit: antes disso uma
+    requisicao ainda le os dados antigos e os guardaria na versao nova.
+    """
+
+    def publicar():
+        atual = cache.get(CHAVE_VERSAO)
+        if not atual or momento > atual:
+            cache.set(CHAVE_VERSAO, momento, settings.WEB_CACHE_VERSAO_TTL)
+
+    transaction.on_commit(publicar)
+
+
+def versao_dados() -> str:
+    momento = ultima_atualizacao()
+    return momento.isoformat() if momento else "0"
+
+
+def normalizar_query(params, ignorar=()) -> str:
+    """Query string canonica: chaves ordenadas, sem valores vazios.
+
+    ``cursor`` vazio fica: ele liga a paginacao por chave na primeira pagina.
+    """
+    itens = sorted(
+        (chave, valor.strip())
+        for chave in params
+        if chave not in ignorar
+        for valor in params.getlist(chave)
+        if valor.strip() or chave == "cursor"
+    )
+    return urlencode(itens)
+
+
+def chave_cache(tipo: str, nome: str, params, ignorar=()) -> str:
+    query = normalizar_query(params, ignorar)
+    resumo = hashlib.sha1(f"{nome}?{query}".encode()).hexdigest()
+    return f"web:{tipo}:{settings.WEB_CACHE_BUILD}:{versao_dados()}:{resumo}"
+
+
+def bloco_em_cache(nome: str, params, calcular, ignorar=PARAMETROS_PAGINACAO):
+    """Resultado de ``calcular()`` em cache por ``params`` e versao dos dados.
+
+    Por padrao a paginacao nao entra na chave, entao todas as paginas de um
+    mesmo filtro reaproveitam o bloco.
+    """
+    if not settings.WEB_CACHE_ENABLED:
+        return calcular()
+    chave = chave_cache("bloco", nome, params, ignorar)
+    valor = cache.get(chave)
+    if valor is None:
+        valor = calcular()
+        cache.set(chave, valor, settings.WEB_CACHE_TIMEOUT)
+    return valor
+
+
+class PaginaEmCacheMixin:
+    """Guarda o HTML renderizado de ``GET`` por caminho, query e versao."""
+
+    def get(self, request, *args, **kwargs):
+        if not settings.WEB_CACHE_ENABLED:
+            return super().get(request, *args, **kwargs)
+        chave = chave_cache("pagina", request.path, request.GET)
+        guardada = cache.get(chave)
+        if guardada is not None:
+            conteudo, content_type = guardada
+            return HttpResponse(conteudo, content_type=content_type)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+
+            def guardar(renderizada):
+                cache.set(
+                    chave,
+                    (renderizada.content, renderizada["Content-Type"]),
+                    settings.WEB_CACHE_TIMEOUT,
+                )
+
+            response.add_post_render_callback(guardar)
+        return response
+
+
+def etag(request, versao: datetime) -> str:
+    """ETag de ``request``: caminho, query, ``Accept``, versao e deploy."""
+    partes = (
+        request.path,
+        normalizar_query(request.GET),
+        request.headers.get("Accept", ""),
+        versao.isoformat(),
+        settings.WEB_CACHE_BUILD,
+    )
+    return quote_etag(hashlib.sha1("\n".join(partes).encode()).hexdigest())
+
+
+class GetCondicionalMixin:
+    """``GET`` condicional (``ETag``/``Last-Modified``) pela versao dos dados.
+
+    Nas views DRF o ``get`` roda depois da autenticacao e das permissoes,
+    entao o ``304`` nunca pula essas checagens. Sem nenhuma carga registrada
+    (ou com ``WEB_CACHE_ENABLED`` desligado) a view responde normalmente.
+    """
+
+    def get(self, request, *args, **kwargs):
+        versao = ultima_atualizacao() if settings.WEB_CACHE_ENABLED else None
+        if versao is None:
+            return super().get(request, *args, **kwargs)
+        cabecalhos = {
+            "ETag": etag(request, versao),
+            "Last-Modified": http_date(versao.timestamp()),
+        }
+        response = get_conditional_response(
+            request,
+            etag=cabecalhos["ETag"],
+            last_modified=int(versao.timestamp()),
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        for nome, valor in cabecalhos.items():
+            response[nome] = valor
+        return response
@@ -1,25 +1,130 @@
+"""Exportacao das listagens da API em streaming (``?export=``).
+
+Formatos: ``csv`` (``;``), ``ndjson`` e, com ``pyarrow`` instalado, ``arrow``
+(stream Arrow IPC) e ``parquet``, estes com colunas tipadas (ver
+``apps.common.arrow``). As linhas saem de ``.values_list()`` com
+``.iterator(chunk_size=...)`` (cursor no servidor no PostgreSQL) direto para
+um ``StreamingHttpResponse``: a memoria usada nao depende do numero de
+linhas e nada passa pelo serializer.
+"""
+
 import csv
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.exceptions import NotAcceptable
+
+from . import arrow
+
+CHUNK_SIZE = 2000
+
+FORMATOS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+FORMATOS_COLUNARES = ("arrow", "parquet")
+
+# Mesmo formato da resposta JSON do DRF.
+_FORMATOS_TEXTO = (
+    (datetime.datetime, serializers.DateTimeField().to_representation),
+    (datetime.date, serializers.DateField().to_representation),
+)
+
+
+class _Eco:
+    """Pseudo-arquivo: ``csv.writer`` devolve a linha em vez de guarda-la."""
+
+    def write(self, valor):
+        return valor
 
-from django.http import HttpResponse
+
+def _formatar(valor):
+    for tipo, formatar in _FORMATOS_TEXTO:
+        if isinstance(valor, tipo):
+            return formatar(valor)
+    return valor
 
 
 class CSVListExportMixin:
     csv_filename = "export.csv"
+    csv_chunk_size = CHUNK_SIZE
+    # Coluna exportada -> campo ou expressao; padrao: os campos do serializer.
+    csv_fields = None
 
     def list(self, request, *args, **kwargs):
-        if request.query_params.get("export") == "csv":
+        formato = request.query_params.get("export")
+        if formato in FORMATOS:
+            if formato in FORMATOS_COLUNARES and not arrow.disponivel():
+                raise NotAcceptable(f"Exportacao {formato} requer o pacote pyarrow.")
             queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            return self._to_csv_response(serializer.data)
+            return self._export_response(formato, queryset)
         return super().list(request, *args, **kwargs)
 
-    def _to_csv_response(self, rows):
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="{self.csv_filename}"'
-        writer = csv.writer(response, delimiter=";")
-        if rows:
-            headers = list(rows[0].keys())
-            writer.writerow(headers)
-            for row in rows:
-                writer.writerow([row.get(h, "") for h in headers])
+    def get_csv_fields(self) -> dict:
+        if self.csv_fields is not None:
+            return dict(self.csv_fields)
+        return {nome: nome for nome in self.get_serializer().fields}
+
+    def _anotar_campos(self, campos, queryset):
+        anotacoes = {
+            coluna: F(valor) if isinstance(valor, str) else valor
+            for coluna, valor in campos.items()
+            if valor != coluna
+        }
+        return queryset.annotate(**anotacoes)
+
+    def _export_queryset(self, campos, queryset):
+        return self._anotar_campos(campos, queryset).values_list(*campos)
+
+    def _export_rows(self, queryset):
+        return queryset.iterator(chunk_size=self.csv_chunk_size)
+
+    def _csv_rows(self, colunas, queryset):
+        writer = csv.writer(_Eco(), delimiter=";")
+        yield writer.writerow(colunas)
+        for linha in self._export_rows(queryset):
+            yield writer.writerow([_formatar(valor) for valor in linha])
+
+    def _ndjson_rows(self, colunas, queryset):
+        for linha in self._export_rows(queryset):
+            registro = dict(zip(colunas, map(_formatar, linha), strict=True))
+            yield json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+    def _arrow_schema(self, colunas, queryset):
+        anotacoes = queryset.query.annotations
+        opts = queryset.model._meta
+        return arrow.schema(
+            {
+                coluna: (
+                    anotacoes[coluna].output_field
+                    if coluna in anotacoes
+                    else opts.get_field(coluna)
+                )
+                for coluna in colunas
+            }
+        )
+
+    def _arrow_rows(self, colunas, queryset):
+        esquema = self._arrow_schema(colunas, queryset)
+        return arrow.arrow_stream(
+            self._export_rows(queryset), esquema, self.csv_chunk_size
+        )
+
+    def _parquet_rows(self, colunas, queryset):
+        esquema = self._arrow_schema(colunas, queryset)
+        return arrow.parquet(self._export_rows(queryset), esquema, self.csv_chunk_size)
+
+    def _export_response(self, formato, queryset):
+        campos = self.get_csv_fields()
+        queryset = self._export_queryset(campos, queryset)
+        linhas = getattr(self, f"_{formato}_rows")(list(campos), queryset)
+        response = StreamingHttpResponse(linhas, content_type=FORMATOS[formato])
+        nome = self.csv_filename.rsplit(".", 1)[0]
+        response["Content-Disposition"] = f'attachment; filename="{nome}.{formato}"'
         return response
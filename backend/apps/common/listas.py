@@ -0,0 +1,124 @@
+"""Listagens somente leitura da API sem instanciar modelos nem serializers.
+
+``ListaRapidaAPIView`` busca so as colunas declaradas (as mesmas da
+exportacao, ``get_csv_fields``) com ``values_list`` e monta cada linha com
+conversores compilados uma vez por requisicao a partir dos campos do
+serializer. Decimal, data e data/hora usam versoes pre-compiladas do
+``to_representation`` do DRF (contexto decimal e fuso resolvidos uma vez),
+os demais campos ja saem do banco no formato da API. O JSON resultante e
+identico ao do serializer (ver o comando ``benchmark_listas``).
+"""
+
+import datetime
+import decimal
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.generics import ListAPIView
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .csv import FORMATOS, CSVListExportMixin
+
+# Campos do serializer cujo valor do banco ja e o valor da API.
+_SEM_CONVERSAO = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    # Calculados no banco pelas expressoes de ``get_csv_fields``.
+    serializers.SerializerMethodField,
+)
+
+
+def _decimal(campo):
+    coerce = getattr(campo, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or campo.localize or campo.normalize_output:
+        return campo.to_representation
+    if campo.decimal_places is None:
+        return "{:f}".format
+    # Mesmo quantize de DecimalField.quantize, com contexto e expoente fixos.
+    expoente = decimal.Decimal(".1") ** campo.decimal_places
+    contexto = decimal.getcontext().copy()
+    if campo.max_digits is not None:
+        contexto.prec = campo.max_digits
+    rounding = campo.rounding
+
+    def converter(valor):
+        if not isinstance(valor, decimal.Decimal):
+            return campo.to_representation(valor)
+        return f"{valor.quantize(expoente, rounding=rounding, context=contexto):f}"
+
+    return converter
+
+
+def _data_hora(campo):
+    formato = getattr(campo, "format", api_settings.DATETIME_FORMAT)
+    fuso = campo.timezone if hasattr(campo, "timezone") else campo.default_timezone()
+    if formato is None or formato.lower() != ISO_8601 or fuso is None:
+        return campo.to_representation
+
+    def converter(valor):
+        if not isinstance(valor, datetime.datetime) or valor.tzinfo is None:
+            return campo.to_representation(valor)
+        texto = valor.astimezone(fuso).isoformat()
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+
+    return converter
+
+
+def _data(campo):
+    formato = getattr(campo, "format", api_settings.DATE_FORMAT)
+    if formato is None or formato.lower() != ISO_8601:
+        return campo.to_representation
+    return datetime.date.isoformat
+
+
+def _conversor(campo):
+    if isinstance(campo, _SEM_CONVERSAO):
+        return None
+    if isinstance(campo, serializers.DecimalField):
+        return _decimal(campo)
+    if isinstance(campo, serializers.DateTimeField):
+        return _data_hora(campo)
+    if isinstance(campo, serializers.DateField):
+        return _data(campo)
+    return campo.to_representation
+
+
+def conversores(serializer, colunas) -> list:
+    """``(coluna, conversor ou None)`` na ordem de ``colunas``."""
+    campos = serializer.fields
+    return [(coluna, _conversor(campos[coluna])) for coluna in colunas]
+
+
+def codificar(linhas, conversores) -> list[dict]:
+    """Linhas de ``values_list`` no formato de ``serializer.data``."""
+    return [
+        {
+            coluna: valor if converter is None or valor is None else converter(valor)
+            for (coluna, converter), valor in zip(conversores, linha, strict=True)
+        }
+        for linha in linhas
+    ]
+
+
+class ListaRapidaAPIView(CSVListExportMixin, ListAPIView):
+    """``ListAPIView`` somente leitura com o caminho rapido acima.
+
+    As colunas precisam cobrir os campos do serializer (com ``id``); campos
+    calculados (``SerializerMethodField``) entram como expressoes em
+    ``get_csv_fields``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("export") in FORMATOS:
+            return super().list(request, *args, **kwargs)
+        campos = self.get_csv_fields()
+        codigos = conversores(self.get_serializer(), list(campos))
+        queryset = self._anotar_campos(
+            campos, self.filter_queryset(self.get_queryset())
+        ).values_list(*campos, named=True)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(codificar(page, codigos))
+        return Response(codificar(queryset, codigos))
@@ -0,0 +1,122 @@
+"""Colunas de nome normalizado para busca sem acento e sem caixa.
+
+Os modelos declaram ``NORMALIZED_FIELDS`` (coluna normalizada -> campo de
+origem) e herdam ``NomeNormalizadoMixin``, que preenche as colunas no
+``save``; as cargas em lote (``bulk_upsert``/``apply_delta``) preenchem via
+``preencher_normalizados``. O que entra sem nenhum dos dois (``loaddata``)
+e corrigido por ``recalcular_normalizados``. No PostgreSQL as colunas tem
+indice GIN ``gin_trgm_ops`` (``pg_trgm``), que atende ``LIKE '%termo%'`` e a
+busca por similaridade.
+"""
+
+import re
+import unicodedata
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections, router
+from django.db.models import Q
+
+
+def normalizar_nome(value) -> str:
+    """Minusculas, sem acentos nem pontuacao, espacos colapsados."""
+    text = str(value or "").strip().lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _colunas(model) -> dict:
+    """Campo de origem -> coluna normalizada."""
+    return {
+        origem: coluna
+        for coluna, origem in getattr(model, "NORMALIZED_FIELDS", {}).items()
+    }
+
+
+def preencher_normalizados(model, rows, fields):
+    """Acrescenta as colunas normalizadas a ``rows`` (dicts).
+
+    So entram as colunas cujo campo de origem esta em ``fields``. Devolve
+    as linhas (um iterador, sem materializar ``rows``) e a lista das colunas
+    acrescentadas.
+    """
+    colunas = {
+        origem: coluna
+        for origem, coluna in _colunas(model).items()
+        if origem in fields and coluna not in fields
+    }
+    if not colunas:
+        return rows, []
+    rows = (
+        {
+            **row,
+            **{
+                coluna: normalizar_nome(row[origem])
+                for origem, coluna in colunas.items()
+            },
+        }
+        for row in rows
+    )
+    return rows, list(colunas.values())
+
+
+class NomeNormalizadoMixin:
+    """Preenche as colunas de ``NORMALIZED_FIELDS`` a cada ``save``."""
+
+    def save(self, *args, **kwargs):
+        for coluna, origem in self.NORMALIZED_FIELDS.items():
+            setattr(self, coluna, normalizar_nome(getattr(self, origem)))
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and origem in update_fields:
+                kwargs["update_fields"] = [*update_fields, coluna]
+        super().save(*args, **kwargs)
+
+
+def recalcular_normalizados(model, batch_size: int = 1000) -> int:
+    """Regrava as colunas normalizadas desatualizadas; devolve quantas linhas."""
+    colunas = model.NORMALIZED_FIELDS
+    alterados = []
+    for obj in model.objects.only("pk", *colunas, *colunas.values()).iterator(
+        chunk_size=batch_size
+    ):
+        alterado = False
+        for coluna, origem in colunas.items():
+            valor = normalizar_nome(getattr(obj, origem))
+            if getattr(obj, coluna) != valor:
+                setattr(obj, coluna, valor)
+                alterado = True
+        if alterado:
+            alterados.append(obj)
+    model.objects.bulk_update(alterados, list(colunas), batch_size=batch_size)
+    return len(alterados)
+
+
+def filtro_texto(model, campo: str, termo: str) -> Q:
+    """``Q`` de substring: na coluna normalizada, se houver, ou ``icontains``."""
+    coluna = _colunas(model).get(campo)
+    if coluna is None:
+        return Q(**{f"{campo}__icontains": termo})
+    return Q(**{f"{coluna}__contains": normalizar_nome(termo)})
+
+
+def _trigram_disponivel(model) -> bool:
+    return connections[router.db_for_read(model)].vendor == "postgresql"
+
+
+def buscar_similares(queryset, campo: str, termo: str):
+    """Substring ou nome parecido (operador ``%`` do ``pg_trgm``).
+
+    Resultados do mais parecido ao menos; fora do PostgreSQL, apenas
+    substring sem acento.
+    """
+    filtro = filtro_texto(queryset.model, campo, termo)
+    coluna = _colunas(queryset.model).get(campo)
+    if coluna is None or not _trigram_disponivel(queryset.model):
+        return queryset.filter(filtro)
+    termo = normalizar_nome(termo)
+    return (
+        queryset.filter(filtro | Q(**{f"{coluna}__trigram_similar": termo}))
+        .annotate(similaridade=TrigramSimilarity(coluna, termo))
+        .order_by("-similaridade", "pk")
+    )
@@ -0,0 +1,260 @@
+"""Paginacao por chave (keyset/seek) para as paginas de listagem.
+
+Em vez de OFFSET/LIMIT e COUNT, cada pagina filtra a partir da ultima linha
+exibida: ``(campo, id) < (valor, id)`` na ordem decrescente (``>`` na
+crescente), com ``id`` como desempate. O cursor vai na URL em base64 opaco e
+carrega a ordenacao em que foi gerado; cursor invalido ou de outra ordenacao
+volta para a primeira pagina. O campo de ordenacao (campo do modelo ou
+anotacao) nao pode ser nulo.
+
+``PaginacaoAPI`` e a paginacao padrao das listagens do DRF e usa o mesmo
+keyset quando o cliente pede ``?cursor=``.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+PAGE_SIZE = 25
+
+
+def _identidade(valor):
+    return valor
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict | None:
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+class KeysetPage:
+    """Pagina sem contagem total: so sabe se ha anterior e proxima."""
+
+    keyset = True
+
+    def __init__(self, object_list, params, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def _query(self, cursor):
+        params = self._params.copy()
+        params.pop("page", None)
+        params["cursor"] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self._query(self.next_cursor) if self.has_next else ""
+
+    @property
+    def previous_query(self):
+        return self._query(self.previous_cursor) if self.has_previous else ""
+
+
+def keyset_paginate(queryset, ordering: str, params, per_page: int = PAGE_SIZE):
+    """Devolve a ``KeysetPage`` indicada por ``params["cursor"]``.
+
+    ``ordering`` e um campo do modelo ou anotacao, com ``-`` para ordem
+    decrescente.
+    """
+    campo = ordering.lstrip("-")
+    decrescente = ordering.startswith("-")
+    try:
+        to_python = queryset.model._meta.get_field(campo).to_python
+    except FieldDoesNotExist:
+        # Anotacao (ex.: ``rank`` da busca): o valor volta do JSON como esta.
+        to_python = _identidade
+
+    cursor = decode_cursor(params.get("cursor", ""))
+    if cursor is not None and cursor.get("o") != ordering:
+        cursor = None
+    if cursor is not None:
+        try:
+            valor = to_python(cursor["v"])
+            pk = int(cursor["id"])
+        except (KeyError, TypeError, ValueError, ValidationError):
+            cursor = None
+    voltando = cursor is not None and cursor.get("d") == "p"
+
+    # Indo para tras a ordem e a comparacao se invertem e a pagina e
+    # desvirada no fim.
+    invertido = decrescente != voltando
+    operador = "lt" if invertido else "gt"
+    prefixo = "-" if invertido else ""
+    queryset = queryset.order_by(f"{prefixo}{campo}", f"{prefixo}pk")
+    if cursor is not None:
+        queryset = queryset.filter(
+            Q(**{f"{campo}__{operador}": valor})
+            | Q(**{campo: valor, f"pk__{operador}": pk})
+        )
+
+    linhas = list(queryset[: per_page + 1])
+    ha_mais = len(linhas) > per_page
+    linhas = linhas[:per_page]
+    if voltando:
+        linhas.reverse()
+
+    def _cursor(item, direcao):
+        # Linhas de ``values_list(named=True)`` (ListaRapidaAPIView) tem
+        # ``id`` mas nao ``pk``.
+        pk = item.pk if hasattr(item, "pk") else item.id
+        return encode_cursor(
+            {"o": ordering, "v": getattr(item, campo), "id": pk, "d": direcao}
+        )
+
+    proxima = anterior = None
+    if linhas:
+        if ha_mais or voltando:
+            proxima = _cursor(linhas[-1], "n")
+        if cursor is not None and (ha_mais or not voltando):
+            anterior = _cursor(linhas[0], "p")
+    return KeysetPage(linhas, params, next_cursor=proxima, previous_cursor=anterior)
+
+
+class PaginacaoAPI(PageNumberPagination):
+    """Paginacao por numero de pagina, com tres opcoes do cliente.
+
+    - ``?page_size=`` escolhe o tamanho da pagina, ate ``max_page_size``;
+    - ``?count=false`` nao faz o ``COUNT(*)``: ``count`` vem nulo e a
+      proxima pagina e detectada buscando uma linha a mais;
+    - ``?cursor=`` (vazio na primeira pagina) troca OFFSET por keyset, para
+      percorrer a tabela inteira com custo constante por pagina. A ordem e
+      o ``?ordering=`` quando ele e um campo nao nulo aceito pela view,
+      senao ``cursor_ordering`` da view (padrao ``id``).
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = None
+        self.numero = None
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        if "cursor" in request.query_params:
+            ordering = self._ordenacao_cursor(queryset, request, view)
+            self.keyset = keyset_paginate(
+                queryset, ordering, request.query_params, page_size
+            )
+            return list(self.keyset)
+        if request.query_params.get("count") == "false":
+            return self._paginar_sem_contagem(queryset, request, page_size)
+        return super().paginate_queryset(queryset, request, view)
+
+    def _ordenacao_cursor(self, queryset, request, view) -> str:
+        ordering = request.query_params.get("ordering", "")
+        campo = ordering.lstrip("-")
+        if campo in getattr(view, "ordering_fields", ()):
+            try:
+                if not queryset.model._meta.get_field(campo).null:
+                    return ordering
+            except FieldDoesNotExist:
+                pass
+        return getattr(view, "cursor_ordering", "id")
+
+    def _paginar_sem_contagem(self, queryset, request, page_size):
+        try:
+            self.numero = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.numero = 0
+        if self.numero < 1:
+            raise NotFound(self.invalid_page_message)
+        inicio = (self.numero - 1) * page_size
+        linhas = list(queryset[inicio : inicio + page_size + 1])
+        self.ha_proxima = len(linhas) > page_size
+        return linhas[:page_size]
+
+    def get_next_link(self):
+        url = self.request.build_absolute_uri()
+        if self.keyset is not None:
+            if not self.keyset.has_next:
+                return None
+            url = remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, "cursor", self.keyset.next_cursor)
+        if self.numero is not None:
+            if not self.ha_proxima:
+                return None
+            return replace_query_param(url, self.page_query_param, self.numero + 1)
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        url = self.request.build_absolute_uri()
+        if self.keyset is not None:
+            if not self.keyset.has_previous:
+                return None
+            url = remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, "cursor", self.keyset.previous_cursor)
+        if self.numero is not None:
+            if self.numero == 1:
+                return None
+            if self.numero == 2:
+                return remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, self.page_query_param, self.numero - 1)
+        return super().get_previous_link()
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": "count",
+                "required": False,
+                "in": "query",
+                "description": "false: nao conta o total (count nulo).",
+                "schema": {"type": "boolean"},
+            },
+            {
+                "name": "cursor",
+                "required": False,
+                "in": "query",
+                "description": "Paginacao por cursor (vazio na primeira pagina).",
+                "schema": {"type": "string"},
+            },
+        ]
+
+    def get_paginated_response(self, data):
+        if self.keyset is None and self.numero is None:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "count": None,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
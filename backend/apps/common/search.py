@@ -0,0 +1,121 @@
+"""Busca textual: full-text do PostgreSQL com fallback para ``icontains``.
+
+Os modelos pesquisaveis declaram ``SEARCH_WEIGHTS`` (campo -> peso A-D) e
+uma coluna ``search_vector`` (``tsvector`` em portugues, indice GIN). As
+cargas em lote recalculam o vetor das linhas que alteram; no fim,
+``atualizar_vetores`` preenche so as linhas ainda sem vetor (novas, vindas de
+``loaddata`` ou gravadas por ``save``, ver ``VetorBuscaMixin``), sem regravar
+a tabela inteira. Fora do PostgreSQL (SQLite em dev/testes) a busca volta a
+ser ``icontains`` nos mesmos campos, ou substring na coluna de nome
+normalizado quando o campo tem uma (ver ``apps.common.nomes``).
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import F, Q
+from rest_framework.filters import SearchFilter
+
+from .nomes import filtro_texto
+
+SEARCH_CONFIG = "portuguese"
+
+
+def busca_textual_disponivel(model) -> bool:
+    if not hasattr(model, "SEARCH_WEIGHTS"):
+        return False
+    return connections[router.db_for_read(model)].vendor == "postgresql"
+
+
+def _query(termo: str) -> SearchQuery:
+    return SearchQuery(termo, config=SEARCH_CONFIG, search_type="websearch")
+
+
+def vetor(model):
+    campos = iter(model.SEARCH_WEIGHTS.items())
+    campo, peso = next(campos)
+    expressao = SearchVector(campo, weight=peso, config=SEARCH_CONFIG)
+    for campo, peso in campos:
+        expressao += SearchVector(campo, weight=peso, config=SEARCH_CONFIG)
+    return expressao
+
+
+def atualizar_vetores(model, queryset=None) -> int:
+    """Calcula ``search_vector`` de ``queryset`` (padrao: linhas sem vetor).
+
+    No-op fora do PostgreSQL.
+    """
+    if not busca_textual_disponivel(model):
+        return 0
+    if queryset is None:
+        queryset = model.objects.filter(search_vector__isnull=True)
+    return queryset.update(search_vector=vetor(model))
+
+
+class VetorBuscaMixin:
+    """Limpa o ``search_vector`` quando o ``save`` grava campos de busca.
+
+    A linha volta a ficar sem vetor e ``atualizar_vetores`` a recalcula.
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.search_vector = None
+        elif set(update_fields) & set(self.SEARCH_WEIGHTS):
+            self.search_vector = None
+            kwargs["update_fields"] = [*update_fields, "search_vector"]
+        super().save(*args, **kwargs)
+
+
+def filtro_busca(model, termo: str, campos=None) -> Q:
+    """``Q`` da busca: ``search_vector @@ query`` ou substring em ``campos``.
+
+    ``campos`` padrao: os campos de ``SEARCH_WEIGHTS``.
+    """
+    if busca_textual_disponivel(model):
+        return Q(search_vector=_query(termo))
+    filtro = Q()
+    for campo in campos or model.SEARCH_WEIGHTS:
+        filtro |= filtro_texto(model, campo, termo)
+    return filtro
+
+
+def ranquear(queryset, termo: str):
+    """Anota ``rank`` (relevancia) quando a busca textual esta disponivel."""
+    if not busca_textual_disponivel(queryset.model):
+        return queryset
+    return queryset.annotate(rank=SearchRank(F("search_vector"), _query(termo)))
+
+
+class FullTextSearchFilter(SearchFilter):
+    """``SearchFilter`` que usa o ``search_vector`` no PostgreSQL.
+
+    Sem ``?ordering=`` os resultados saem por relevancia. Modelos sem
+    ``SEARCH_WEIGHTS``, ou fora do PostgreSQL, seguem o ``SearchFilter``,
+    trocando os campos de nome pela coluna normalizada.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not busca_textual_disponivel(queryset.model):
+            return self._filtrar_por_campos(request, queryset, view)
+        termo = " ".join(self.get_search_terms(request))
+        if not termo:
+            return queryset
+        queryset = ranquear(queryset.filter(filtro_busca(queryset.model, termo)), termo)
+        return queryset.order_by("-rank", "pk")
+
+    def _filtrar_por_campos(self, request, queryset, view):
+        model = queryset.model
+        if not hasattr(model, "NORMALIZED_FIELDS"):
+            return super().filter_queryset(request, queryset, view)
+        campos = self.get_search_fields(view, request)
+        termos = self.get_search_terms(request)
+        if not campos or not termos:
+            return queryset
+        # Como no SearchFilter: cada termo precisa casar em algum campo.
+        for termo in termos:
+            filtro = Q()
+            for campo in campos:
+                filtro |= filtro_texto(model, campo, termo)
+            queryset = queryset.filter(filtro)
+        return queryset
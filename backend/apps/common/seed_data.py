@@ -0,0 +1,134 @@
+"""Leitura dos arquivos de dados estaticos (seed_data e data/exports).
+
+Os arquivos sao lidos uma vez por processo: ``carregar_em_cache`` guarda o
+resultado do parser junto com o mtime e o tamanho do arquivo e so le de novo
+quando um dos dois muda. Os objetos devolvidos sao compartilhados entre
+requisicoes e nao devem ser alterados.
+"""
+
+import csv
+import json
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+
+from .nomes import normalizar_nome
+
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def find_data_file(filename):
+    """Look in backend/seed_data/ first (production), then data/exports/ (local)."""
+    candidates = [
+        _BACKEND_DIR / "seed_data" / filename,
+        _BACKEND_DIR.parent / "data" / "exports" / filename,
+    ]
+    for path in candidates:
+        if path.exists():
+            return path
+    return None
+
+
+def carregar_em_cache(filename, parser, default=None):
+    """Devolve ``parser(path)``, relido so quando mtime ou tamanho mudam.
+
+    Arquivo ausente devolve ``default``; erro de leitura tambem, sem cache,
+    para tentar de novo na proxima chamada.
+    """
+    path = find_data_file(filename)
+    if path is None:
+        return default
+    try:
+        stat = path.stat()
+    except OSError:
+        return default
+    assinatura = (stat.st_mtime_ns, stat.st_size)
+    chave = (str(path), parser)
+    entrada = _cache.get(chave)
+    if entrada is not None and entrada[0] == assinatura:
+        return entrada[1]
+    with _cache_lock:
+        entrada = _cache.get(chave)
+        if entrada is not None and entrada[0] == assinatura:
+            return entrada[1]
+        try:
+            valor = parser(path)
+        except Exception:  # noqa: BLE001
+            return default
+        _cache[chave] = (assinatura, valor)
+    return valor
+
+
+def limpar_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _ler_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _ler_lista_json(path):
+    payload = _ler_json(path)
+    return payload if isinstance(payload, list) else []
+
+
+def ler_csv(path):
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle, delimiter=";"))
+
+
+def load_municipio_contexto():
+    return carregar_em_cache("municipio-contexto.json", _ler_json, default={})
+
+
+def load_export_data(filename):
+    return carregar_em_cache(filename, _ler_lista_json, default=[])
+
+
+def load_export_csv(filename):
+    return carregar_em_cache(filename, ler_csv, default=[])
+
+
+class IndiceServidores:
+    """Servidores (dicts) com indices por nome e por orgao normalizados."""
+
+    def __init__(self, servidores):
+        self.servidores = servidores
+        self.por_nome = defaultdict(list)
+        self.por_orgao = defaultdict(list)
+        self._chaves = []
+        for servidor in servidores:
+            nome = normalizar_nome(servidor.get("nome"))
+            orgao = normalizar_nome(servidor.get("orgao"))
+            self.por_nome[nome].append(servidor)
+            self.por_orgao[orgao].append(servidor)
+            self._chaves.append((nome, orgao))
+        self.por_nome = dict(self.por_nome)
+        self.por_orgao = dict(self.por_orgao)
+        self.total_bruto = sum(
+            (s.get("valor_bruto") or Decimal("0") for s in servidores), Decimal("0")
+        )
+        self.total_liquido = sum(
+            (s.get("valor_liquido") or Decimal("0") for s in servidores), Decimal("0")
+        )
+
+    def __len__(self):
+        return len(self.servidores)
+
+    def buscar(self, termo):
+        """Servidores cujo nome ou orgao contem ``termo`` (sem acento/caixa)."""
+        termo = normalizar_nome(termo)
+        if not termo:
+            return self.servidores
+        return [
+            servidor
+            for servidor, (nome, orgao) in zip(
+                self.servidores, self._chaves, strict=True
+            )
+            if termo in nome or termo in orgao
+        ]
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Contrato, Licitacao
+from .models import Contrato, Licitacao, TotalCategoria
 
 
 @admin.register(Licitacao)
@@ -15,3 +15,9 @@ class ContratoAdmin(admin.ModelAdmin):
     list_display = ("numero", "empresa", "modalidade", "valor")
     list_filter = ("modalidade",)
     search_fields = ("numero", "empresa", "objeto")
+
+
+@admin.register(TotalCategoria)
+class TotalCategoriaAdmin(admin.ModelAdmin):
+    list_display = ("modelo", "categoria", "quantidade", "valor_total", "calculado_em")
+    list_filter = ("modelo",)
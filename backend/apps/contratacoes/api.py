@@ -1,13 +1,14 @@
 from django.urls import path
-from rest_framework.generics import ListAPIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.agregacao import AgregadoAPIView
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
 from .models import Contrato, Licitacao
 from .serializers import ContratoSerializer, LicitacaoSerializer
 
 
-class LicitacaoListAPIView(CSVListExportMixin, ListAPIView):
+class LicitacaoListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Licitacao.objects.all().order_by("-valor")
     serializer_class = LicitacaoSerializer
     filterset_fields = ("modalidade",)
@@ -16,7 +17,7 @@ class LicitacaoListAPIView(CSVListExportMixin, ListAPIView):
     csv_filename = "licitacoes.csv"
 
 
-class ContratoListAPIView(CSVListExportMixin, ListAPIView):
+class ContratoListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Contrato.objects.all().order_by("-valor")
     serializer_class = ContratoSerializer
     filterset_fields = ("modalidade", "empresa")
@@ -25,7 +26,16 @@ class ContratoListAPIView(CSVListExportMixin, ListAPIView):
     csv_filename = "contratos.csv"
 
 
+class ContratacoesAgregadoAPIView(GetCondicionalMixin, AgregadoAPIView):
+    modelos = {"contratos": Contrato, "licitacoes": Licitacao}
+
+
 urlpatterns = [
     path("licitacoes/", LicitacaoListAPIView.as_view(), name="contratacoes-licitacoes"),
     path("contratos/", ContratoListAPIView.as_view(), name="contratacoes-contratos"),
+    path(
+        "agregado/",
+        ContratacoesAgregadoAPIView.as_view(),
+        name="contratacoes-agregado",
+    ),
 ]
@@ -0,0 +1,153 @@
+"""Classificacao tematica de contratos e licitacoes na carga.
+
+Cada categoria tem uma lista de termos procurados (sem acento e sem caixa)
+no objeto e, para contratos, no nome da empresa. As tags ficam em
+``CategoriaContrato``/``CategoriaLicitacao`` e os totais por categoria em
+``TotalCategoria``; as paginas tematicas so filtram pela tag e leem o total.
+"""
+
+from functools import cache
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from apps.common.aho_corasick import AhoCorasick
+from apps.common.nomes import normalizar_nome
+from apps.ingestao.bulk import BATCH_SIZE, bulk_upsert
+
+from .models import (
+    CategoriaContrato,
+    CategoriaLicitacao,
+    Contrato,
+    Licitacao,
+    TotalCategoria,
+)
+
+REGRAS = {
+    "tecnologia": (
+        "tecnolog",
+        "software",
+        "sistema",
+        "internet",
+        "telecom",
+        "dados",
+        "informat",
+    ),
+    "obras": (
+        "obras",
+        "obra de",
+        "pavimentac",
+        "construcao",
+        "reforma",
+        "engenharia",
+        "drenagem",
+        "calcamento",
+    ),
+    "saude": (
+        "saude",
+        "medicament",
+        "hospital",
+        "odontolog",
+        "laboratori",
+        "ambulancia",
+    ),
+    "educacao": ("escola", "merenda", "ensino", "educac", "pedagog", "didatic"),
+    "transporte": ("transporte", "veiculo", "combustive", "onibus", "frete"),
+    "limpeza_urbana": ("limpeza urbana", "coleta de lixo", "residuos", "varricao"),
+    "eventos": ("evento", "festa", "palco", "sonorizacao", "show"),
+}
+
+# modelo -> (nome em TotalCategoria, modelo das tags, FK da tag, campos lidos)
+CLASSIFICADOS = {
+    Contrato: ("contrato", CategoriaContrato, "contrato", ("objeto", "empresa")),
+    Licitacao: ("licitacao", CategoriaLicitacao, "licitacao", ("objeto",)),
+}
+
+
+@cache
+def _automato():
+    return AhoCorasick(termo for termos in REGRAS.values() for termo in termos)
+
+
+@cache
+def _categoria_do_termo():
+    return {
+        termo: categoria for categoria, termos in REGRAS.items() for termo in termos
+    }
+
+
+def classificar(*textos) -> set[str]:
+    """Categorias cujos termos aparecem em algum dos ``textos``."""
+    # Nenhum termo tem ``|``, entao nenhum casa atravessando dois campos.
+    texto = " | ".join(normalizar_nome(texto) for texto in textos)
+    categorias = _categoria_do_termo()
+    return {categorias[termo] for termo in _automato().encontrar(texto)}
+
+
+def _reclassificar(model) -> dict:
+    _, tag_model, fk, campos = CLASSIFICADOS[model]
+    atuais = set(tag_model.objects.values_list(f"{fk}_id", "categoria"))
+    novas = set()
+    for pk, *textos in model.objects.values_list("pk", *campos).iterator():
+        novas.update((pk, categoria) for categoria in classificar(*textos))
+
+    removidas = {}
+    for pk, categoria in atuais - novas:
+        removidas.setdefault(categoria, []).append(pk)
+    with transaction.atomic():
+        for categoria, pks in removidas.items():
+            for inicio in range(0, len(pks), BATCH_SIZE):
+                tag_model.objects.filter(
+                    categoria=categoria,
+                    **{f"{fk}_id__in": pks[inicio : inicio + BATCH_SIZE]},
+                ).delete()
+        tag_model.objects.bulk_create(
+            [
+                tag_model(**{f"{fk}_id": pk, "categoria": categoria})
+                for pk, categoria in sorted(novas - atuais)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    return {
+        "inseridos": len(novas - atuais),
+        "removidos": len(atuais - novas),
+        "inalterados": len(novas & atuais),
+    }
+
+
+def recalcular_totais_categoria():
+    """Regrava ``TotalCategoria`` a partir das tags atuais."""
+    rows = []
+    for model, (nome, tag_model, fk, _campos) in CLASSIFICADOS.items():
+        totais = dict.fromkeys(REGRAS, {"quantidade": 0, "valor_total": 0})
+        totais[TotalCategoria.TODAS] = model.objects.aggregate(
+            quantidade=Count("pk"), valor_total=Sum("valor")
+        )
+        for row in tag_model.objects.values("categoria").annotate(
+            quantidade=Count("pk"), valor_total=Sum(f"{fk}__valor")
+        ):
+            totais[row["categoria"]] = row
+        rows.extend(
+            {
+                "modelo": nome,
+                "categoria": categoria,
+                "quantidade": total["quantidade"],
+                "valor_total": total["valor_total"] or 0,
+            }
+            for categoria, total in totais.items()
+        )
+    bulk_upsert(
+        TotalCategoria,
+        rows,
+        key_fields=["modelo", "categoria"],
+        update_fields=["quantidade", "valor_total"],
+    )
+
+
+def classificar_contratacoes() -> dict:
+    """Atualiza as tags de contratos e licitacoes e os totais por categoria."""
+    resultado = {
+        model._meta.model_name: _reclassificar(model) for model in CLASSIFICADOS
+    }
+    recalcular_totais_categoria()
+    return resultado
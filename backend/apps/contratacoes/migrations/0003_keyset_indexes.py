@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "contratacoes",
+            "0002_alter_contrato_options_alter_licitacao_options_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contrato",
+            index=models.Index(
+                fields=["valor", "id"], name="contratacoe_valor_0243e8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="licitacao",
+            index=models.Index(
+                fields=["valor", "id"], name="contratacoe_valor_f31fdf_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:10
+
+import operator
+from functools import reduce
+
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Indices GIN e carga inicial do tsvector so existem no PostgreSQL; no SQLite
+# a coluna fica nula e a busca usa icontains.
+PESOS = {
+    "licitacao": {"objeto": "A", "certame": "B", "modalidade": "C"},
+    "contrato": {"objeto": "A", "empresa": "A", "numero": "B", "modalidade": "C"},
+}
+
+
+def _indice(model_name):
+    return GinIndex(fields=["search_vector"], name=f"{model_name}_search_gin")
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model_name, pesos in PESOS.items():
+        model = apps.get_model("contratacoes", model_name)
+        schema_editor.add_index(model, _indice(model_name))
+        vetores = [
+            SearchVector(campo, weight=peso, config="portuguese")
+            for campo, peso in pesos.items()
+        ]
+        model.objects.update(search_vector=reduce(operator.add, vetores))
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model_name in PESOS:
+        model = apps.get_model("contratacoes", model_name)
+        schema_editor.remove_index(model, _indice(model_name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contratacoes", "0003_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contrato",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="licitacao",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:14
+
+import re
+import unicodedata
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# Copia congelada de apps.common.nomes.normalizar_nome: a migracao nao pode
+# mudar junto com o codigo da aplicacao.
+def _normalizar(value):
+    text = str(value or "").strip().lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# O indice trigram so existe no PostgreSQL; no SQLite a coluna e preenchida
+# e a busca faz LIKE sem indice.
+INDICE = GinIndex(
+    OpClass("empresa_normalizada", name="gin_trgm_ops"), name="contrato_empresa_trgm"
+)
+
+
+def preencher(apps, schema_editor):
+    model = apps.get_model("contratacoes", "contrato")
+    linhas = list(model.objects.only("pk", "empresa"))
+    for linha in linhas:
+        linha.empresa_normalizada = _normalizar(linha.empresa)
+    model.objects.bulk_update(linhas, ["empresa_normalizada"], batch_size=1000)
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("contratacoes", "contrato"), INDICE)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("contratacoes", "contrato"), INDICE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contratacoes", "0004_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="contrato",
+            name="empresa_normalizada",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(preencher, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
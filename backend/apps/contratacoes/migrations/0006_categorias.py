@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contratacoes", "0005_nome_normalizado"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TotalCategoria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("modelo", models.CharField(max_length=20)),
+                ("categoria", models.CharField(max_length=40)),
+                ("quantidade", models.IntegerField(default=0)),
+                (
+                    "valor_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("calculado_em", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["modelo", "categoria"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("modelo", "categoria"), name="uniq_total_categoria"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CategoriaContrato",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("categoria", models.CharField(max_length=40)),
+                (
+                    "contrato",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="categorias",
+                        to="contratacoes.contrato",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("categoria", "contrato"), name="uniq_categoria_contrato"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CategoriaLicitacao",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("categoria", models.CharField(max_length=40)),
+                (
+                    "licitacao",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="categorias",
+                        to="contratacoes.licitacao",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("categoria", "licitacao"),
+                        name="uniq_categoria_licitacao",
+                    )
+                ],
+            },
+        ),
+    ]
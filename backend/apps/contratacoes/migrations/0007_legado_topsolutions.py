@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Linhas da snapshot legada (exportacao 2025 da TopSolutions) gravadas antes
+# de a carga usar (ano, fonte) na chave. Valores congelados aqui.
+FONTE = "topsolutions"
+ANO = 2025
+CHAVES = {
+    "licitacao": ("certame",),
+    "contrato": ("numero", "empresa"),
+}
+
+
+def reconciliar(apps, schema_editor):
+    for nome, campos in CHAVES.items():
+        model = apps.get_model("contratacoes", nome)
+        atuais = model.objects.filter(ano=ANO, fonte=FONTE)
+        existentes = set(atuais.values_list(*campos))
+        duplicadas = []
+        migradas = []
+        legado = model.objects.filter(fonte="", ano__isnull=True)
+        for pk, *chave in legado.values_list("pk", *campos):
+            # Ja carregada pelo backfill do mesmo ano: a copia legada sai.
+            if tuple(chave) in existentes:
+                duplicadas.append(pk)
+            else:
+                existentes.add(tuple(chave))
+                migradas.append(pk)
+        for inicio in range(0, len(duplicadas), 1000):
+            model.objects.filter(pk__in=duplicadas[inicio : inicio + 1000]).delete()
+        for inicio in range(0, len(migradas), 1000):
+            model.objects.filter(pk__in=migradas[inicio : inicio + 1000]).update(
+                ano=ANO, fonte=FONTE
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contratacoes", "0006_categorias"),
+    ]
+
+    operations = [
+        migrations.RunPython(reconciliar, migrations.RunPython.noop),
+    ]
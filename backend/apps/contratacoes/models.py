@@ -1,7 +1,15 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from apps.common.nomes import NomeNormalizadoMixin
+from apps.common.search import VetorBuscaMixin
+
+
+class Licitacao(VetorBuscaMixin, models.Model):
+    SEARCH_WEIGHTS = {"objeto": "A", "certame": "B", "modalidade": "C"}
+    AGGREGATE_DIMENSIONS = ("modalidade", "ano", "status", "tipo_objeto", "fonte")
+    AGGREGATE_MEASURES = ("valor",)
 
-class Licitacao(models.Model):
     certame = models.CharField(max_length=100, blank=True)
     modalidade = models.CharField(max_length=120, blank=True)
     objeto = models.TextField(blank=True)
@@ -12,12 +20,20 @@ class Licitacao(models.Model):
     tipo_objeto = models.CharField(max_length=120, blank=True)
     link_edital = models.URLField(max_length=500, blank=True)
     fonte = models.CharField(max_length=30, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-valor"]
+        # Paginacao por cursor: (valor, id) e a chave da ordenacao padrao.
+        indexes = [models.Index(fields=["valor", "id"])]
+
 
+class Contrato(NomeNormalizadoMixin, VetorBuscaMixin, models.Model):
+    SEARCH_WEIGHTS = {"objeto": "A", "empresa": "A", "numero": "B", "modalidade": "C"}
+    NORMALIZED_FIELDS = {"empresa_normalizada": "empresa"}
+    AGGREGATE_DIMENSIONS = ("modalidade", "empresa", "ano", "ativo")
+    AGGREGATE_MEASURES = ("valor",)
 
-class Contrato(models.Model):
     numero = models.CharField(max_length=100, blank=True)
     empresa = models.CharField(max_length=255)
     modalidade = models.CharField(max_length=120, blank=True)
@@ -30,6 +46,64 @@ class Contrato(models.Model):
     data_assinatura = models.DateField(null=True, blank=True)
     ativo = models.BooleanField(default=True)
     fonte = models.CharField(max_length=30, blank=True)
+    empresa_normalizada = models.CharField(max_length=255, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-valor"]
+        indexes = [models.Index(fields=["valor", "id"])]
+
+
+class CategoriaContrato(models.Model):
+    """Categoria tematica do contrato, atribuida na carga por regras."""
+
+    contrato = models.ForeignKey(
+        Contrato, on_delete=models.CASCADE, related_name="categorias"
+    )
+    categoria = models.CharField(max_length=40)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["categoria", "contrato"], name="uniq_categoria_contrato"
+            )
+        ]
+
+
+class CategoriaLicitacao(models.Model):
+    """Categoria tematica da licitacao, atribuida na carga por regras."""
+
+    licitacao = models.ForeignKey(
+        Licitacao, on_delete=models.CASCADE, related_name="categorias"
+    )
+    categoria = models.CharField(max_length=40)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["categoria", "licitacao"], name="uniq_categoria_licitacao"
+            )
+        ]
+
+
+class TotalCategoria(models.Model):
+    """Quantidade e valor por categoria, recalculados ao fim de cada carga.
+
+    A categoria ``TODAS`` guarda o total do modelo, sem filtro.
+    """
+
+    TODAS = "todas"
+
+    modelo = models.CharField(max_length=20)
+    categoria = models.CharField(max_length=40)
+    quantidade = models.IntegerField(default=0)
+    valor_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    calculado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["modelo", "categoria"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["modelo", "categoria"], name="uniq_total_categoria"
+            )
+        ]
@@ -1,4 +1,4 @@
-from .models import Contrato, Licitacao
+from .models import Contrato, Licitacao, TotalCategoria
 
 
 def listar_licitacoes():
@@ -7,3 +7,14 @@ def listar_licitacoes():
 
 def listar_contratos():
     return Contrato.objects.order_by("-valor")
+
+
+def contratos_por_categoria(categoria: str):
+    return Contrato.objects.filter(categorias__categoria=categoria)
+
+
+def totais_por_categoria(modelo: str = "contrato") -> dict:
+    """``categoria -> TotalCategoria`` do modelo, como calculado na carga."""
+    return {
+        total.categoria: total for total in TotalCategoria.objects.filter(modelo=modelo)
+    }
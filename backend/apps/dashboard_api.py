@@ -1,33 +1,26 @@
-from django.db.models import Sum
 from django.urls import path
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.contratacoes.models import Contrato, Licitacao
-from apps.financas.models import DespesaSecretaria, ReceitaResumo
-from apps.fornecedores.models import Fornecedor
-from apps.governanca.models import Secretaria
-from apps.legislativo.models import Vereador
-from apps.pessoal.models import Servidor
+from apps.common.cache import GetCondicionalMixin
+from apps.monitoramento.services import ANO_PADRAO, obter_kpis
 
 
-class DashboardOverviewAPIView(APIView):
+class DashboardOverviewAPIView(GetCondicionalMixin, APIView):
     def get(self, request):
-        ano = int(request.query_params.get("ano", 2025))
-        receitas = ReceitaResumo.objects.filter(ano=ano).aggregate(
-            arrecadacao=Sum("arrecadacao")
-        )
-        despesas = DespesaSecretaria.objects.filter(ano=ano).aggregate(pago=Sum("pago"))
+        ano = int(request.query_params.get("ano", ANO_PADRAO))
+        kpis = obter_kpis(ano)
         data = {
             "ano": ano,
-            "secretarias": Secretaria.objects.count(),
-            "vereadores": Vereador.objects.count(),
-            "servidores": Servidor.objects.count(),
-            "licitacoes": Licitacao.objects.count(),
-            "contratos": Contrato.objects.count(),
-            "fornecedores": Fornecedor.objects.count(),
-            "receita_arrecadada": receitas.get("arrecadacao") or 0,
-            "despesa_paga": despesas.get("pago") or 0,
+            "secretarias": kpis.secretarias,
+            "vereadores": kpis.vereadores,
+            "servidores": kpis.servidores,
+            "licitacoes": kpis.licitacoes,
+            "contratos": kpis.contratos,
+            "fornecedores": kpis.fornecedores,
+            "receita_arrecadada": kpis.receita_arrecadada,
+            "despesa_paga": kpis.despesa_paga,
+            "calculado_em": kpis.calculado_em,
         }
         return Response(data)
 
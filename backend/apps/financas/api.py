@@ -1,17 +1,18 @@
 from django.urls import path
 from django_filters import rest_framework as filters
-from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.agregacao import AgregadoAPIView
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
-from .models import DespesaSecretaria
+from .models import DespesaSecretaria, Emenda, OrcamentoItem
 from .serializers import DespesaSecretariaSerializer
 from .services import resumo_financeiro
 
 
-class ResumoFinanceiroAPIView(APIView):
+class ResumoFinanceiroAPIView(GetCondicionalMixin, APIView):
     def get(self, request):
         ano = int(request.query_params.get("ano", 2025))
         return Response(resumo_financeiro(ano=ano))
@@ -26,7 +27,7 @@ class DespesaSecretariaFilter(filters.FilterSet):
         fields = ("ano", "secretaria")
 
 
-class DespesaSecretariaListAPIView(CSVListExportMixin, ListAPIView):
+class DespesaSecretariaListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = DespesaSecretaria.objects.all()
     serializer_class = DespesaSecretariaSerializer
     filterset_class = DespesaSecretariaFilter
@@ -41,6 +42,10 @@ class DespesaSecretariaListAPIView(CSVListExportMixin, ListAPIView):
         return DespesaSecretaria.objects.filter(ano=ano).order_by("-orcamento")
 
 
+class FinancasAgregadoAPIView(GetCondicionalMixin, AgregadoAPIView):
+    modelos = {"emendas": Emenda, "orcamento": OrcamentoItem}
+
+
 urlpatterns = [
     path("resumo/", ResumoFinanceiroAPIView.as_view(), name="financas-resumo"),
     path(
@@ -48,4 +53,5 @@ urlpatterns = [
         DespesaSecretariaListAPIView.as_view(),
         name="financas-por-secretaria",
     ),
+    path("agregado/", FinancasAgregadoAPIView.as_view(), name="financas-agregado"),
 ]
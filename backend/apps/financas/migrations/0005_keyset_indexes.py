@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financas", "0004_emenda_orcamentoitem"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emenda",
+            index=models.Index(
+                fields=["valor_previsto", "id"], name="financas_em_valor_p_730472_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orcamentoitem",
+            index=models.Index(
+                fields=["valor_inicial", "id"], name="financas_or_valor_i_f7c7c1_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from apps.common.search import VetorBuscaMixin
+
 
 class ReceitaResumo(models.Model):
     ano = models.IntegerField(db_index=True)
@@ -27,7 +30,23 @@ class DespesaSecretaria(models.Model):
         ]
 
 
-class Emenda(models.Model):
+class Emenda(VetorBuscaMixin, models.Model):
+    SEARCH_WEIGHTS = {"objeto": "A", "autoria": "A", "beneficiario": "B"}
+    AGGREGATE_DIMENSIONS = (
+        "ano",
+        "autoria",
+        "tipo",
+        "origem_recurso",
+        "funcao_governo",
+        "unidade",
+    )
+    AGGREGATE_MEASURES = (
+        "valor_previsto",
+        "valor_empenhado",
+        "valor_liquidado",
+        "valor_pago",
+    )
+
     numero = models.CharField(max_length=50, blank=True)
     ano = models.IntegerField(db_index=True)
     autoria = models.CharField(max_length=255)
@@ -42,16 +61,31 @@ class Emenda(models.Model):
     valor_liquidado = models.DecimalField(max_digits=16, decimal_places=2, default=0)
     valor_pago = models.DecimalField(max_digits=16, decimal_places=2, default=0)
     data_emenda = models.DateField(null=True, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-valor_previsto"]
-        indexes = [models.Index(fields=["ano", "autoria"])]
+        indexes = [
+            models.Index(fields=["ano", "autoria"]),
+            models.Index(fields=["valor_previsto", "id"]),
+        ]
 
     def __str__(self):
         return f"Emenda {self.numero} - {self.autoria}"
 
 
-class OrcamentoItem(models.Model):
+class OrcamentoItem(VetorBuscaMixin, models.Model):
+    SEARCH_WEIGHTS = {"acao": "A", "unidade": "B"}
+    AGGREGATE_DIMENSIONS = (
+        "ano",
+        "unidade",
+        "funcao",
+        "subfuncao",
+        "natureza_despesa",
+        "fonte_recurso",
+    )
+    AGGREGATE_MEASURES = ("valor_inicial", "valor_atualizado", "valor_disponivel")
+
     ano = models.IntegerField(db_index=True)
     orgao_cod = models.CharField(max_length=20, blank=True)
     unidade = models.CharField(max_length=255)
@@ -64,10 +98,14 @@ class OrcamentoItem(models.Model):
     valor_inicial = models.DecimalField(max_digits=16, decimal_places=2, default=0)
     valor_atualizado = models.DecimalField(max_digits=16, decimal_places=2, default=0)
     valor_disponivel = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-valor_inicial"]
-        indexes = [models.Index(fields=["ano", "unidade"])]
+        indexes = [
+            models.Index(fields=["ano", "unidade"]),
+            models.Index(fields=["valor_inicial", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.unidade} - {self.acao}"
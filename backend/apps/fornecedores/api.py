@@ -1,13 +1,13 @@
 from django.urls import path
-from rest_framework.generics import ListAPIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
 from .models import Fornecedor
 from .serializers import FornecedorSerializer
 
 
-class FornecedorListAPIView(CSVListExportMixin, ListAPIView):
+class FornecedorListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Fornecedor.objects.all().order_by("-valor_total")
     serializer_class = FornecedorSerializer
     filterset_fields = ("cnpj",)
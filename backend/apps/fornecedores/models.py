@@ -1,10 +1,15 @@
 from django.db import models
 
+from apps.common.nomes import NomeNormalizadoMixin
+
+
+class Fornecedor(NomeNormalizadoMixin, models.Model):
+    NORMALIZED_FIELDS = {"nome_normalizado": "nome"}
 
-class Fornecedor(models.Model):
     nome = models.CharField(max_length=255)
     cnpj = models.CharField(max_length=30, blank=True)
     valor_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    nome_normalizado = models.CharField(max_length=255, blank=True, editable=False)
 
     class Meta:
         ordering = ["-valor_total"]
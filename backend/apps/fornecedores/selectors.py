@@ -1,5 +1,7 @@
+from apps.common.nomes import buscar_similares
+
 from .models import Fornecedor
 
 
 def buscar_por_nome(termo: str):
-    return Fornecedor.objects.filter(nome__icontains=termo)
+    return buscar_similares(Fornecedor.objects.all(), "nome", termo)
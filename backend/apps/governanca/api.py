@@ -1,21 +1,21 @@
 from django.urls import path
-from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
 from .models import Secretaria
 from .serializers import SecretariaSerializer
 from .services import resumo_governanca
 
 
-class ResumoGovernancaAPIView(APIView):
+class ResumoGovernancaAPIView(GetCondicionalMixin, APIView):
     def get(self, request):
         return Response(resumo_governanca())
 
 
-class SecretariaListAPIView(CSVListExportMixin, ListAPIView):
+class SecretariaListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Secretaria.objects.all()
     serializer_class = SecretariaSerializer
     filterset_fields = ("nome", "gestor")
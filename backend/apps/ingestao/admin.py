@@ -11,6 +11,9 @@ class SyncRunAdmin(admin.ModelAdmin):
         "iniciado_em",
         "finalizado_em",
         "registro_count",
+        "inseridos",
+        "atualizados",
+        "removidos",
         "erro_count",
     )
     list_filter = ("fonte", "status")
@@ -1,8 +1,10 @@
-from django.contrib.admin.models import LogEntry
+from django.contrib.admin.models import ADDITION, CHANGE, DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce
 from django.urls import path
-from rest_framework.generics import ListAPIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.listas import ListaRapidaAPIView
 from apps.common.permissions import IsAnalistaOrAdmin
 
 from .models import DataProvenance, SyncRun
@@ -13,7 +15,7 @@ from .serializers import (
 )
 
 
-class SyncRunListAPIView(CSVListExportMixin, ListAPIView):
+class SyncRunListAPIView(ListaRapidaAPIView):
     queryset = SyncRun.objects.all()
     serializer_class = SyncRunSerializer
     filterset_fields = ("fonte", "status")
@@ -23,7 +25,7 @@ class SyncRunListAPIView(CSVListExportMixin, ListAPIView):
     csv_filename = "sync-runs.csv"
 
 
-class DataProvenanceListAPIView(CSVListExportMixin, ListAPIView):
+class DataProvenanceListAPIView(ListaRapidaAPIView):
     queryset = DataProvenance.objects.all()
     serializer_class = DataProvenanceSerializer
     filterset_fields = ("fonte", "recurso", "versao")
@@ -33,7 +35,7 @@ class DataProvenanceListAPIView(CSVListExportMixin, ListAPIView):
     csv_filename = "fontes-auditoria.csv"
 
 
-class ManualAuditLogListAPIView(CSVListExportMixin, ListAPIView):
+class ManualAuditLogListAPIView(ListaRapidaAPIView):
     queryset = LogEntry.objects.select_related("user", "content_type").all()
     serializer_class = ManualAuditLogSerializer
     filterset_fields = ("user", "content_type", "action_flag")
@@ -42,6 +44,20 @@ class ManualAuditLogListAPIView(CSVListExportMixin, ListAPIView):
     permission_classes = (IsAnalistaOrAdmin,)
     csv_filename = "auditoria-manual.csv"
 
+    def get_csv_fields(self):
+        # Mesmas colunas do ManualAuditLogSerializer, calculadas no banco.
+        username = f"user__{get_user_model().USERNAME_FIELD}"
+        return {
+            **super().get_csv_fields(),
+            "usuario": Coalesce(F(username), Value("")),
+            "acao": Case(
+                When(action_flag=ADDITION, then=Value("adicao")),
+                When(action_flag=CHANGE, then=Value("alteracao")),
+                When(action_flag=DELETION, then=Value("exclusao")),
+                default=Value("desconhecida"),
+            ),
+        }
+
 
 urlpatterns = [
     path("status/", SyncRunListAPIView.as_view(), name="ingestao-status"),
@@ -0,0 +1,290 @@
+"""Backfill historico da prefeitura em janelas com checkpoint.
+
+O intervalo de cada recurso e dividido em janelas: licitacoes e contratos em
+meses ou trimestres; receitas e despesas, que a API consolida por exercicio,
+em uma janela por ano. As janelas sao baixadas em paralelo, carregadas nos
+modelos (na thread principal, uma transacao por janela) e anotadas no
+checkpoint. Uma execucao interrompida pula as janelas ja concluidas. Janelas
+terminam no maximo hoje; as que ainda nao fecharam (fim hoje ou depois) sao
+carregadas mas nao entram no checkpoint, para serem baixadas de novo.
+"""
+
+import calendar
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.contratacoes.models import Contrato, Licitacao
+from apps.financas.models import DespesaSecretaria, ReceitaResumo
+from apps.governanca.models import Secretaria
+
+from .bulk import bulk_upsert
+from .connectors import FETCH_MAX_WORKERS, ConnectorError
+from .normalization import normalize_cnpj, normalize_text
+from .services import somar_delta
+
+# Mesma fonte (e chave) da snapshot legada: o backfill de 2025 atualiza as
+# linhas carregadas por load_legacy_snapshot em vez de duplica-las.
+FONTE = "topsolutions"
+PASSOS = {"mes": 1, "trimestre": 3}
+RECURSOS_ANUAIS = ("receitas", "despesas")
+RECURSOS_POR_PERIODO = ("licitacoes", "contratos")
+RECURSOS = RECURSOS_ANUAIS + RECURSOS_POR_PERIODO
+
+
+def _decimal(value):
+    if value is None:
+        return Decimal("0")
+    return Decimal(str(value))
+
+
+def _rows(payload):
+    if isinstance(payload, dict):
+        return payload.get("data") or []
+    return payload or []
+
+
+def chave_janela(janela) -> str:
+    recurso, inicio, fim = janela
+    return f"{recurso}:{inicio.isoformat()}:{fim.isoformat()}"
+
+
+def gerar_janelas(
+    ano_inicio: int,
+    ano_fim: int,
+    passo: str = "mes",
+    recursos=RECURSOS,
+    hoje: date | None = None,
+):
+    """Lista ``(recurso, inicio, fim)`` cobrindo os anos pedidos ate ``hoje``."""
+    hoje = hoje or date.today()
+    meses = PASSOS[passo]
+    janelas = []
+    for ano in range(ano_inicio, ano_fim + 1):
+        for recurso in recursos:
+            if recurso in RECURSOS_ANUAIS:
+                limites = [(date(ano, 1, 1), date(ano, 12, 31))]
+            else:
+                limites = []
+                for mes in range(1, 13, meses):
+                    ultimo = min(mes + meses - 1, 12)
+                    fim = date(ano, ultimo, calendar.monthrange(ano, ultimo)[1])
+                    limites.append((date(ano, mes, 1), fim))
+            for inicio, fim in limites:
+                if inicio <= hoje:
+                    janelas.append((recurso, inicio, min(fim, hoje)))
+    return janelas
+
+
+class BackfillCheckpoint:
+    """Arquivo JSON com as janelas ja carregadas e quantos registros trouxeram."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            self.concluidas = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.concluidas = {}
+
+    def concluida(self, janela) -> bool:
+        return chave_janela(janela) in self.concluidas
+
+    def marcar(self, janela, registros: int):
+        self.concluidas[chave_janela(janela)] = {
+            "registros": registros,
+            "concluida_em": timezone.now().isoformat(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(self.concluidas, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        os.replace(tmp_path, self.path)
+
+    def limpar(self):
+        self.concluidas = {}
+        self.path.unlink(missing_ok=True)
+
+
+def _carregar_receitas(ano, rows, provenance, endpoint):
+    previsao = Decimal("0")
+    arrecadacao = Decimal("0")
+    for row in rows:
+        previsao += _decimal(row.get("vlrPrevisaoAtualizado"))
+        arrecadacao += _decimal(row.get("vlrArrecadacao"))
+        provenance.track(
+            FONTE, endpoint, "receita", str(row.get("txtClassificacao") or ""), row
+        )
+    return bulk_upsert(
+        ReceitaResumo,
+        [{"ano": ano, "previsao": previsao, "arrecadacao": arrecadacao}],
+        key_fields=["ano"],
+        update_fields=["previsao", "arrecadacao"],
+    )
+
+
+def _carregar_despesas(ano, rows, provenance, endpoint):
+    despesas = []
+    for row in rows:
+        if int(row.get("exercicio") or ano) != ano:
+            continue
+        secretaria = normalize_text(row.get("txtDescricaoUnidade") or "SEM SECRETARIA")
+        despesas.append(
+            {
+                "ano": ano,
+                "secretaria": secretaria,
+                "orcamento": _decimal(row.get("vlrOrcadoAtualizado")),
+                "empenhado": _decimal(row.get("vlrEmpenhado")),
+                "liquidado": _decimal(row.get("vlrLiquidado")),
+                "pago": _decimal(row.get("vlrPago")),
+            }
+        )
+        provenance.track(FONTE, endpoint, "despesa_secretaria", secretaria, row)
+    Secretaria.objects.bulk_create(
+        [Secretaria(nome=nome) for nome in sorted({d["secretaria"] for d in despesas})],
+        ignore_conflicts=True,
+    )
+    return bulk_upsert(
+        DespesaSecretaria,
+        despesas,
+        key_fields=["ano", "secretaria"],
+        update_fields=["orcamento", "empenhado", "liquidado", "pago"],
+    )
+
+
+def _carregar_licitacoes(ano, rows, provenance, endpoint):
+    licitacoes = []
+    for row in rows:
+        certame = normalize_text(str(row.get("numCertame") or ""))
+        licitacoes.append(
+            {
+                "certame": certame,
+                "ano": ano,
+                "fonte": FONTE,
+                "modalidade": normalize_text(row.get("txtModalidadeLicit") or ""),
+                "objeto": row.get("txtObjeto") or "",
+                "valor": _decimal(row.get("vlrTotal")),
+            }
+        )
+        provenance.track(FONTE, endpoint, "licitacao", certame, row)
+    return bulk_upsert(
+        Licitacao,
+        licitacoes,
+        key_fields=["certame", "ano", "fonte"],
+        update_fields=["modalidade", "objeto", "valor"],
+    )
+
+
+def _carregar_contratos(ano, rows, provenance, endpoint):
+    contratos = []
+    for row in rows:
+        numero = normalize_text(str(row.get("numContrato") or ""))
+        contratos.append(
+            {
+                "numero": numero,
+                "empresa": normalize_text(
+                    row.get("txtNomeRazaoContratada") or "Nao informado"
+                ),
+                "ano": ano,
+                "fonte": FONTE,
+                "cnpj": normalize_cnpj(row.get("txtCpfCnpjContratada") or ""),
+                "modalidade": normalize_text(row.get("txtModalidade") or ""),
+                "objeto": row.get("txtObjeto") or "",
+                "valor": _decimal(row.get("vlrContrato")),
+            }
+        )
+        provenance.track(FONTE, endpoint, "contrato", numero, row)
+    return bulk_upsert(
+        Contrato,
+        contratos,
+        key_fields=["numero", "empresa", "ano", "fonte"],
+        update_fields=["cnpj", "modalidade", "objeto", "valor"],
+    )
+
+
+CARREGADORES = {
+    "receitas": _carregar_receitas,
+    "despesas": _carregar_despesas,
+    "licitacoes": _carregar_licitacoes,
+    "contratos": _carregar_contratos,
+}
+
+
+def carregar_janela(janela, payload, provenance) -> dict:
+    """Grava o payload de uma janela nos modelos; devolve o delta do upsert."""
+    recurso, inicio, _fim = janela
+    with transaction.atomic():
+        delta = CARREGADORES[recurso](
+            inicio.year, _rows(payload), provenance, chave_janela(janela)
+        )
+        provenance.flush()
+    return delta
+
+
+def executar_backfill(
+    janelas,
+    fetch,
+    checkpoint: BackfillCheckpoint,
+    provenance,
+    max_workers: int = FETCH_MAX_WORKERS,
+    hoje: date | None = None,
+) -> dict:
+    """Baixa as janelas pendentes em paralelo e carrega cada uma ao chegar.
+
+    ``fetch(janela)`` devolve o payload da janela. Falhas de coleta
+    (``ConnectorError``) ficam em ``falhas`` e a janela continua pendente no
+    checkpoint; erros de carga interrompem a execucao. Janelas que terminam
+    em ``hoje`` ou depois sao carregadas sem entrar no checkpoint.
+    """
+    hoje = hoje or date.today()
+    resultado = {
+        "janelas": 0,
+        "puladas": 0,
+        "registros": 0,
+        "falhas": [],
+        "delta": {},
+    }
+    pendentes = []
+    for janela in janelas:
+        if checkpoint.concluida(janela):
+            resultado["puladas"] += 1
+        else:
+            pendentes.append(janela)
+    if not pendentes:
+        return resultado
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(pendentes)), thread_name_prefix="backfill"
+    )
+    try:
+        futures = {
+            executor.submit(contextvars.copy_context().run, fetch, janela): janela
+            for janela in pendentes
+        }
+        for future in as_completed(futures):
+            janela = futures[future]
+            try:
+                payload = future.result()
+            except ConnectorError as exc:
+                resultado["falhas"].append((chave_janela(janela), str(exc)))
+                continue
+            delta = carregar_janela(janela, payload, provenance)
+            registros = len(_rows(payload))
+            if janela[2] < hoje:
+                checkpoint.marcar(janela, registros)
+            somar_delta(resultado["delta"], delta)
+            resultado["janelas"] += 1
+            resultado["registros"] += registros
+    except BaseException:
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+    return resultado
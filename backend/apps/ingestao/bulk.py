@@ -0,0 +1,297 @@
+"""Upsert e carga incremental em lote para as cargas de snapshot.
+
+``bulk_upsert`` substitui o ``update_or_create`` linha a linha: as chaves ja
+existentes sao lidas em uma consulta por modelo, as linhas novas vao em
+``bulk_create`` e as alteradas em ``bulk_update``, sempre em lotes. Quando a
+chave tem restricao de unicidade no banco, novas e alteradas seguem juntas em
+``INSERT ... ON CONFLICT DO UPDATE``.
+
+``apply_delta`` substitui o "apaga tudo e recria": compara o conteudo da
+fonte com a tabela pela chave natural e aplica so inclusoes, alteracoes e
+remocoes. A comparacao e feita por lotes da fonte, sem carregar nenhum dos
+dois lados inteiro em memoria.
+
+Nos dois, as linhas alteradas em campos de busca tem o ``search_vector``
+recalculado na hora; as novas entram com ``NULL`` e sao preenchidas por
+``atualizar_busca`` no fim da carga.
+"""
+
+import operator
+from collections import Counter
+from functools import reduce
+from itertools import islice
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from apps.common.nomes import preencher_normalizados
+from apps.common.search import atualizar_vetores
+
+BATCH_SIZE = 1000
+# Chaves por consulta em ``apply_delta``: o filtro vira um ``OR`` por chave e
+# o SQLite limita a profundidade da expressao a 1000.
+CHAVES_POR_CONSULTA = 500
+
+
+def _has_unique_constraint(model, key_fields) -> bool:
+    meta = model._meta
+    if len(key_fields) == 1 and meta.get_field(key_fields[0]).unique:
+        return True
+    wanted = set(key_fields)
+    if any(set(fields) == wanted for fields in meta.unique_together):
+        return True
+    return any(
+        set(getattr(constraint, "fields", ()) or ()) == wanted
+        and getattr(constraint, "condition", None) is None
+        for constraint in meta.constraints
+    )
+
+
+def _key(values: dict, key_fields) -> tuple:
+    return tuple(values[field] for field in key_fields)
+
+
+def _atualizar_vetores(model, pks, update_fields, batch_size):
+    if not pks or not set(getattr(model, "SEARCH_WEIGHTS", ())) & set(update_fields):
+        return
+    for inicio in range(0, len(pks), batch_size):
+        atualizar_vetores(
+            model, model.objects.filter(pk__in=pks[inicio : inicio + batch_size])
+        )
+
+
+def bulk_upsert(
+    model,
+    rows,
+    key_fields,
+    update_fields,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """Insere ou atualiza ``rows`` (dicts) identificados por ``key_fields``.
+
+    Linhas repetidas com a mesma chave seguem a ultima ocorrencia. Como no
+    ``update_or_create``, uma chave que ja existe em mais de uma linha da
+    tabela levanta ``MultipleObjectsReturned`` (nada e gravado). Colunas de
+    nome normalizado do modelo sao preenchidas a partir dos campos
+    carregados. Devolve a contagem de inseridos, atualizados e inalterados.
+    """
+    key_fields = tuple(key_fields)
+    rows, colunas = preencher_normalizados(model, rows, [*key_fields, *update_fields])
+    update_fields = [*update_fields, *colunas]
+    incoming = {}
+    for row in rows:
+        incoming[_key(row, key_fields)] = row
+    result = {"inseridos": 0, "atualizados": 0, "inalterados": 0}
+    if not incoming:
+        return result
+
+    first_values = {key[0] for key in incoming}
+    existing = {}
+    queryset = model.objects.filter(**{f"{key_fields[0]}__in": first_values})
+    for values in queryset.values("pk", *key_fields, *update_fields):
+        existing.setdefault(_key(values, key_fields), []).append(values)
+
+    novos = []
+    alterados = []
+    for key, row in incoming.items():
+        atuais = existing.get(key)
+        if not atuais:
+            novos.append(row)
+            continue
+        if len(atuais) > 1:
+            raise model.MultipleObjectsReturned(
+                f"{len(atuais)} {model._meta.verbose_name_plural} com a chave "
+                f"{dict(zip(key_fields, key, strict=True))}."
+            )
+        atual = atuais[0]
+        if any(atual[field] != row[field] for field in update_fields):
+            alterados.append({**row, "pk": atual["pk"]})
+        else:
+            result["inalterados"] += 1
+
+    result["inseridos"] = len(novos)
+    result["atualizados"] = len(alterados)
+    fields = [*key_fields, *update_fields]
+    db = router.db_for_write(model)
+    features = connections[db].features
+
+    with transaction.atomic(using=db):
+        if (
+            update_fields
+            and features.supports_update_conflicts_with_target
+            and _has_unique_constraint(model, key_fields)
+        ):
+            model.objects.bulk_create(
+                [
+                    model(**{field: row[field] for field in fields})
+                    for row in [*novos, *alterados]
+                ],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=list(key_fields),
+                update_fields=update_fields,
+            )
+            _atualizar_vetores(
+                model, [row["pk"] for row in alterados], update_fields, batch_size
+            )
+            return result
+
+        model.objects.bulk_create(
+            [model(**{field: row[field] for field in fields}) for row in novos],
+            batch_size=batch_size,
+        )
+        if alterados and update_fields:
+            model.objects.bulk_update(
+                [
+                    model(pk=row["pk"], **{field: row[field] for field in fields})
+                    for row in alterados
+                ],
+                update_fields,
+                batch_size=batch_size,
+            )
+            _atualizar_vetores(
+                model, [row["pk"] for row in alterados], update_fields, batch_size
+            )
+    return result
+
+
+def _coerce(model, fields, row: dict) -> dict:
+    # Normaliza os tipos como o banco devolve (ex.: "2025" -> 2025) para que a
+    # comparacao com as linhas existentes nao acuse alteracoes falsas.
+    meta = model._meta
+    return {field: meta.get_field(field).to_python(row[field]) for field in fields}
+
+
+def _atuais(queryset, key_fields, fields, keys):
+    """Linhas de ``queryset`` com as chaves ``keys``, em poucas consultas."""
+    keys = list(keys)
+    for inicio in range(0, len(keys), CHAVES_POR_CONSULTA):
+        filtro = reduce(
+            operator.or_,
+            (
+                Q(**dict(zip(key_fields, key, strict=True)))
+                for key in keys[inicio : inicio + CHAVES_POR_CONSULTA]
+            ),
+        )
+        yield from queryset.filter(filtro).order_by("pk").values("pk", *fields)
+
+
+def _diff_lote(model, fields, linhas_por_chave, atuais_por_chave):
+    """Pareia as linhas de um lote com as atuais de mesma chave.
+
+    Devolve ``(novos, alterados, mantidos, inalterados)``: ``mantidos`` sao
+    as pks atuais consumidas (identicas ou atualizadas). Atuais que sobram
+    nao sao tocadas aqui; outro lote ainda pode traze-las.
+    """
+    novos = []
+    alterados = []
+    mantidos = []
+    inalterados = 0
+    for key, linhas in linhas_por_chave.items():
+        pendentes = Counter(tuple(row[field] for field in fields) for row in linhas)
+        sobras = []
+        for atual in atuais_por_chave.get(key, []):
+            assinatura = tuple(atual[field] for field in fields)
+            if pendentes[assinatura] > 0:
+                pendentes[assinatura] -= 1
+                mantidos.append(atual["pk"])
+                inalterados += 1
+            else:
+                sobras.append(atual)
+        restantes = []
+        for row in linhas:
+            assinatura = tuple(row[field] for field in fields)
+            if pendentes[assinatura] > 0:
+                pendentes[assinatura] -= 1
+                restantes.append(row)
+        for atual, row in zip(sobras, restantes, strict=False):
+            alterados.append(model(pk=atual["pk"], **row))
+            mantidos.append(atual["pk"])
+        novos.extend(model(**row) for row in restantes[len(sobras) :])
+    return novos, alterados, mantidos, inalterados
+
+
+def apply_delta(
+    model,
+    rows,
+    key_fields,
+    fields,
+    queryset=None,
+    escopo: str | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """Sincroniza ``queryset`` (padrao: tabela inteira) com ``rows``.
+
+    ``fields`` lista todas as colunas carregadas, incluindo as da chave.
+    ``rows`` e consumido em lotes de ``batch_size``: cada lote busca so as
+    linhas atuais com as mesmas chaves e grava inclusoes e alteracoes. No
+    fim, as linhas de ``queryset`` nao pareadas sao removidas; com
+    ``escopo`` (um campo, ex.: ``"ano"``) apenas as que tem um valor desse
+    campo presente em ``rows``. Chaves repetidas sao tratadas como
+    multiconjunto, entao o resultado final equivale ao de apagar e recriar
+    o escopo. Devolve as contagens de inseridos, atualizados, removidos e
+    inalterados. Como em ``bulk_upsert``, as colunas de nome normalizado
+    entram em ``fields``.
+    """
+    key_fields = tuple(key_fields)
+    rows, colunas = preencher_normalizados(model, rows, fields)
+    fields = [*fields, *colunas]
+    update_fields = [field for field in fields if field not in key_fields]
+    if queryset is None:
+        queryset = model.objects.all()
+
+    resultado = {"inseridos": 0, "atualizados": 0, "removidos": 0, "inalterados": 0}
+    # Pks ja pareadas (e as recem-inseridas): nao casam de novo em outro lote
+    # e nao sao removidas no fim.
+    mantidos = set()
+    valores_escopo = set()
+    rows = iter(rows)
+    db = router.db_for_write(model)
+    with transaction.atomic(using=db):
+        while lote := list(islice(rows, batch_size)):
+            linhas_por_chave = {}
+            for row in lote:
+                row = _coerce(model, fields, row)
+                linhas_por_chave.setdefault(_key(row, key_fields), []).append(row)
+                if escopo is not None:
+                    valores_escopo.add(row[escopo])
+
+            atuais_por_chave = {}
+            atuais = _atuais(queryset, key_fields, fields, linhas_por_chave)
+            for values in atuais:
+                if values["pk"] in mantidos:
+                    continue
+                atuais_por_chave.setdefault(_key(values, key_fields), []).append(values)
+
+            novos, alterados, pareados, inalterados = _diff_lote(
+                model, fields, linhas_por_chave, atuais_por_chave
+            )
+            if alterados and update_fields:
+                model.objects.bulk_update(
+                    alterados, update_fields, batch_size=batch_size
+                )
+                _atualizar_vetores(
+                    model, [obj.pk for obj in alterados], update_fields, batch_size
+                )
+            model.objects.bulk_create(novos, batch_size=batch_size)
+            mantidos.update(pareados)
+            mantidos.update(novo.pk for novo in novos)
+            resultado["inseridos"] += len(novos)
+            resultado["atualizados"] += len(alterados)
+            resultado["inalterados"] += inalterados
+
+        if escopo is not None:
+            queryset = queryset.filter(**{f"{escopo}__in": valores_escopo})
+        removidos = [
+            pk
+            for pk in queryset.values_list("pk", flat=True).iterator(
+                chunk_size=batch_size
+            )
+            if pk not in mantidos
+        ]
+        for inicio in range(0, len(removidos), batch_size):
+            model.objects.filter(
+                pk__in=removidos[inicio : inicio + batch_size]
+            ).delete()
+        resultado["removidos"] = len(removidos)
+    return resultado
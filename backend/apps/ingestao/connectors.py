@@ -1,77 +1,200 @@
-import gzip
+import contextvars
 import html
 import json
+import os
 import re
+import threading
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from decimal import Decimal
-from urllib.error import HTTPError
+from functools import partial
+from pathlib import Path
+
+from .http_cache import CorpoEmCache, current_session
+from .http_client import PooledHTTPClient
+from .jsonstream import iter_json_file, iter_json_rows
+
+# Limites de concorrencia das coletas: o pool de threads limita o fan-out de
+# cada chamada a ``fetch_concurrently`` e o cliente HTTP limita as conexoes
+# simultaneas por host quando varios fetch_* rodam ao mesmo tempo.
+FETCH_MAX_WORKERS = 8
+PROBE_MAX_WORKERS = 6
+HOST_CONCURRENCY_DEFAULT = 4
+HOST_CONCURRENCY = {
+    "apisidra.ibge.gov.br": 2,
+    "www.portalcr2.com.br": 2,
+}
+
+JSON_ACCEPT = "application/json,text/plain,*/*"
+TEXT_ACCEPT = "text/html,application/json,*/*"
+
+http_client = PooledHTTPClient(
+    max_per_host=HOST_CONCURRENCY_DEFAULT, host_limits=HOST_CONCURRENCY
+)
 
 
 class ConnectorError(Exception):
     pass
 
 
-def _fetch_json(url: str, timeout: int = 30):
+def fetch_concurrently(jobs: dict, max_workers: int = FETCH_MAX_WORKERS) -> dict:
+    """Executa ``{chave: callable}`` em paralelo e devolve ``{chave: resultado}``.
+
+    Se algum job falhar, os pendentes sao cancelados e a excecao do primeiro
+    job com erro (na ordem das chaves) e propagada, como nas chamadas em serie.
+    """
+    if not jobs:
+        return {}
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(jobs)), thread_name_prefix="connector"
+    )
     try:
-        request = urllib.request.Request(
-            url,
-            headers={
-                "Accept": "application/json,text/plain,*/*",
-                "Accept-Encoding": "gzip, deflate",
-                "User-Agent": "Mozilla/5.0",
-            },
-        )
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            raw = response.read()
-            if response.headers.get("Content-Encoding") == "gzip":
-                raw = gzip.decompress(raw)
-            return json.loads(raw.decode("utf-8", errors="ignore"))
+        # Cada job herda o contexto atual (ex.: a fetch_session do comando).
+        futures = {
+            key: executor.submit(contextvars.copy_context().run, job)
+            for key, job in jobs.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+    except BaseException:
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _get(url: str, accept: str, timeout: int, headers: dict | None = None):
+    request_headers = {"Accept": accept}
+    request_headers.update(headers or {})
+    return http_client.open(url, headers=request_headers, timeout=timeout)
+
+
+def _cache_state(url: str):
+    session = current_session()
+    cache = session.cache if session is not None else None
+    entry = cache.lookup(url) if cache is not None else None
+    return session, cache, entry
+
+
+def _request(url: str, accept: str, timeout: int):
+    """GET completo devolvendo ``(status, reason, corpo)``.
+
+    Dentro de uma ``fetch_session`` com cache a requisicao e condicional: num
+    304 a URL e registrada como sem alteracao e o corpo vem como
+    ``CorpoEmCache``, sem ler o arquivo guardado.
+    """
+    session, cache, entry = _cache_state(url)
+    conditional = cache.conditional_headers(entry) if cache is not None else {}
+    with _get(url, accept, timeout, conditional) as response:
+        status, reason = response.status, response.reason
+        body = response.read()
+        headers = response.headers
+    if status == 304 and entry is not None:
+        cache.touch(url)
+        session.record(url, alterado=False)
+        return 200, reason, CorpoEmCache(cache, url)
+    if session is not None:
+        alterado = True
+        if cache is not None and status < 400:
+            writer = cache.writer(url)
+            writer.write(body)
+            sha256 = session.guardar(writer, headers)
+            alterado = entry is None or entry["sha256"] != sha256
+        session.record(url, alterado=alterado)
+    return status, reason, body
+
+
+def _fetch_json(url: str, timeout: int = 30, adiado: bool = False):
+    """JSON de ``url``; com ``adiado`` um 304 devolve o ``CorpoEmCache``.
+
+    Use ``adiado`` quando o payload so e gravado: se nada mudou o comando
+    de sync nem chega a decodificar o corpo guardado.
+    """
+    try:
+        status, reason, raw = _request(url, JSON_ACCEPT, timeout)
+        if status >= 400:
+            raise ConnectorError(f"HTTP {status} {reason}")
+        if isinstance(raw, CorpoEmCache):
+            return raw if adiado else raw.carregar()
+        return json.loads(raw.decode("utf-8", errors="ignore"))
+    except Exception as exc:  # noqa: BLE001
+        raise ConnectorError(f"Falha ao consultar {url}: {exc}") from exc
+
+
+def _tee(chunks, writer):
+    for chunk in chunks:
+        writer.write(chunk)
+        yield chunk
+
+
+def stream_json_rows(url: str, timeout: int = 120, key: str = "data"):
+    """Itera os registros do array ``key`` sem materializar o payload inteiro.
+
+    O corpo e descomprimido e decodificado por blocos; use para payloads
+    grandes (orcamento, servidores) consumidos como iterador. Com cache ativo
+    o corpo e gravado em disco durante a leitura e um 304 le do arquivo.
+    """
+    session, cache, entry = _cache_state(url)
+    conditional = cache.conditional_headers(entry) if cache is not None else {}
+    try:
+        with _get(url, JSON_ACCEPT, timeout, conditional) as response:
+            if response.status == 304 and entry is not None:
+                response.read()
+            else:
+                if response.status >= 400:
+                    raise ConnectorError(f"HTTP {response.status} {response.reason}")
+                if cache is None:
+                    yield from iter_json_rows(response.iter_content(), key=key)
+                    if session is not None:
+                        session.record(url, alterado=True)
+                    return
+                writer = cache.writer(url)
+                try:
+                    chunks = _tee(response.iter_content(), writer)
+                    yield from iter_json_rows(chunks, key=key)
+                    for _chunk in chunks:
+                        pass
+                except BaseException:
+                    writer.discard()
+                    raise
+                sha256 = session.guardar(writer, response.headers)
+                session.record(url, alterado=entry is None or entry["sha256"] != sha256)
+                return
+        cache.touch(url)
+        session.record(url, alterado=False)
+        yield from iter_json_file(cache.body_path(url), key=key)
     except Exception as exc:  # noqa: BLE001
         raise ConnectorError(f"Falha ao consultar {url}: {exc}") from exc
 
 
+def _sum_orcamento(rows) -> dict:
+    totais = {
+        "registros": 0,
+        "inicial": Decimal("0"),
+        "atualizado": Decimal("0"),
+        "disponivel": Decimal("0"),
+    }
+    for item in rows:
+        totais["registros"] += 1
+        totais["inicial"] += _to_decimal(item.get("vlrOrcamentoInicial"))
+        totais["atualizado"] += _to_decimal(item.get("vlrOrcamentoAtualizado"))
+        totais["disponivel"] += _to_decimal(item.get("vlrDisponivel"))
+    return totais
+
+
 def _fetch_json_status(url: str, timeout: int = 30):
-    request = urllib.request.Request(
-        url,
-        headers={
-            "Accept": "application/json,text/plain,*/*",
-            "Accept-Encoding": "gzip, deflate",
-            "User-Agent": "Mozilla/5.0",
-        },
-    )
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            raw = response.read()
-            if response.headers.get("Content-Encoding") == "gzip":
-                raw = gzip.decompress(raw)
-            payload = json.loads(raw.decode("utf-8", errors="ignore"))
+        status_code, _reason, raw = _request(url, JSON_ACCEPT, timeout)
+        if isinstance(raw, CorpoEmCache):
+            raw = raw.ler()
+        body = raw.decode("utf-8", errors="ignore")
+        if status_code < 400:
             return {
                 "ok": True,
-                "status_code": response.status,
-                "payload": payload,
+                "status_code": status_code,
+                "payload": json.loads(body),
                 "error_code": "",
             }
-    except HTTPError as exc:
-        body = exc.read().decode("utf-8", errors="ignore")
-        error_code = ""
-        try:
-            parsed = json.loads(body)
-            error_code = (
-                parsed.get("metadata", {}).get("message")
-                if isinstance(parsed, dict)
-                else ""
-            ) or ""
-        except Exception:  # noqa: BLE001
-            pass
-        return {
-            "ok": False,
-            "status_code": exc.code,
-            "payload": {},
-            "error_code": error_code,
-            "error_text": body,
-            "raw_body": body,
-        }
     except Exception as exc:  # noqa: BLE001
         return {
             "ok": False,
@@ -82,6 +205,25 @@ def _fetch_json_status(url: str, timeout: int = 30):
             "raw_body": str(exc),
         }
 
+    error_code = ""
+    try:
+        parsed = json.loads(body)
+        error_code = (
+            parsed.get("metadata", {}).get("message")
+            if isinstance(parsed, dict)
+            else ""
+        ) or ""
+    except Exception:  # noqa: BLE001
+        pass
+    return {
+        "ok": False,
+        "status_code": status_code,
+        "payload": {},
+        "error_code": error_code,
+        "error_text": body,
+        "raw_body": body,
+    }
+
 
 def _build_url_with_params(base_url: str, params: dict):
     if not params:
@@ -90,36 +232,72 @@ def _build_url_with_params(base_url: str, params: dict):
     return f"{base_url}?{query}"
 
 
-def _probe_topsolutions_endpoint(endpoint: str, candidate_params: list[dict]):
-    attempts = []
-    for params in candidate_params:
-        target_url = _build_url_with_params(endpoint, params)
-        response = _fetch_json_status(target_url, timeout=90)
-        payload = response.get("payload", {})
-        rows = payload.get("data", []) if isinstance(payload, dict) else payload
-        rows_count = len(rows) if isinstance(rows, list) else 0
-
-        attempt = {
-            "url": target_url,
-            "ok": bool(response.get("ok")),
-            "status_code": int(response.get("status_code") or 0),
-            "error_code": response.get("error_code") or "",
-            "count": rows_count,
-            "params": params,
-        }
-        attempts.append(attempt)
+class ResolvedParamsStore:
+    """Guarda em JSON, por endpoint, as chaves de parametros que funcionaram.
 
-        if attempt["ok"]:
-            return {
-                "ok": True,
-                "status_code": attempt["status_code"],
-                "error_code": "",
-                "count": rows_count,
-                "url": target_url,
-                "resolved_params": params,
-                "attempts": attempts,
-            }
+    Sao guardadas apenas as chaves (ex.: ``["numExercicio"]``) para que o
+    mesmo formato seja reaproveitado em outros exercicios.
+    """
 
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, endpoint: str):
+        chaves = self._read().get(endpoint)
+        return None if chaves is None else sorted(chaves)
+
+    def set(self, endpoint: str, params: dict):
+        with self._lock:
+            data = self._read()
+            data[endpoint] = sorted(params)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, self.path)
+
+
+def _default_params_store():
+    from django.conf import settings
+
+    return ResolvedParamsStore(settings.INGESTAO_RESOLVED_PARAMS_FILE)
+
+
+def _probe_attempt(endpoint: str, params: dict):
+    target_url = _build_url_with_params(endpoint, params)
+    response = _fetch_json_status(target_url, timeout=90)
+    payload = response.get("payload", {})
+    rows = payload.get("data", []) if isinstance(payload, dict) else payload
+    return {
+        "url": target_url,
+        "ok": bool(response.get("ok")),
+        "status_code": int(response.get("status_code") or 0),
+        "error_code": response.get("error_code") or "",
+        "count": len(rows) if isinstance(rows, list) else 0,
+        "params": params,
+    }
+
+
+def _probe_result(endpoint: str, attempts: list[dict], winner: dict | None):
+    if winner is not None:
+        return {
+            "ok": True,
+            "status_code": winner["status_code"],
+            "error_code": "",
+            "count": winner["count"],
+            "url": winner["url"],
+            "resolved_params": winner["params"],
+            "attempts": attempts,
+        }
     last = attempts[-1] if attempts else {}
     return {
         "ok": False,
@@ -132,54 +310,175 @@ def _probe_topsolutions_endpoint(endpoint: str, candidate_params: list[dict]):
     }
 
 
-def fetch_prefeitura_2025(base_url: str):
+def _probe_topsolutions_endpoints(
+    endpoints: dict,
+    store: ResolvedParamsStore | None = None,
+    max_workers: int = PROBE_MAX_WORKERS,
+) -> dict:
+    """Descobre, para cada endpoint, um conjunto de parametros aceito.
+
+    ``endpoints`` e ``{chave: {"url": ..., "candidates": [...]}}``. Primeiro
+    e testado o formato salvo em ``store``; os endpoints que nao resolverem
+    disputam as demais candidatas em paralelo (ate ``max_workers``); a
+    primeira que responder ok vence e as pendentes daquele endpoint nao sao
+    mais enviadas.
+    """
+    candidates = {key: list(config["candidates"]) for key, config in endpoints.items()}
+    attempts = {key: [] for key in endpoints}
+    winners = {}
+
+    if store is not None:
+        preferidas = {}
+        for key, config in endpoints.items():
+            chaves = store.get(config["url"])
+            for params in candidates[key]:
+                if chaves is not None and sorted(params) == chaves:
+                    preferidas[key] = params
+                    candidates[key].remove(params)
+                    break
+        resultados = fetch_concurrently(
+            {
+                key: partial(_probe_attempt, endpoints[key]["url"], params)
+                for key, params in preferidas.items()
+            },
+            max_workers=max_workers,
+        )
+        for key, attempt in resultados.items():
+            attempts[key].append(attempt)
+            if attempt["ok"]:
+                winners[key] = attempt
+
+    pendentes = [key for key in endpoints if key not in winners and candidates[key]]
+    if pendentes:
+        # Intercala os endpoints para que a primeira candidata de cada um
+        # entre antes das demais quando o limite de concorrencia e menor.
+        ordem = []
+        for rodada in range(max(len(candidates[key]) for key in pendentes)):
+            for key in pendentes:
+                if rodada < len(candidates[key]):
+                    ordem.append((key, candidates[key][rodada]))
+
+        lock = threading.Lock()
+
+        def tentar(key, params):
+            # Candidatas que entram depois do endpoint resolvido nem saem.
+            with lock:
+                if key in winners:
+                    return None
+            attempt = _probe_attempt(endpoints[key]["url"], params)
+            if attempt["ok"]:
+                with lock:
+                    winners.setdefault(key, attempt)
+            return attempt
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(max_workers, len(ordem)), thread_name_prefix="probe"
+        )
+        try:
+            futures = [
+                (
+                    key,
+                    executor.submit(
+                        contextvars.copy_context().run, tentar, key, params
+                    ),
+                )
+                for key, params in ordem
+            ]
+            for key, future in futures:
+                attempt = future.result()
+                if attempt is not None:
+                    attempts[key].append(attempt)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if store is not None:
+        for key, attempt in winners.items():
+            store.set(endpoints[key]["url"], attempt["params"])
+
     return {
-        "receitas": _fetch_json(
-            f"{base_url}/receitaprevistaarrecadada/receitaprevistaarrecadadaasync?classificacaoPor=receita&numExercicio=2025&mesIni=1&mesFim=12"
-        ),
-        "despesas": _fetch_json(
-            f"{base_url}/despesa/despesaporclassificacaoasync?strClassificarPor=orgao&dtIni=01/01/2025&dtFim=31/12/2025"
-        ),
-        "licitacoes": _fetch_json(
-            f"{base_url}/licitacao/licitacaopordataasync?dtInicio=2025-01-01&dtFim=2025-12-31"
-        ),
-        "contratos": _fetch_json(
-            f"{base_url}/contrato/contratopordataasync?dtInicio=2025-01-01&dtFim=2025-12-31"
-        ),
+        key: _probe_result(config["url"], attempts[key], winners.get(key))
+        for key, config in endpoints.items()
     }
 
 
+# Endpoints da prefeitura por recurso. Receitas e despesas sao consolidadas
+# por exercicio; licitacoes e contratos aceitam qualquer intervalo de datas.
+PREFEITURA_ENDPOINTS = {
+    "receitas": (
+        "/receitaprevistaarrecadada/receitaprevistaarrecadadaasync"
+        "?classificacaoPor=receita&numExercicio={ano}&mesIni={mes_ini}&mesFim={mes_fim}"
+    ),
+    "despesas": (
+        "/despesa/despesaporclassificacaoasync"
+        "?strClassificarPor=orgao&dtIni={ini_br}&dtFim={fim_br}"
+    ),
+    "licitacoes": "/licitacao/licitacaopordataasync?dtInicio={ini}&dtFim={fim}",
+    "contratos": "/contrato/contratopordataasync?dtInicio={ini}&dtFim={fim}",
+}
+
+
+def prefeitura_url(base_url: str, recurso: str, inicio: date, fim: date) -> str:
+    return base_url + PREFEITURA_ENDPOINTS[recurso].format(
+        ano=inicio.year,
+        mes_ini=inicio.month,
+        mes_fim=fim.month,
+        ini=inicio.isoformat(),
+        fim=fim.isoformat(),
+        ini_br=inicio.strftime("%d/%m/%Y"),
+        fim_br=fim.strftime("%d/%m/%Y"),
+    )
+
+
+def fetch_prefeitura_2025(base_url: str):
+    inicio, fim = date(2025, 1, 1), date(2025, 12, 31)
+    return fetch_concurrently(
+        {
+            recurso: partial(
+                _fetch_json,
+                prefeitura_url(base_url, recurso, inicio, fim),
+                adiado=True,
+            )
+            for recurso in PREFEITURA_ENDPOINTS
+        }
+    )
+
+
 def fetch_camara_topsolutions(base_url: str):
-    return {
-        "vereadores": _fetch_json(f"{base_url}/vereador/vereadorasync?exercicio=2025"),
-        "mesa_diretora": _fetch_json(
-            f"{base_url}/mesa/mesadiretoraasync?exercicio=2025"
-        ),
-        "comissoes": _fetch_json(f"{base_url}/comissao/comissaoasync?exercicio=2025"),
-    }
+    return fetch_concurrently(
+        {
+            "vereadores": partial(
+                _fetch_json,
+                f"{base_url}/vereador/vereadorasync?exercicio=2025",
+                adiado=True,
+            ),
+            "mesa_diretora": partial(
+                _fetch_json,
+                f"{base_url}/mesa/mesadiretoraasync?exercicio=2025",
+                adiado=True,
+            ),
+            "comissoes": partial(
+                _fetch_json,
+                f"{base_url}/comissao/comissaoasync?exercicio=2025",
+                adiado=True,
+            ),
+        }
+    )
 
 
 def fetch_camara_portal(legislativo_url: str):
     encoded = urllib.parse.quote(legislativo_url, safe="")
     endpoint = f"https://www.portalcr2.com.br/api/1.1/init/data?location={encoded}"
-    return _fetch_json(endpoint)
+    return _fetch_json(endpoint, adiado=True)
 
 
 def _fetch_text(url: str, timeout: int = 30):
     try:
-        request = urllib.request.Request(
-            url,
-            headers={
-                "Accept": "text/html,application/json,*/*",
-                "Accept-Encoding": "gzip, deflate",
-                "User-Agent": "Mozilla/5.0",
-            },
-        )
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            raw = response.read()
-            if response.headers.get("Content-Encoding") == "gzip":
-                raw = gzip.decompress(raw)
-            return raw.decode("utf-8", errors="ignore")
+        status, reason, raw = _request(url, TEXT_ACCEPT, timeout)
+        if status >= 400:
+            raise ConnectorError(f"HTTP {status} {reason}")
+        if isinstance(raw, CorpoEmCache):
+            raw = raw.ler()
+        return raw.decode("utf-8", errors="ignore")
     except Exception as exc:  # noqa: BLE001
         raise ConnectorError(f"Falha ao consultar {url}: {exc}") from exc
 
@@ -197,17 +496,27 @@ def _to_decimal(value):
 
 
 def fetch_ibge_municipio_contexto():
-    cidade_api = _fetch_json(
-        "https://servicodados.ibge.gov.br/api/v1/localidades/municipios/2414209"
-    )
-    pop_est = _fetch_json(
-        "https://apisidra.ibge.gov.br/values/t/6579/n6/2414209/v/9324/p/2025"
+    respostas = fetch_concurrently(
+        {
+            "cidade_api": partial(
+                _fetch_json,
+                "https://servicodados.ibge.gov.br/api/v1/localidades/municipios/2414209",
+            ),
+            "pop_est": partial(
+                _fetch_json,
+                "https://apisidra.ibge.gov.br/values/t/6579/n6/2414209/v/9324/p/2025",
+            ),
+            "cidade_page": partial(
+                _fetch_text,
+                "https://www.ibge.gov.br/cidades-e-estados/rn/tibau-do-sul.html",
+            ),
+        }
     )
+    cidade_api = respostas["cidade_api"]
+    pop_est = respostas["pop_est"]
     pop_2025 = int(pop_est[1]["V"]) if len(pop_est) > 1 else 0
 
-    cidade_page = _fetch_text(
-        "https://www.ibge.gov.br/cidades-e-estados/rn/tibau-do-sul.html"
-    )
+    cidade_page = respostas["cidade_page"]
 
     indicadores = {}
     pattern = re.compile(
@@ -251,22 +560,34 @@ def fetch_ibge_municipio_contexto():
 
 def fetch_tce_municipio_contexto(identificador_unidade: int = 494, ano: int = 2025):
     base = "https://apidadosabertos.tce.rn.gov.br"
-    licitacoes = _fetch_json(
-        f"{base}/api/ProcedimentosLicitatoriosApi/LicitacaoPublica/Json/{identificador_unidade}/{ano}-01-01/{ano}-12-31",
-        timeout=120,
-    )
-    contratos = _fetch_json(
-        f"{base}/api/ContratosApi/Contratos/Json/{identificador_unidade}/true",
-        timeout=120,
-    )
-    receita = _fetch_json(
-        f"{base}/api/BalancoOrcamentarioApi/Receita/Json/{ano}/6/{identificador_unidade}",
-        timeout=120,
-    )
-    despesa = _fetch_json(
-        f"{base}/api/BalancoOrcamentarioApi/Despesa/Json/{ano}/6/{identificador_unidade}",
-        timeout=120,
+    respostas = fetch_concurrently(
+        {
+            "licitacoes": partial(
+                _fetch_json,
+                f"{base}/api/ProcedimentosLicitatoriosApi/LicitacaoPublica/Json/{identificador_unidade}/{ano}-01-01/{ano}-12-31",
+                timeout=120,
+            ),
+            "contratos": partial(
+                _fetch_json,
+                f"{base}/api/ContratosApi/Contratos/Json/{identificador_unidade}/true",
+                timeout=120,
+            ),
+            "receita": partial(
+                _fetch_json,
+                f"{base}/api/BalancoOrcamentarioApi/Receita/Json/{ano}/6/{identificador_unidade}",
+                timeout=120,
+            ),
+            "despesa": partial(
+                _fetch_json,
+                f"{base}/api/BalancoOrcamentarioApi/Despesa/Json/{ano}/6/{identificador_unidade}",
+                timeout=120,
+            ),
+        }
     )
+    licitacoes = respostas["licitacoes"]
+    contratos = respostas["contratos"]
+    receita = respostas["receita"]
+    despesa = respostas["despesa"]
 
     processos = {}
     lotes = set()
@@ -336,14 +657,38 @@ def fetch_tce_municipio_contexto(identificador_unidade: int = 494, ano: int = 20
 
 def fetch_topsolutions_municipio_contexto(ano: int = 2025):
     base = "https://dadosabertos.topsolutionsrn.com.br/pmtibausulrn"
-    orcamento = _fetch_json(
-        f"{base}/orcamento/orcamentoasync?dataInicio=01/01/{ano}&dataFim=31/12/{ano}"
+    respostas = fetch_concurrently(
+        {
+            # O orcamento e o maior payload: agregado direto do stream.
+            "orcamento": lambda: _sum_orcamento(
+                stream_json_rows(
+                    f"{base}/orcamento/orcamentoasync?dataInicio=01/01/{ano}&dataFim=31/12/{ano}",
+                    timeout=30,
+                )
+            ),
+            "emendas": partial(
+                _fetch_json, f"{base}/emendaparlamentar/emendaparlamentarasync"
+            ),
+        }
     )
-    emendas = _fetch_json(f"{base}/emendaparlamentar/emendaparlamentarasync")
-
-    orc_rows = orcamento.get("data", []) if isinstance(orcamento, dict) else orcamento
+    emendas = respostas["emendas"]
     emenda_rows = emendas.get("data", []) if isinstance(emendas, dict) else emendas
+    return _resumo_topsolutions(ano, respostas["orcamento"], emenda_rows)
+
 
+def resumir_topsolutions_detalhes(detalhes: dict, ano: int = 2025):
+    """Resumo de ``fetch_topsolutions_municipio_contexto`` sem novo download.
+
+    Usa as linhas ja baixadas por ``fetch_topsolutions_detalhes``.
+    """
+    return _resumo_topsolutions(
+        ano,
+        _sum_orcamento(detalhes.get("orcamento", [])),
+        detalhes.get("emendas", []),
+    )
+
+
+def _resumo_topsolutions(ano: int, orcamento: dict, emenda_rows) -> dict:
     autoria_count = {}
     for item in emenda_rows:
         autoria = str(item.get("autoria") or "N/A").strip()
@@ -356,16 +701,10 @@ def fetch_topsolutions_municipio_contexto(ano: int = 2025):
     return {
         "fonte": "TopSolutions Dados Abertos Prefeitura",
         "ano": ano,
-        "orcamento_registros": len(orc_rows),
-        "orcamento_inicial_total": float(
-            sum(_to_decimal(item.get("vlrOrcamentoInicial")) for item in orc_rows)
-        ),
-        "orcamento_atualizado_total": float(
-            sum(_to_decimal(item.get("vlrOrcamentoAtualizado")) for item in orc_rows)
-        ),
-        "orcamento_disponivel_total": float(
-            sum(_to_decimal(item.get("vlrDisponivel")) for item in orc_rows)
-        ),
+        "orcamento_registros": orcamento["registros"],
+        "orcamento_inicial_total": float(orcamento["inicial"]),
+        "orcamento_atualizado_total": float(orcamento["atualizado"]),
+        "orcamento_disponivel_total": float(orcamento["disponivel"]),
         "emendas_qtd": len(emenda_rows),
         "emendas_previsto_total": float(
             sum(_to_decimal(item.get("vlrPrevisto")) for item in emenda_rows)
@@ -382,7 +721,9 @@ def fetch_topsolutions_municipio_contexto(ano: int = 2025):
     }
 
 
-def fetch_topsolutions_operacionais(ano: int = 2025):
+def fetch_topsolutions_operacionais(
+    ano: int = 2025, params_store: ResolvedParamsStore | None = None
+):
     base = "https://dadosabertos.topsolutionsrn.com.br/pmtibausulrn"
     endpoints = {
         "diarias": {
@@ -423,12 +764,9 @@ def fetch_topsolutions_operacionais(ano: int = 2025):
         },
     }
 
-    result = {}
-    for key, config in endpoints.items():
-        result[key] = _probe_topsolutions_endpoint(
-            endpoint=config["url"],
-            candidate_params=config["candidates"],
-        )
+    if params_store is None:
+        params_store = _default_params_store()
+    result = _probe_topsolutions_endpoints(endpoints, store=params_store)
     result["ano"] = ano
     result["fonte"] = "TopSolutions Dados Abertos Prefeitura"
     return result
@@ -436,17 +774,25 @@ def fetch_topsolutions_operacionais(ano: int = 2025):
 
 def fetch_topsolutions_detalhes(ano: int = 2025):
     base = "https://dadosabertos.topsolutionsrn.com.br/pmtibausulrn"
-    orcamento = _fetch_json(
-        f"{base}/orcamento/orcamentoasync?dataInicio=01/01/{ano}&dataFim=31/12/{ano}",
-        timeout=120,
-    )
-    emendas = _fetch_json(
-        f"{base}/emendaparlamentar/emendaparlamentarasync",
-        timeout=120,
+    respostas = fetch_concurrently(
+        {
+            "orcamento": partial(
+                _fetch_json,
+                f"{base}/orcamento/orcamentoasync?dataInicio=01/01/{ano}&dataFim=31/12/{ano}",
+                timeout=120,
+            ),
+            "emendas": partial(
+                _fetch_json,
+                f"{base}/emendaparlamentar/emendaparlamentarasync",
+                timeout=120,
+            ),
+        }
     )
+    orcamento = respostas["orcamento"]
+    emendas = respostas["emendas"]
     return {
-        "orcamento": orcamento.get("data", [])
-        if isinstance(orcamento, dict)
-        else orcamento,
+        "orcamento": (
+            orcamento.get("data", []) if isinstance(orcamento, dict) else orcamento
+        ),
         "emendas": emendas.get("data", []) if isinstance(emendas, dict) else emendas,
     }
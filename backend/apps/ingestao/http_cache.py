@@ -0,0 +1,278 @@
+"""Cache em disco das respostas HTTP dos conectores.
+
+Cada URL guarda o corpo (ja descomprimido) e um JSON com ETag, Last-Modified
+e o sha256 do corpo. Nas coletas seguintes os validadores viram
+``If-None-Match``/``If-Modified-Since``; quando a origem nao envia
+validadores, o sha256 do corpo baixado e comparado com o anterior.
+
+``fetch_session`` ativa o cache para as chamadas feitas dentro do bloco e
+registra, por URL, se houve alteracao. Os comandos de sync usam esse resumo
+para pular a escrita dos snapshots quando nada mudou. Um 304 devolve um
+``CorpoEmCache``: o corpo guardado so e lido e decodificado se for usado.
+
+As respostas novas ficam pendentes na sessao e so entram no cache ao fim do
+bloco, ou, com ``confirmar=False``, em ``session.confirmar()``: os comandos
+de sync confirmam depois de gravar os snapshots, entao uma escrita que falha
+nao deixa validadores de um corpo que nunca foi gravado.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_current_session = contextvars.ContextVar("ingestao_fetch_session", default=None)
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class CacheWriter:
+    """Grava o corpo em arquivo temporario enquanto ele e lido da rede."""
+
+    def __init__(self, cache, url: str):
+        self._cache = cache
+        self._url = url
+        self._digest = hashlib.sha256()
+        self._size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self._handle = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self._digest.update(chunk)
+        self._size += len(chunk)
+        self._handle.write(chunk)
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def fechar(self):
+        self._handle.close()
+
+    def commit(self, headers) -> dict:
+        self._handle.close()
+        return self._cache._commit(
+            self._url, self._tmp_path, self._digest.hexdigest(), self._size, headers
+        )
+
+    def discard(self):
+        self._handle.close()
+        Path(self._tmp_path).unlink(missing_ok=True)
+
+
+class CorpoEmCache:
+    """Corpo confirmado pela origem (304), lido do disco apenas sob demanda."""
+
+    def __init__(self, cache, url: str):
+        self.cache = cache
+        self.url = url
+
+    def ler(self) -> bytes:
+        return self.cache.read_body(self.url)
+
+    def carregar(self):
+        return json.loads(self.ler().decode("utf-8", errors="ignore"))
+
+
+def carregar(valor):
+    """Decodifica ``valor`` se for um ``CorpoEmCache``; senao devolve como esta."""
+    return valor.carregar() if isinstance(valor, CorpoEmCache) else valor
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory,
+        ttl: int = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        key = _url_key(url)
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def lookup(self, url: str) -> dict | None:
+        """Metadados da URL ou ``None`` se ausente/expirada (acima do TTL)."""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta.get("armazenado_em", 0) > self.ttl:
+            self._remove(url)
+            return None
+        if not body_path.exists():
+            meta_path.unlink(missing_ok=True)
+            return None
+        return meta
+
+    def conditional_headers(self, entry: dict | None) -> dict:
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def body_path(self, url: str) -> Path:
+        return self._paths(url)[1]
+
+    def read_body(self, url: str) -> bytes:
+        return self.body_path(url).read_bytes()
+
+    def touch(self, url: str):
+        """Renova o TTL de uma entrada confirmada pela origem (304)."""
+        meta_path, _body_path = self._paths(url)
+        with self._lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return
+            meta["armazenado_em"] = time.time()
+            self._write_meta(meta_path, meta)
+
+    def writer(self, url: str) -> CacheWriter:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return CacheWriter(self, url)
+
+    def store(self, url: str, body: bytes, headers) -> dict:
+        writer = self.writer(url)
+        writer.write(body)
+        return writer.commit(headers)
+
+    def _commit(self, url, tmp_path, digest, size, headers) -> dict:
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag") or "",
+            "last_modified": headers.get("Last-Modified") or "",
+            "sha256": digest,
+            "tamanho": size,
+            "armazenado_em": time.time(),
+        }
+        with self._lock:
+            os.replace(tmp_path, body_path)
+            self._write_meta(meta_path, meta)
+        self.evict()
+        return meta
+
+    @staticmethod
+    def _write_meta(meta_path: Path, meta: dict):
+        tmp_path = meta_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+
+    def _remove(self, url: str):
+        for path in self._paths(url):
+            path.unlink(missing_ok=True)
+
+    def evict(self):
+        """Remove entradas expiradas e, se preciso, as mais antigas ate caber."""
+        with self._lock:
+            agora = time.time()
+            entries = []
+            for meta_path in self.directory.glob("*.json"):
+                body_path = meta_path.with_suffix(".body")
+                try:
+                    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                    size = body_path.stat().st_size
+                except (OSError, ValueError):
+                    meta_path.unlink(missing_ok=True)
+                    body_path.unlink(missing_ok=True)
+                    continue
+                armazenado_em = meta.get("armazenado_em", 0)
+                if agora - armazenado_em > self.ttl:
+                    meta_path.unlink(missing_ok=True)
+                    body_path.unlink(missing_ok=True)
+                    continue
+                entries.append((armazenado_em, size, meta_path, body_path))
+
+            total = sum(size for _stored, size, _meta, _body in entries)
+            for _stored, size, meta_path, body_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                meta_path.unlink(missing_ok=True)
+                body_path.unlink(missing_ok=True)
+                total -= size
+
+
+class FetchSession:
+    """Resultado das requisicoes feitas dentro de ``fetch_session``."""
+
+    def __init__(self, cache: ResponseCache | None):
+        self.cache = cache
+        self.urls = {}
+        self._pendentes = []
+        self._lock = threading.Lock()
+
+    def record(self, url: str, alterado: bool):
+        with self._lock:
+            self.urls[url] = self.urls.get(url, False) or alterado
+
+    def guardar(self, writer: CacheWriter, headers) -> str:
+        """Deixa o corpo de ``writer`` pendente; devolve o sha256 dele."""
+        writer.fechar()
+        with self._lock:
+            self._pendentes.append((writer, headers))
+        return writer.sha256
+
+    def _retirar_pendentes(self):
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, []
+        return pendentes
+
+    def confirmar(self):
+        """Grava no cache as respostas pendentes."""
+        for writer, headers in self._retirar_pendentes():
+            writer.commit(headers)
+
+    def descartar(self):
+        for writer, _headers in self._retirar_pendentes():
+            writer.discard()
+
+    @property
+    def unchanged(self) -> bool:
+        return bool(self.urls) and not any(self.urls.values())
+
+    def resumo(self) -> str:
+        alteradas = sum(1 for alterado in self.urls.values() if alterado)
+        return (
+            f"{len(self.urls)} URLs consultadas, {alteradas} com alteracao, "
+            f"{len(self.urls) - alteradas} sem alteracao"
+        )
+
+
+def current_session() -> FetchSession | None:
+    return _current_session.get()
+
+
+@contextmanager
+def fetch_session(cache: ResponseCache | None = None, confirmar: bool = True):
+    session = FetchSession(cache)
+    token = _current_session.set(session)
+    try:
+        yield session
+    except BaseException:
+        session.descartar()
+        raise
+    else:
+        if confirmar:
+            session.confirmar()
+    finally:
+        _current_session.reset(token)
@@ -0,0 +1,285 @@
+"""Cliente HTTP com pool de conexoes persistentes para os conectores.
+
+Mantem conexoes keep-alive por host (evitando novo handshake TCP/TLS a cada
+chamada), limita quantas conexoes simultaneas cada host recebe e decodifica
+gzip, deflate e brotli de forma incremental.
+"""
+
+import http.client
+import ssl
+import threading
+import urllib.parse
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli vem com whitenoise[brotli]
+    brotli = None
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+READ_CHUNK_SIZE = 64 * 1024
+
+# Erros que indicam conexao ociosa encerrada pelo servidor; nesses casos a
+# requisicao e repetida uma vez em uma conexao nova.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class HTTPClientError(Exception):
+    pass
+
+
+def accept_encoding() -> str:
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+class _DeflateDecoder:
+    # Alguns servidores enviam deflate "cru" (sem cabecalho zlib); o formato
+    # e detectado no primeiro bloco.
+    def __init__(self):
+        self._decoder = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._first and data:
+            self._first = False
+            try:
+                return self._decoder.decompress(data)
+            except zlib.error:
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decoder.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._decoder = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decoder.process(data) if data else b""
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class ContentDecoder:
+    """Decodifica o corpo conforme ``Content-Encoding``, bloco a bloco."""
+
+    def __init__(self, content_encoding: str | None):
+        codings = [
+            item.strip().lower()
+            for item in (content_encoding or "").split(",")
+            if item.strip() and item.strip().lower() != "identity"
+        ]
+        # As codificacoes sao aplicadas na ordem listada; desfazemos ao contrario.
+        self._decoders = [self._build(coding) for coding in reversed(codings)]
+
+    @staticmethod
+    def _build(coding: str):
+        if coding in ("gzip", "x-gzip"):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if coding == "deflate":
+            return _DeflateDecoder()
+        if coding == "br" and brotli is not None:
+            return _BrotliDecoder()
+        raise HTTPClientError(f"Content-Encoding nao suportado: {coding}")
+
+    def decompress(self, data: bytes) -> bytes:
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        for decoder in self._decoders:
+            if data:
+                data = decoder.decompress(data)
+            data += decoder.flush()
+        return data
+
+
+class _HostPool:
+    def __init__(self, max_connections: int):
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def take_idle(self):
+        with self.lock:
+            return self.idle.pop() if self.idle else None
+
+    def give_back(self, conn):
+        with self.lock:
+            self.idle.append(conn)
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+class PooledResponse:
+    """Resposta associada a uma conexao do pool.
+
+    A conexao volta ao pool quando o corpo e lido ate o fim; se a resposta for
+    fechada antes disso a conexao e descartada.
+    """
+
+    def __init__(self, pool: _HostPool, conn, raw, url: str):
+        self.status = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+        self.url = url
+        self._pool = pool
+        self._conn = conn
+        self._raw = raw
+        self._decoder = ContentDecoder(raw.headers.get("Content-Encoding"))
+        self._released = False
+
+    def iter_content(self, chunk_size: int = READ_CHUNK_SIZE):
+        try:
+            while True:
+                chunk = self._raw.read(chunk_size)
+                if not chunk:
+                    break
+                decoded = self._decoder.decompress(chunk)
+                if decoded:
+                    yield decoded
+            tail = self._decoder.flush()
+            if tail:
+                yield tail
+            self._release(reusable=not self._raw.will_close)
+        finally:
+            self.close()
+
+    def read(self) -> bytes:
+        return b"".join(self.iter_content())
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.read().decode(encoding, errors="ignore")
+
+    def close(self):
+        self._release(reusable=False)
+
+    def _release(self, reusable: bool):
+        if self._released:
+            return
+        self._released = True
+        if reusable:
+            self._pool.give_back(self._conn)
+        else:
+            self._conn.close()
+        self._pool.slots.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PooledHTTPClient:
+    def __init__(
+        self,
+        max_per_host: int = 4,
+        host_limits: dict | None = None,
+        user_agent: str = "Mozilla/5.0",
+    ):
+        self.max_per_host = max_per_host
+        self.host_limits = host_limits if host_limits is not None else {}
+        self.user_agent = user_agent
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    def _pool(self, scheme: str, netloc: str) -> _HostPool:
+        key = (scheme, netloc)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                limit = self.host_limits.get(netloc, self.max_per_host)
+                pool = _HostPool(limit)
+                self._pools[key] = pool
+            return pool
+
+    def _connect(self, scheme: str, netloc: str, timeout: float):
+        if scheme == "https":
+            return http.client.HTTPSConnection(
+                netloc, timeout=timeout, context=self._ssl_context
+            )
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=timeout)
+        raise HTTPClientError(f"Esquema nao suportado: {scheme}")
+
+    def open(
+        self, url: str, headers: dict | None = None, timeout: float = 30
+    ) -> PooledResponse:
+        """Executa um GET seguindo redirecionamentos e devolve a resposta aberta."""
+        request_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": accept_encoding(),
+            "Connection": "keep-alive",
+        }
+        request_headers.update(headers or {})
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(url, request_headers, timeout)
+            location = response.headers.get("Location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            response.read()
+            url = urllib.parse.urljoin(url, location)
+        raise HTTPClientError(f"Excesso de redirecionamentos para {url}")
+
+    def _send(self, url: str, headers: dict, timeout: float) -> PooledResponse:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        pool = self._pool(scheme, netloc)
+        pool.slots.acquire()
+        try:
+            conn = pool.take_idle()
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = self._connect(scheme, netloc, timeout)
+                else:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                try:
+                    conn.request("GET", target, headers=headers)
+                    raw = conn.getresponse()
+                    return PooledResponse(pool, conn, raw, url)
+                except _STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    conn, reused = None, False
+                except BaseException:
+                    conn.close()
+                    raise
+        except BaseException:
+            pool.slots.release()
+            raise
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close_all()
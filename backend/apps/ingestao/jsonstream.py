@@ -0,0 +1,123 @@
+"""Leitura incremental de arrays JSON grandes.
+
+Os payloads da TopSolutions e do TCE-RN chegam como ``[...]`` ou como
+``{"metadata": ..., "data": [...]}``. ``iter_json_rows`` devolve os itens do
+array um a um a partir de blocos de bytes (ou texto), mantendo em memoria
+apenas o bloco atual e o item em decodificacao.
+"""
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Anexa o proximo bloco ao buffer, descartando o trecho ja consumido."""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self._append(chunk)
+                return True
+        self.eof = True
+        tail = self._utf8.decode(b"", final=True)
+        if tail:
+            self._append(tail)
+            return True
+        return False
+
+    def _append(self, chunk: str):
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Avanca espacos em branco e devolve o proximo caractere ("" no fim)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON invalido: esperado {char!r}, encontrado {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Um numero no fim do buffer pode estar truncado; so aceitamos o
+            # valor quando ha um caractere depois dele ou o stream acabou.
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(buffer: _Buffer):
+    buffer.expect("[")
+    while True:
+        char = buffer.peek()
+        if char == "]":
+            buffer.pos += 1
+            return
+        if char == ",":
+            buffer.pos += 1
+            continue
+        if char == "":
+            raise ValueError("JSON invalido: array nao terminado")
+        yield buffer.value()
+
+
+def iter_json_rows(chunks, key: str = "data"):
+    """Itera os itens de um array JSON no topo ou no campo ``key`` de um objeto."""
+    buffer = _Buffer(chunks)
+    if buffer.peek() == "\ufeff":
+        buffer.pos += 1
+
+    first = buffer.peek()
+    if first == "[":
+        yield from _iter_array(buffer)
+        return
+    if first == "":
+        return
+    buffer.expect("{")
+    while True:
+        char = buffer.peek()
+        if char in ("}", ""):
+            return
+        if char == ",":
+            buffer.pos += 1
+            continue
+        name = buffer.value()
+        buffer.expect(":")
+        if name == key and buffer.peek() == "[":
+            yield from _iter_array(buffer)
+            return
+        buffer.value()
+
+
+def iter_json_file(path, key: str = "data", chunk_size: int = 64 * 1024):
+    with open(path, "rb") as handle:
+        yield from iter_json_rows(iter(lambda: handle.read(chunk_size), b""), key=key)
@@ -0,0 +1,94 @@
+import abc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.ingestao.http_cache import ResponseCache, fetch_session
+from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+
+
+class SyncCommand(BaseCommand, metaclass=abc.ABCMeta):
+    """Base dos comandos ``sync_*``: coleta, grava snapshots e registra SyncRun.
+
+    As subclasses definem ``fonte``, ``fetch(options)`` e
+    ``write(payload, options)``; este ultimo devolve a quantidade de
+    registros gravados. Se todas as URLs consultadas responderem sem
+    alteracao (304 ou mesmo sha256), a escrita e pulada e a execucao fica
+    com status ``sem_alteracao``; o payload pode trazer ``CorpoEmCache``
+    (ver ``http_cache.carregar``), decodificado so dentro de ``write``.
+    As opcoes resolvidas ficam em ``opcoes`` (usadas pelas tasks de carga).
+    As respostas novas so entram no cache HTTP depois que ``write`` termina:
+    se a escrita falhar, a proxima execucao baixa e grava tudo de novo.
+    """
+
+    fonte = ""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cache-dir",
+            type=str,
+            default=str(settings.INGESTAO_HTTP_CACHE_DIR),
+            help="Diretorio do cache HTTP dos conectores.",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignora o cache HTTP e baixa tudo novamente.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regrava os snapshots mesmo sem alteracao na origem.",
+        )
+
+    @abc.abstractmethod
+    def fetch(self, options):
+        """Coleta o payload; roda dentro da ``fetch_session``."""
+
+    @abc.abstractmethod
+    def write(self, payload, options) -> int:
+        """Grava os snapshots e devolve a quantidade de registros."""
+
+    def _cache(self, options):
+        if options.get("no_cache"):
+            return None
+        return ResponseCache(
+            options["cache_dir"],
+            ttl=settings.INGESTAO_HTTP_CACHE_TTL,
+            max_bytes=settings.INGESTAO_HTTP_CACHE_MAX_BYTES,
+        )
+
+    def handle(self, *args, **options):
+        self.opcoes = options
+        run = self.run = iniciar_execucao(self.fonte)
+        session = None
+        try:
+            with fetch_session(self._cache(options), confirmar=False) as session:
+                payload = self.fetch(options)
+            if session.unchanged and not options.get("force"):
+                session.confirmar()
+                finalizar_execucao(run, "sem_alteracao", session.resumo())
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sem alteracoes na origem ({self.fonte}); snapshots mantidos."
+                    )
+                )
+                return
+            registros = self.write(payload, options)
+            session.confirmar()
+            finalizar_execucao(
+                run, "sucesso", session.resumo(), registro_count=registros
+            )
+        except Exception as exc:  # noqa: BLE001
+            if session is not None:
+                session.descartar()
+            finalizar_execucao(run, "erro", str(exc), erro_count=1)
+            raise
+
+
+def contar_registros(payload) -> int:
+    if isinstance(payload, dict) and isinstance(payload.get("data"), list):
+        return len(payload["data"])
+    if isinstance(payload, list):
+        return len(payload)
+    return 1 if payload else 0
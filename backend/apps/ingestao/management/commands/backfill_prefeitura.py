@@ -0,0 +1,124 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.contratacoes.categorias import classificar_contratacoes
+from apps.ingestao.backfill import (
+    PASSOS,
+    RECURSOS,
+    BackfillCheckpoint,
+    executar_backfill,
+    gerar_janelas,
+)
+from apps.ingestao.connectors import FETCH_MAX_WORKERS, _fetch_json, prefeitura_url
+from apps.ingestao.provenance import ProvenanceRecorder
+from apps.ingestao.services import atualizar_busca, finalizar_execucao, iniciar_execucao
+from apps.monitoramento.services import recalcular_kpis
+from apps.pessoal.services import vincular_secretarias
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill historico da prefeitura (TopSolutions) em janelas mensais ou "
+        "trimestrais, carregando direto no banco e retomando do checkpoint."
+    )
+
+    fonte = "backfill_prefeitura"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            type=str,
+            default="https://pmtibausulrn.apitransparencia.topsolutionsrn.com.br",
+        )
+        parser.add_argument("--ano-inicio", type=int, default=2017)
+        parser.add_argument("--ano-fim", type=int, default=date.today().year)
+        parser.add_argument(
+            "--janela",
+            choices=sorted(PASSOS),
+            default="mes",
+            help="Tamanho das janelas de licitacoes e contratos.",
+        )
+        parser.add_argument(
+            "--recurso",
+            action="append",
+            choices=RECURSOS,
+            help="Recurso a carregar (pode repetir). Padrao: todos.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=FETCH_MAX_WORKERS,
+            help="Janelas baixadas em paralelo.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=str,
+            default=str(settings.INGESTAO_BACKFILL_CHECKPOINT_FILE),
+            help="Arquivo JSON com as janelas ja concluidas.",
+        )
+        parser.add_argument(
+            "--reiniciar",
+            action="store_true",
+            help="Descarta o checkpoint e baixa todas as janelas novamente.",
+        )
+
+    def handle(self, *args, **options):
+        if options["ano_inicio"] > options["ano_fim"]:
+            raise CommandError("--ano-inicio deve ser menor ou igual a --ano-fim.")
+        checkpoint = BackfillCheckpoint(options["checkpoint"])
+        if options["reiniciar"]:
+            checkpoint.limpar()
+        hoje = date.today()
+        janelas = gerar_janelas(
+            options["ano_inicio"],
+            options["ano_fim"],
+            options["janela"],
+            options["recurso"] or RECURSOS,
+            hoje=hoje,
+        )
+        base_url = options["base_url"]
+
+        def fetch(janela):
+            recurso, inicio, fim = janela
+            return _fetch_json(prefeitura_url(base_url, recurso, inicio, fim))
+
+        run = self.run = iniciar_execucao(self.fonte)
+        try:
+            resultado = executar_backfill(
+                janelas,
+                fetch,
+                checkpoint,
+                ProvenanceRecorder(),
+                max_workers=options["max_workers"],
+                hoje=hoje,
+            )
+            vincular_secretarias()
+            classificar_contratacoes()
+            atualizar_busca()
+            recalcular_kpis()
+        except Exception as exc:  # noqa: BLE001
+            finalizar_execucao(run, "erro", str(exc), erro_count=1)
+            raise
+
+        falhas = resultado["falhas"]
+        mensagem = (
+            f"{resultado['janelas']} janelas carregadas, "
+            f"{resultado['puladas']} ja concluidas, {len(falhas)} com falha"
+        )
+        finalizar_execucao(
+            run,
+            "erro" if falhas else "sucesso",
+            mensagem,
+            registro_count=resultado["registros"],
+            erro_count=len(falhas),
+            delta=resultado["delta"],
+        )
+        for chave, erro in sorted(falhas):
+            self.stderr.write(f"  {chave}: {erro}")
+        if falhas:
+            raise CommandError(
+                f"Backfill incompleto: {mensagem}. Rode novamente para retomar."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Backfill concluido: {mensagem}."))
@@ -17,6 +17,7 @@ from pathlib import Path
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
+from apps.contratacoes.categorias import classificar_contratacoes
 from apps.contratacoes.models import Contrato, Licitacao
 from apps.financas.models import (
     DespesaSecretaria,
@@ -26,11 +27,63 @@ from apps.financas.models import (
 )
 from apps.fornecedores.models import Fornecedor
 from apps.governanca.models import Secretaria
+from apps.ingestao.bulk import apply_delta
+from apps.ingestao.jsonstream import iter_json_file
 from apps.ingestao.models import SyncRun
 from apps.ingestao.normalization import normalize_cnpj, normalize_text
-from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+from apps.ingestao.provenance import ProvenanceRecorder
+from apps.ingestao.services import (
+    atualizar_busca,
+    finalizar_execucao,
+    iniciar_execucao,
+    somar_delta,
+)
 from apps.monitoramento.models import Alerta
+from apps.monitoramento.services import recalcular_kpis
 from apps.pessoal.models import Servidor
+from apps.pessoal.services import vincular_secretarias
+
+EMENDA_FIELDS = (
+    "numero",
+    "ano",
+    "autoria",
+    "tipo",
+    "origem_recurso",
+    "objeto",
+    "funcao_governo",
+    "beneficiario",
+    "unidade",
+    "valor_previsto",
+    "valor_empenhado",
+    "valor_liquidado",
+    "valor_pago",
+    "data_emenda",
+)
+ORCAMENTO_FIELDS = (
+    "ano",
+    "orgao_cod",
+    "unidade",
+    "acao",
+    "funcao",
+    "subfuncao",
+    "natureza_despesa",
+    "elemento_despesa",
+    "fonte_recurso",
+    "valor_inicial",
+    "valor_atualizado",
+    "valor_disponivel",
+)
+SERVIDOR_FIELDS = (
+    "matricula",
+    "nome",
+    "orgao",
+    "vinculo",
+    "valor_bruto",
+    "valor_liquido",
+    "cargo",
+    "funcao",
+    "carga_horaria",
+)
 
 
 def _dec(value):
@@ -91,8 +144,10 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Nao encontrado: {data_dir}"))
             return
 
-        run = iniciar_execucao("investigation_data")
+        run = self.run = iniciar_execucao("investigation_data")
         total = 0
+        self._delta = {}
+        self._provenance = ProvenanceRecorder()
         try:
             total += self._load_tce_licitacoes(data_dir)
             total += self._load_tce_contratos(data_dir)
@@ -105,16 +160,31 @@ class Command(BaseCommand):
             total += self._load_gestores(exports_dir)
             total += self._fix_sync_runs()
             total += self._generate_alerts()
+            self._provenance.flush()
+            vincular_secretarias()
+            classificar_contratacoes()
+            atualizar_busca()
+            recalcular_kpis()
 
             finalizar_execucao(
                 run, "sucesso", f"Investigation data loaded: {total} registros",
                 registro_count=total,
+                delta=self._delta,
             )
             self.stdout.write(self.style.SUCCESS(f"Carga finalizada: {total} registros"))
         except Exception as exc:
             finalizar_execucao(run, "erro", str(exc), registro_count=total, erro_count=1)
             raise
 
+    def _apply_delta(self, model, rows, key_fields, fields, **kwargs):
+        resultado = apply_delta(model, rows, key_fields, fields, **kwargs)
+        somar_delta(self._delta, resultado)
+        self.stdout.write(
+            f"  delta: +{resultado['inseridos']} ~{resultado['atualizados']} "
+            f"-{resultado['removidos']} ={resultado['inalterados']}"
+        )
+        return resultado
+
     def _load_json(self, data_dir, filename):
         fp = data_dir / filename
         if not fp.exists():
@@ -123,6 +193,22 @@ class Command(BaseCommand):
         data = json.loads(fp.read_text(encoding="utf-8"))
         return data if isinstance(data, list) else data.get("data", [])
 
+    def _tracked(self, rows, fonte, endpoint, recurso, id_field):
+        """Registra a proveniencia de cada linha conforme ela e consumida."""
+        for row in rows:
+            self._provenance.track(
+                fonte, endpoint, recurso, str(row.get(id_field) or ""), row
+            )
+            yield row
+
+    def _iter_json(self, data_dir, filename):
+        """Como ``_load_json``, mas devolve um iterador que le o arquivo aos poucos."""
+        fp = data_dir / filename
+        if not fp.exists():
+            self.stdout.write(f"  SKIP {filename} (nao encontrado)")
+            return iter(())
+        return iter_json_file(fp)
+
     # ── TCE-RN Licitações ──────────────────────────────────
     def _load_tce_licitacoes(self, data_dir):
         self.stdout.write("\n=== TCE-RN Licitacoes ===")
@@ -136,6 +222,9 @@ class Command(BaseCommand):
             num = str(row.get("numeroLicitacao") or "").strip()
             ano = str(row.get("anoLicitacao") or "").strip()
             key = f"{num}-{ano}"
+            self._provenance.track(
+                "tce_rn", "tce-licitacoes-2025-full.json", "licitacao", key, row
+            )
             if key not in dedup:
                 dedup[key] = {
                     "certame": num,
@@ -193,6 +282,9 @@ class Command(BaseCommand):
                 cnpj = normalize_cnpj(row.get("cpfcnpjContratado") or "")
                 empresa = normalize_text(row.get("nomeContratado") or "Nao informado")
                 valor = _dec(row.get("valorContrato"))
+                self._provenance.track(
+                    "tce_rn", "tce-contratos-full.json", "contrato", numero, row
+                )
 
                 Contrato.objects.update_or_create(
                     numero=numero,
@@ -296,27 +388,32 @@ class Command(BaseCommand):
         if not rows:
             return 0
 
-        count = 0
-        with transaction.atomic():
-            Emenda.objects.all().delete()  # Replace all
-            for row in rows:
-                Emenda.objects.create(
-                    numero=str(row.get("numEmenda") or "").strip(),
-                    ano=row.get("anoEmenda") or 2025,
-                    autoria=(row.get("autoria") or "").strip(),
-                    tipo=(row.get("txtTipoEmenda") or "").strip(),
-                    origem_recurso=(row.get("txtOrigemRecurso") or "").strip(),
-                    objeto=(row.get("objeto") or "").strip(),
-                    funcao_governo=(row.get("txtFuncaoGoverno") or "").strip(),
-                    beneficiario=(row.get("txtBeneficiario") or "").strip(),
-                    unidade=(row.get("txtDescricaoUnidade") or "").strip(),
-                    valor_previsto=_dec(row.get("vlrPrevisto")),
-                    valor_empenhado=_dec(row.get("vlrEmpenhado")),
-                    valor_liquidado=_dec(row.get("vlrLiquidado")),
-                    valor_pago=_dec(row.get("vlrPago")),
-                    data_emenda=_parse_date_iso(row.get("dtEmenda")),
-                )
-                count += 1
+        emendas = (
+            {
+                "numero": str(row.get("numEmenda") or "").strip(),
+                "ano": row.get("anoEmenda") or 2025,
+                "autoria": (row.get("autoria") or "").strip(),
+                "tipo": (row.get("txtTipoEmenda") or "").strip(),
+                "origem_recurso": (row.get("txtOrigemRecurso") or "").strip(),
+                "objeto": (row.get("objeto") or "").strip(),
+                "funcao_governo": (row.get("txtFuncaoGoverno") or "").strip(),
+                "beneficiario": (row.get("txtBeneficiario") or "").strip(),
+                "unidade": (row.get("txtDescricaoUnidade") or "").strip(),
+                "valor_previsto": _dec(row.get("vlrPrevisto")),
+                "valor_empenhado": _dec(row.get("vlrEmpenhado")),
+                "valor_liquidado": _dec(row.get("vlrLiquidado")),
+                "valor_pago": _dec(row.get("vlrPago")),
+                "data_emenda": _parse_date_iso(row.get("dtEmenda")),
+            }
+            for row in self._tracked(
+                rows, "topsolutions", "ts-emendas-full.json", "emenda", "numEmenda"
+            )
+        )
+        # So os exercicios presentes no arquivo sao sincronizados.
+        self._apply_delta(
+            Emenda, emendas, ("numero", "ano"), EMENDA_FIELDS, escopo="ano"
+        )
+        count = len(rows)
 
         self.stdout.write(f"  {count} emendas")
         return count
@@ -324,42 +421,57 @@ class Command(BaseCommand):
     # ── TopSolutions Orçamento ─────────────────────────────
     def _load_ts_orcamento(self, data_dir):
         self.stdout.write("\n=== TopSolutions Orcamento ===")
-        rows = self._load_json(data_dir, "ts-orcamento-2025-full.json")
-        if not rows:
-            return 0
+        rows = self._tracked(
+            self._iter_json(data_dir, "ts-orcamento-2025-full.json"),
+            "topsolutions",
+            "ts-orcamento-2025-full.json",
+            "orcamento_item",
+            "codOrgao",
+        )
+        unidades = set()
 
-        count = 0
-        with transaction.atomic():
-            OrcamentoItem.objects.all().delete()  # Replace all
+        def itens():
             for row in rows:
                 unidade = (row.get("txtDescricaoUnidade") or "").strip()
-                OrcamentoItem.objects.create(
-                    ano=row.get("numExercicioFinanc") or 2025,
-                    orgao_cod=(row.get("codOrgao") or "").strip(),
-                    unidade=unidade,
-                    acao=(row.get("txtDescricaoAcao") or "").strip(),
-                    funcao=(row.get("txtDescricaoFuncao") or "").strip(),
-                    subfuncao=(row.get("txtDescricaoSubFuncao") or "").strip(),
-                    natureza_despesa=(
-                        row.get("codNaturezaDespesa") or ""
-                    ).strip(),
-                    elemento_despesa=(
+                if unidade:
+                    unidades.add(normalize_text(unidade))
+                yield {
+                    "ano": row.get("numExercicioFinanc") or 2025,
+                    "orgao_cod": (row.get("codOrgao") or "").strip(),
+                    "unidade": unidade,
+                    "acao": (row.get("txtDescricaoAcao") or "").strip(),
+                    "funcao": (row.get("txtDescricaoFuncao") or "").strip(),
+                    "subfuncao": (row.get("txtDescricaoSubFuncao") or "").strip(),
+                    "natureza_despesa": (row.get("codNaturezaDespesa") or "").strip(),
+                    "elemento_despesa": (
                         row.get("txtDescricaoElementoDespesa") or ""
                     ).strip(),
-                    fonte_recurso=(
+                    "fonte_recurso": (
                         row.get("txtDescricaoFonteRecurso") or ""
                     ).strip()[:255],
-                    valor_inicial=_dec(row.get("vlrOrcamentoInicial")),
-                    valor_atualizado=_dec(row.get("vlrOrcamentoAtualizado")),
-                    valor_disponivel=_dec(row.get("vlrDisponivel")),
-                )
-                count += 1
+                    "valor_inicial": _dec(row.get("vlrOrcamentoInicial")),
+                    "valor_atualizado": _dec(row.get("vlrOrcamentoAtualizado")),
+                    "valor_disponivel": _dec(row.get("vlrDisponivel")),
+                }
 
-                # Ensure secretaria exists
-                if unidade:
-                    Secretaria.objects.get_or_create(
-                        nome=normalize_text(unidade)
-                    )
+        with transaction.atomic():
+            # O arquivo e lido em streaming; so os exercicios presentes nele
+            # sao comparados e podem ter linhas removidas.
+            resultado = self._apply_delta(
+                OrcamentoItem,
+                itens(),
+                ("ano", "orgao_cod", "acao", "elemento_despesa", "fonte_recurso"),
+                ORCAMENTO_FIELDS,
+                escopo="ano",
+            )
+            # Ensure secretaria exists
+            Secretaria.objects.bulk_create(
+                [Secretaria(nome=nome) for nome in sorted(unidades)],
+                ignore_conflicts=True,
+            )
+        count = (
+            resultado["inseridos"] + resultado["atualizados"] + resultado["inalterados"]
+        )
 
         self.stdout.write(f"  {count} itens orcamentarios")
         return count
@@ -412,13 +524,13 @@ class Command(BaseCommand):
             self.stdout.write("  SKIP (nao encontrado)")
             return 0
 
-        self.stdout.write("  Lendo arquivo (68MB)...")
-        rows = json.loads(fp.read_text(encoding="utf-8"))
-        self.stdout.write(f"  {len(rows)} registros brutos")
+        self.stdout.write("  Lendo arquivo em streaming (68MB)...")
 
         # Deduplicate by matricula, keeping the LATEST dtMesAno
         dedup = {}
-        for row in rows:
+        total_rows = 0
+        for row in iter_json_file(fp):
+            total_rows += 1
             mat = str(row.get("numMatricula") or "").strip()
             nome = (row.get("nome") or "").strip()
             if not mat and not nome:
@@ -447,39 +559,26 @@ class Command(BaseCommand):
                     "_dt": dt,
                 }
 
+        self.stdout.write(f"  {total_rows} registros brutos")
         self.stdout.write(f"  {len(dedup)} servidores unicos (dedup por matricula)")
 
-        count = 0
         with transaction.atomic():
-            Servidor.objects.all().delete()  # Full replace with fresh data
-            batch = []
-            for item in dedup.values():
-                batch.append(
-                    Servidor(
-                        matricula=item["matricula"],
-                        nome=item["nome"],
-                        orgao=item["orgao"],
-                        vinculo=item["vinculo"],
-                        valor_bruto=item["valor_bruto"],
-                        valor_liquido=item["valor_liquido"],
-                        cargo=item["cargo"],
-                        funcao=item["funcao"],
-                        carga_horaria=item["carga_horaria"],
-                    )
-                )
-                if len(batch) >= 500:
-                    Servidor.objects.bulk_create(batch)
-                    count += len(batch)
-                    batch = []
-
-            if batch:
-                Servidor.objects.bulk_create(batch)
-                count += len(batch)
+            # A folha traz todos os servidores ativos: a tabela inteira e
+            # sincronizada, como no "apaga e recria" anterior.
+            self._apply_delta(
+                Servidor,
+                dedup.values(),
+                ("matricula",),
+                SERVIDOR_FIELDS,
+            )
 
             # Ensure secretarias exist for all orgaos
             orgaos = set(item["orgao"] for item in dedup.values() if item["orgao"])
-            for orgao in orgaos:
-                Secretaria.objects.get_or_create(nome=orgao)
+            Secretaria.objects.bulk_create(
+                [Secretaria(nome=orgao) for orgao in sorted(orgaos)],
+                ignore_conflicts=True,
+            )
+        count = len(dedup)
 
         self.stdout.write(self.style.SUCCESS(f"  {count} servidores carregados"))
         return count
@@ -548,7 +647,6 @@ class Command(BaseCommand):
     # ── Generate Smart Alerts ──────────────────────────────
     def _generate_alerts(self):
         self.stdout.write("\n=== Gerando Alertas Analiticos ===")
-        Alerta.objects.all().delete()  # Fresh alerts
         alertas = []
 
         # 1. Supplier concentration
@@ -716,6 +814,20 @@ class Command(BaseCommand):
                     ),
                 ))
 
-        Alerta.objects.bulk_create(alertas)
+        # Alertas que continuam valendo mantem o registro (e o criado_em).
+        self._apply_delta(
+            Alerta,
+            [
+                {
+                    "codigo": alerta.codigo,
+                    "titulo": alerta.titulo,
+                    "severidade": alerta.severidade,
+                    "detalhes": alerta.detalhes,
+                }
+                for alerta in alertas
+            ],
+            ("codigo",),
+            ("codigo", "titulo", "severidade", "detalhes"),
+        )
         self.stdout.write(f"  {len(alertas)} alertas gerados")
         return len(alertas)
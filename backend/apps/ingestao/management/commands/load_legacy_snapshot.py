@@ -1,24 +1,28 @@
 import json
 from decimal import Decimal
-from hashlib import sha256
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
+from apps.contratacoes.categorias import classificar_contratacoes
 from apps.contratacoes.models import Contrato, Licitacao
 from apps.financas.models import DespesaSecretaria, ReceitaResumo
 from apps.fornecedores.models import Fornecedor
 from apps.governanca.models import Secretaria
-from apps.ingestao.models import DataProvenance
+from apps.ingestao.backfill import FONTE
+from apps.ingestao.bulk import bulk_upsert
 from apps.ingestao.normalization import (
     fornecedor_dedupe_key,
     normalize_cnpj,
     normalize_text,
     servidor_dedupe_key,
 )
-from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+from apps.ingestao.provenance import ProvenanceRecorder
+from apps.ingestao.services import atualizar_busca, finalizar_execucao, iniciar_execucao
 from apps.legislativo.models import Vereador
+from apps.monitoramento.services import recalcular_kpis
 from apps.pessoal.models import Servidor
+from apps.pessoal.services import vincular_secretarias
 
 
 def as_decimal(value):
@@ -30,6 +34,8 @@ def as_decimal(value):
 class Command(BaseCommand):
     help = "Carrega dados da snapshot legada (JSON) para o banco Django."
 
+    fonte = "legacy_snapshot"
+
     def add_arguments(self, parser):
         parser.add_argument(
             "--data-dir",
@@ -50,14 +56,20 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Diretorio nao encontrado: {data_dir}"))
             return
 
-        run = iniciar_execucao("legacy_snapshot")
+        run = self.run = iniciar_execucao(self.fonte)
         total_registros = 0
+        self._provenance = ProvenanceRecorder()
         try:
             total_registros += self._load_vereadores()
             total_registros += self._load_financas(data_dir)
             total_registros += self._load_contratacoes(data_dir)
             total_registros += self._load_fornecedores(data_dir)
             total_registros += self._load_servidores(data_dir)
+            self._provenance.flush()
+            vincular_secretarias()
+            classificar_contratacoes()
+            atualizar_busca()
+            recalcular_kpis()
 
             finalizar_execucao(
                 run,
@@ -86,18 +98,20 @@ class Command(BaseCommand):
             ("Manoel Padi", "UNIAO"),
             ("Mourinha", "UNIAO"),
         ]
-        count = 0
         for nome, partido in vereadores:
-            Vereador.objects.update_or_create(
-                nome=nome,
-                mandato="2025-2028",
-                defaults={"partido": partido},
-            )
-            self._track(
+            self._provenance.track(
                 "manual", "seed_vereadores_2025", "vereador", nome, {"partido": partido}
             )
-            count += 1
-        return count
+        bulk_upsert(
+            Vereador,
+            [
+                {"nome": nome, "mandato": "2025-2028", "partido": partido}
+                for nome, partido in vereadores
+            ],
+            key_fields=["nome", "mandato"],
+            update_fields=["partido"],
+        )
+        return len(vereadores)
 
     def _load_financas(self, data_dir: Path):
         receitas_payload = json.loads(
@@ -113,7 +127,7 @@ class Command(BaseCommand):
         for row in receitas_payload.get("data", []):
             total_previsao += as_decimal(row.get("vlrPrevisaoAtualizado"))
             total_arrecadacao += as_decimal(row.get("vlrArrecadacao"))
-            self._track(
+            self._provenance.track(
                 "legacy_snapshot",
                 "receitas2025.json",
                 "receita",
@@ -130,24 +144,24 @@ class Command(BaseCommand):
             },
         )
 
+        despesas = []
         for row in despesas_payload.get("data", []):
             if int(row.get("exercicio", 0)) != 2025:
                 continue
             secretaria_nome = normalize_text(
                 row.get("txtDescricaoUnidade") or "SEM SECRETARIA"
             )
-            Secretaria.objects.get_or_create(nome=secretaria_nome)
-            DespesaSecretaria.objects.update_or_create(
-                ano=2025,
-                secretaria=secretaria_nome,
-                defaults={
+            despesas.append(
+                {
+                    "ano": 2025,
+                    "secretaria": secretaria_nome,
                     "orcamento": as_decimal(row.get("vlrOrcadoAtualizado")),
                     "empenhado": as_decimal(row.get("vlrEmpenhado")),
                     "liquidado": as_decimal(row.get("vlrLiquidado")),
                     "pago": as_decimal(row.get("vlrPago")),
-                },
+                }
             )
-            self._track(
+            self._provenance.track(
                 "legacy_snapshot",
                 "despesasOrgao2025.json",
                 "despesa_secretaria",
@@ -155,6 +169,14 @@ class Command(BaseCommand):
                 row,
             )
             count += 1
+
+        self._ensure_secretarias(item["secretaria"] for item in despesas)
+        bulk_upsert(
+            DespesaSecretaria,
+            despesas,
+            key_fields=["ano", "secretaria"],
+            update_fields=["orcamento", "empenhado", "liquidado", "pago"],
+        )
         return count
 
     def _load_contratacoes(self, data_dir: Path):
@@ -166,16 +188,19 @@ class Command(BaseCommand):
         )
 
         count = 0
+        licitacoes = []
         for row in licitacoes_payload.get("data", []):
-            Licitacao.objects.update_or_create(
-                certame=normalize_text(str(row.get("numCertame") or "")),
-                defaults={
+            licitacoes.append(
+                {
+                    "certame": normalize_text(str(row.get("numCertame") or "")),
+                    "ano": 2025,
+                    "fonte": FONTE,
                     "modalidade": normalize_text(row.get("txtModalidadeLicit") or ""),
                     "objeto": row.get("txtObjeto") or "",
                     "valor": as_decimal(row.get("vlrTotal")),
-                },
+                }
             )
-            self._track(
+            self._provenance.track(
                 "legacy_snapshot",
                 "licitacoes2025.json",
                 "licitacao",
@@ -184,19 +209,31 @@ class Command(BaseCommand):
             )
             count += 1
 
+        # A snapshot e a exportacao 2025 da TopSolutions: mesma chave do
+        # backfill, sem tocar nas linhas do TCE-RN nem de outros exercicios.
+        bulk_upsert(
+            Licitacao,
+            licitacoes,
+            key_fields=["certame", "ano", "fonte"],
+            update_fields=["modalidade", "objeto", "valor"],
+        )
+
+        contratos = []
         for row in contratos_payload.get("data", []):
-            Contrato.objects.update_or_create(
-                numero=normalize_text(str(row.get("numContrato") or "")),
-                empresa=normalize_text(
-                    row.get("txtNomeRazaoContratada") or "Nao informado"
-                ),
-                defaults={
+            contratos.append(
+                {
+                    "numero": normalize_text(str(row.get("numContrato") or "")),
+                    "empresa": normalize_text(
+                        row.get("txtNomeRazaoContratada") or "Nao informado"
+                    ),
+                    "ano": 2025,
+                    "fonte": FONTE,
                     "modalidade": normalize_text(row.get("txtModalidade") or ""),
                     "objeto": row.get("txtObjeto") or "",
                     "valor": as_decimal(row.get("vlrContrato")),
-                },
+                }
             )
-            self._track(
+            self._provenance.track(
                 "legacy_snapshot",
                 "contratos2025.json",
                 "contrato",
@@ -204,6 +241,12 @@ class Command(BaseCommand):
                 row,
             )
             count += 1
+        bulk_upsert(
+            Contrato,
+            contratos,
+            key_fields=["numero", "empresa", "ano", "fonte"],
+            update_fields=["modalidade", "objeto", "valor"],
+        )
         return count
 
     def _load_fornecedores(self, data_dir: Path):
@@ -225,14 +268,7 @@ class Command(BaseCommand):
             acumulado[key]["valor_total"] += as_decimal(row.get("vlrContrato"))
 
         for payload in acumulado.values():
-            Fornecedor.objects.update_or_create(
-                nome=payload["nome"],
-                defaults={
-                    "cnpj": payload["cnpj"],
-                    "valor_total": payload["valor_total"],
-                },
-            )
-            self._track(
+            self._provenance.track(
                 "legacy_snapshot",
                 "contratos2025.json",
                 "fornecedor",
@@ -240,6 +276,12 @@ class Command(BaseCommand):
                 payload,
             )
             count += 1
+        bulk_upsert(
+            Fornecedor,
+            acumulado.values(),
+            key_fields=["nome"],
+            update_fields=["cnpj", "valor_total"],
+        )
         return count
 
     def _load_servidores(self, data_dir: Path):
@@ -253,27 +295,30 @@ class Command(BaseCommand):
 
         count = 0
         dedupe = {}
+        orgaos = set()
         for row in rows:
             orgao = normalize_text(row.get("orgao") or "SEM ORGAO")
-            Secretaria.objects.get_or_create(nome=orgao)
+            orgaos.add(orgao)
             key = servidor_dedupe_key(
                 row.get("nome"), orgao, row.get("vinculo"), row.get("numMatricula")
             )
             dedupe[key] = row
 
+        self._ensure_secretarias(orgaos)
+
+        servidores = []
         for row in dedupe.values():
-            orgao = normalize_text(row.get("orgao") or "SEM ORGAO")
-            Servidor.objects.update_or_create(
-                nome=normalize_text(row.get("nome") or ""),
-                orgao=orgao,
-                defaults={
+            servidores.append(
+                {
+                    "nome": normalize_text(row.get("nome") or ""),
+                    "orgao": normalize_text(row.get("orgao") or "SEM ORGAO"),
                     "matricula": normalize_text(str(row.get("numMatricula") or "")),
                     "vinculo": normalize_text(row.get("vinculo") or ""),
                     "valor_bruto": as_decimal(row.get("vlrRemuneracaoBruta")),
                     "valor_liquido": as_decimal(row.get("vlrRemuAposDescObrig")),
-                },
+                }
             )
-            self._track(
+            self._provenance.track(
                 "legacy_snapshot",
                 "servidores2025.json",
                 "servidor",
@@ -281,23 +326,16 @@ class Command(BaseCommand):
                 row,
             )
             count += 1
+        bulk_upsert(
+            Servidor,
+            servidores,
+            key_fields=["nome", "orgao"],
+            update_fields=["matricula", "vinculo", "valor_bruto", "valor_liquido"],
+        )
         return count
 
-    def _track(
-        self, fonte: str, endpoint: str, recurso: str, external_id: str, payload
-    ):
-        payload_hash = sha256(
-            json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode(
-                "utf-8"
-            )
-        ).hexdigest()
-        DataProvenance.objects.update_or_create(
-            payload_hash=payload_hash,
-            defaults={
-                "fonte": fonte,
-                "endpoint": endpoint,
-                "recurso": recurso,
-                "external_id": str(external_id)[:120],
-                "versao": "v1",
-            },
+    def _ensure_secretarias(self, nomes):
+        Secretaria.objects.bulk_create(
+            [Secretaria(nome=nome) for nome in sorted(set(nomes))],
+            ignore_conflicts=True,
         )
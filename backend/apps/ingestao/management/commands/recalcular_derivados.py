@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.contratacoes.categorias import classificar_contratacoes
+from apps.ingestao.services import atualizar_busca, atualizar_normalizados
+from apps.monitoramento.services import recalcular_kpis
+from apps.pessoal.services import vincular_secretarias
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os dados derivados das tabelas carregadas sem passar pelas "
+        "cargas (ex.: loaddata)."
+    )
+
+    def handle(self, *args, **options):
+        normalizados = atualizar_normalizados()
+        vinculados = vincular_secretarias()
+        classificar_contratacoes()
+        atualizar_busca()
+        recalcular_kpis()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Nomes normalizados atualizados: {normalizados}; "
+                f"servidores com secretaria alterada: {vinculados}"
+            )
+        )
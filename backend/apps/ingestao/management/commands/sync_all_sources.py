@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ingestao.tasks import FONTES, sincronizar_fontes
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispara a sincronizacao das fontes no Celery: uma cadeia "
+        "coleta -> carga por fonte, em paralelo nos workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fonte",
+            action="append",
+            choices=sorted(FONTES),
+            help="Fonte a sincronizar (pode repetir). Padrao: todas.",
+        )
+
+    def handle(self, *args, **options):
+        fontes = options["fonte"] or list(FONTES)
+        try:
+            resultado = sincronizar_fontes.delay(fontes)
+        except Exception as exc:  # noqa: BLE001
+            raise CommandError(f"Falha ao enfileirar sincronizacao: {exc}") from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sincronizacao enfileirada ({', '.join(fontes)}): {resultado.id}"
+            )
+        )
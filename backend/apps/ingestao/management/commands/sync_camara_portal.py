@@ -1,15 +1,18 @@
 import json
 from pathlib import Path
 
-from django.core.management.base import BaseCommand
-
 from apps.ingestao.connectors import fetch_camara_portal
+from apps.ingestao.http_cache import carregar
+from apps.ingestao.management.base import SyncCommand
 
 
-class Command(BaseCommand):
+class Command(SyncCommand):
     help = "Consulta snapshot da camara via endpoint init/data do Portal CR2."
 
+    fonte = "sync_camara_portal"
+
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             "--url",
             type=str,
@@ -26,11 +29,14 @@ class Command(BaseCommand):
             ),
         )
 
-    def handle(self, *args, **options):
-        payload = fetch_camara_portal(options["url"])
+    def fetch(self, options):
+        return fetch_camara_portal(options["url"])
+
+    def write(self, payload, options):
         output_file = Path(options["output_file"])
         output_file.parent.mkdir(parents=True, exist_ok=True)
         output_file.write_text(
-            json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            json.dumps(carregar(payload), ensure_ascii=False), encoding="utf-8"
         )
         self.stdout.write(self.style.SUCCESS(f"Snapshot camara salva em {output_file}"))
+        return 1
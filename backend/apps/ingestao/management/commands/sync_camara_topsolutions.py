@@ -1,15 +1,18 @@
 import json
 from pathlib import Path
 
-from django.core.management.base import BaseCommand
-
 from apps.ingestao.connectors import fetch_camara_topsolutions
+from apps.ingestao.http_cache import carregar
+from apps.ingestao.management.base import SyncCommand, contar_registros
 
 
-class Command(BaseCommand):
+class Command(SyncCommand):
     help = "Sincroniza dados legislativos 2025 via TopSolutions e salva snapshot JSON."
 
+    fonte = "sync_camara_topsolutions"
+
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             "--base-url",
             type=str,
@@ -21,8 +24,10 @@ class Command(BaseCommand):
             default=str(Path(__file__).resolve().parents[6] / "data" / "exports"),
         )
 
-    def handle(self, *args, **options):
-        payload = fetch_camara_topsolutions(options["base_url"])
+    def fetch(self, options):
+        return fetch_camara_topsolutions(options["base_url"])
+
+    def write(self, payload, options):
         output_dir = Path(options["output_dir"])
         output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -33,7 +38,9 @@ class Command(BaseCommand):
         }
         for key, filename in mapping.items():
             (output_dir / filename).write_text(
-                json.dumps(payload.get(key, {}), ensure_ascii=False), encoding="utf-8"
+                json.dumps(carregar(payload.get(key, {})), ensure_ascii=False),
+                encoding="utf-8",
             )
 
         self.stdout.write(self.style.SUCCESS("Sync camara TopSolutions concluida."))
+        return sum(contar_registros(payload.get(key)) for key in mapping)
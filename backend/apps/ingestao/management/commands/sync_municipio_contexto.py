@@ -1,21 +1,25 @@
 import json
 from pathlib import Path
 
-from django.core.management.base import BaseCommand
-
 from apps.ingestao.connectors import (
-    fetch_topsolutions_detalhes,
+    fetch_concurrently,
     fetch_ibge_municipio_contexto,
-    fetch_topsolutions_operacionais,
     fetch_tce_municipio_contexto,
-    fetch_topsolutions_municipio_contexto,
+    fetch_topsolutions_detalhes,
+    fetch_topsolutions_operacionais,
+    resumir_topsolutions_detalhes,
 )
+from apps.ingestao.management.base import SyncCommand
+from apps.monitoramento.services import recalcular_kpis
 
 
-class Command(BaseCommand):
+class Command(SyncCommand):
     help = "Sincroniza panorama geral do municipio (IBGE + TCE-RN)."
 
+    fonte = "sync_municipio_contexto"
+
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             "--output-dir",
             type=str,
@@ -33,19 +37,32 @@ class Command(BaseCommand):
             ),
         )
 
-    def handle(self, *args, **options):
+    def fetch(self, options):
+        # As fontes sao independentes: a coleta completa leva o tempo da mais
+        # lenta, com os limites por host aplicados dentro dos conectores. O
+        # resumo da TopSolutions sai dos detalhes, sem baixar o orcamento de novo.
+        return fetch_concurrently(
+            {
+                "detalhes": fetch_topsolutions_detalhes,
+                "operacionais": fetch_topsolutions_operacionais,
+                "ibge": fetch_ibge_municipio_contexto,
+                "tce_rn": fetch_tce_municipio_contexto,
+            }
+        )
+
+    def write(self, coletas, options):
         output_file = Path(options["output_file"])
         output_dir = Path(options["output_dir"])
         output_file.parent.mkdir(parents=True, exist_ok=True)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        detalhes = fetch_topsolutions_detalhes()
-        operacionais = fetch_topsolutions_operacionais()
+        detalhes = coletas["detalhes"]
+        operacionais = coletas["operacionais"]
 
         payload = {
-            "ibge": fetch_ibge_municipio_contexto(),
-            "tce_rn": fetch_tce_municipio_contexto(),
-            "topsolutions": fetch_topsolutions_municipio_contexto(),
+            "ibge": coletas["ibge"],
+            "tce_rn": coletas["tce_rn"],
+            "topsolutions": resumir_topsolutions_detalhes(detalhes),
             "topsolutions_operacionais": operacionais,
         }
 
@@ -66,6 +83,10 @@ class Command(BaseCommand):
             encoding="utf-8",
         )
 
+        # O KpiSnapshot guarda uma copia de municipio-contexto.json.
+        recalcular_kpis()
+
         self.stdout.write(
             self.style.SUCCESS(f"Contexto municipal salvo em {output_file}")
         )
+        return len(detalhes.get("orcamento", [])) + len(detalhes.get("emendas", []))
@@ -1,18 +1,21 @@
 import json
 from pathlib import Path
 
-from django.core.management.base import BaseCommand
-
 from apps.ingestao.connectors import fetch_prefeitura_2025
+from apps.ingestao.http_cache import carregar
+from apps.ingestao.management.base import SyncCommand, contar_registros
 
 
-class Command(BaseCommand):
+class Command(SyncCommand):
     help = (
         "Sincroniza dados 2025 da prefeitura via API TopSolutions "
         "e salva snapshot JSON."
     )
 
+    fonte = "sync_prefeitura_topsolutions"
+
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             "--base-url",
             type=str,
@@ -30,8 +33,10 @@ class Command(BaseCommand):
             ),
         )
 
-    def handle(self, *args, **options):
-        payload = fetch_prefeitura_2025(options["base_url"])
+    def fetch(self, options):
+        return fetch_prefeitura_2025(options["base_url"])
+
+    def write(self, payload, options):
         output_dir = Path(options["output_dir"])
         output_dir.mkdir(parents=True, exist_ok=True)
         mapping = {
@@ -42,6 +47,8 @@ class Command(BaseCommand):
         }
         for key, filename in mapping.items():
             (output_dir / filename).write_text(
-                json.dumps(payload.get(key, {}), ensure_ascii=False), encoding="utf-8"
+                json.dumps(carregar(payload.get(key, {})), ensure_ascii=False),
+                encoding="utf-8",
             )
         self.stdout.write(self.style.SUCCESS("Sync prefeitura concluida."))
+        return sum(contar_registros(payload.get(key)) for key in mapping)
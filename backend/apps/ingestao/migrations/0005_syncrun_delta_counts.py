@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "ingestao",
+            "0004_rename_ingestao_dat_fonte_0c7e7f_idx_ingestao_da_fonte_c408e4_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="syncrun",
+            name="atualizados",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncrun",
+            name="inseridos",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="syncrun",
+            name="removidos",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -9,6 +9,9 @@ class SyncRun(models.Model):
     mensagem = models.TextField(blank=True)
     erro_count = models.IntegerField(default=0)
     registro_count = models.IntegerField(default=0)
+    inseridos = models.IntegerField(default=0)
+    atualizados = models.IntegerField(default=0)
+    removidos = models.IntegerField(default=0)
 
     class Meta:
         ordering = ["-iniciado_em"]
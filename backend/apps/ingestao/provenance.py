@@ -0,0 +1,79 @@
+"""Registro de proveniencia em lote para os comandos de carga.
+
+``ProvenanceRecorder`` calcula o sha256 de cada linha conforme ela passa
+pelo loader e, a cada lote, consulta os ``payload_hash`` ja existentes com um
+unico ``IN`` e grava so os novos com ``bulk_create``.
+"""
+
+import json
+from hashlib import sha256
+
+from .models import DataProvenance
+
+BATCH_SIZE = 1000
+
+
+def payload_hash(payload) -> str:
+    return sha256(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode(
+            "utf-8"
+        )
+    ).hexdigest()
+
+
+class ProvenanceRecorder:
+    """Acumula registros de proveniencia e grava em lotes.
+
+    Use como context manager (o lote final e gravado na saida sem erro) ou
+    chame ``flush()`` ao fim da carga.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, versao: str = "v1"):
+        self.batch_size = batch_size
+        self.versao = versao
+        self.criados = 0
+        self.existentes = 0
+        self._pending = {}
+        self._seen = set()
+
+    def track(
+        self, fonte: str, endpoint: str, recurso: str, external_id: str, payload
+    ) -> str:
+        digest = payload_hash(payload)
+        if digest not in self._seen:
+            self._seen.add(digest)
+            self._pending[digest] = DataProvenance(
+                fonte=fonte,
+                endpoint=endpoint,
+                recurso=recurso,
+                external_id=str(external_id)[:120],
+                payload_hash=digest,
+                versao=self.versao,
+            )
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        return digest
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        existentes = set(
+            DataProvenance.objects.filter(payload_hash__in=pending).values_list(
+                "payload_hash", flat=True
+            )
+        )
+        novos = [
+            registro for digest, registro in pending.items() if digest not in existentes
+        ]
+        # ignore_conflicts cobre outra carga gravando o mesmo hash em paralelo.
+        DataProvenance.objects.bulk_create(novos, ignore_conflicts=True)
+        self.criados += len(novos)
+        self.existentes += len(existentes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
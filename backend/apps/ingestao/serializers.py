@@ -16,6 +16,9 @@ class SyncRunSerializer(serializers.ModelSerializer):
             "mensagem",
             "registro_count",
             "erro_count",
+            "inseridos",
+            "atualizados",
+            "removidos",
         )
 
 
@@ -1,7 +1,18 @@
 from django.utils import timezone
 
+from apps.common.cache import publicar_atualizacao
+from apps.common.nomes import recalcular_normalizados
+from apps.common.search import atualizar_vetores
+from apps.contratacoes.models import Contrato, Licitacao
+from apps.financas.models import Emenda, OrcamentoItem
+from apps.fornecedores.models import Fornecedor
+from apps.pessoal.models import Servidor
+
 from .models import SyncRun
 
+MODELOS_BUSCA = (Licitacao, Contrato, Emenda, OrcamentoItem)
+MODELOS_NORMALIZADOS = (Contrato, Fornecedor, Servidor)
+
 
 def iniciar_execucao(fonte: str) -> SyncRun:
     return SyncRun.objects.create(fonte=fonte, status="executando")
@@ -13,11 +24,16 @@ def finalizar_execucao(
     mensagem: str = "",
     registro_count: int = 0,
     erro_count: int = 0,
+    delta: dict | None = None,
 ) -> SyncRun:
+    delta = delta or {}
     run.status = status
     run.mensagem = mensagem
     run.registro_count = registro_count
     run.erro_count = erro_count
+    run.inseridos = delta.get("inseridos", 0)
+    run.atualizados = delta.get("atualizados", 0)
+    run.removidos = delta.get("removidos", 0)
     run.finalizado_em = timezone.now()
     run.save(
         update_fields=[
@@ -26,6 +42,28 @@ def finalizar_execucao(
             "finalizado_em",
             "registro_count",
             "erro_count",
+            "inseridos",
+            "atualizados",
+            "removidos",
         ]
     )
+    if status == "sucesso":
+        publicar_atualizacao(run.finalizado_em)
     return run
+
+
+def somar_delta(total: dict, parcial: dict) -> dict:
+    for chave in ("inseridos", "atualizados", "removidos"):
+        total[chave] = total.get(chave, 0) + parcial.get(chave, 0)
+    return total
+
+
+def atualizar_busca():
+    """Preenche o ``search_vector`` das linhas sem vetor apos uma carga."""
+    for model in MODELOS_BUSCA:
+        atualizar_vetores(model)
+
+
+def atualizar_normalizados() -> int:
+    """Preenche as colunas de nome normalizado que ficaram desatualizadas."""
+    return sum(recalcular_normalizados(model) for model in MODELOS_NORMALIZADOS)
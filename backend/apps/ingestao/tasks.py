@@ -1,10 +1,109 @@
-from celery import shared_task
+from celery import chain, group, shared_task
+from django.core.management import call_command, load_command_class
 
+from .models import SyncRun
 from .services import finalizar_execucao, iniciar_execucao
 
+# fonte -> (comando de coleta, comando de carga ou None, opcoes repassadas).
+# As opcoes repassadas levam a opcao da coleta (ex.: o diretorio gravado) para
+# a opcao correspondente da carga. Cada comando grava o proprio SyncRun, entao
+# cada execucao de task (inclusive cada retry) fica registrada com seus
+# horarios.
+FONTES = {
+    "prefeitura": (
+        "sync_prefeitura_topsolutions",
+        "load_legacy_snapshot",
+        {"output_dir": "data_dir"},
+    ),
+    "camara_topsolutions": ("sync_camara_topsolutions", None, {}),
+    "camara_portal": ("sync_camara_portal", None, {}),
+    "municipio_contexto": ("sync_municipio_contexto", None, {}),
+}
+
+SYNC_RETRY = {
+    "autoretry_for": (Exception,),
+    "retry_backoff": 30,
+    "retry_backoff_max": 15 * 60,
+    "retry_jitter": True,
+    "max_retries": 4,
+}
+
+
+def _run_command(name: str, options: dict | None = None):
+    command = load_command_class("apps.ingestao", name)
+    call_command(command, **(options or {}))
+    return command
+
+
+def _carga_em_dia(loader: str) -> bool:
+    """A ultima execucao do loader (``fonte`` do comando) terminou com sucesso."""
+    fonte = load_command_class("apps.ingestao", loader).fonte
+    ultima = SyncRun.objects.filter(fonte=fonte).order_by("-iniciado_em", "-pk")
+    return ultima.values_list("status", flat=True).first() == "sucesso"
+
 
 @shared_task
 def sync_placeholder(fonte: str = "prefeitura"):
     run = iniciar_execucao(fonte)
     finalizar_execucao(run, status="sucesso", mensagem="Job placeholder executado")
     return {"run_id": run.id, "status": "sucesso"}
+
+
+@shared_task(**SYNC_RETRY)
+def coletar_fonte(fonte: str, opcoes: dict | None = None):
+    """Etapa de coleta: roda o ``sync_*`` da fonte."""
+    coleta, _carga, repassadas = FONTES[fonte]
+    command = _run_command(coleta, opcoes)
+    return {
+        "fonte": fonte,
+        "run_id": command.run.id,
+        "status": command.run.status,
+        "opcoes_carga": {
+            destino: command.opcoes[origem] for origem, destino in repassadas.items()
+        },
+    }
+
+
+@shared_task(**SYNC_RETRY)
+def carregar_fonte(coleta: dict, opcoes: dict | None = None):
+    """Etapa de carga: roda o loader da fonte com o resultado da coleta.
+
+    Fontes sem loader sao puladas, e tambem as cuja coleta nao trouxe
+    alteracao se a ultima carga terminou bem: uma carga que esgotou os
+    retries roda de novo na proxima coleta, mesmo sem mudanca na origem. O
+    loader le de onde a coleta gravou; ``opcoes`` prevalece. Se ele terminar
+    sem abrir execucao (ex.: diretorio inexistente), a carga fica como
+    ``nao_executada`` em vez de ser repetida.
+    """
+    loader = FONTES[coleta["fonte"]][1]
+    if loader is None or (
+        coleta["status"] == "sem_alteracao" and _carga_em_dia(loader)
+    ):
+        return {**coleta, "carga": "ignorada"}
+    command = _run_command(loader, {**coleta.get("opcoes_carga", {}), **(opcoes or {})})
+    run = getattr(command, "run", None)
+    if run is None:
+        return {**coleta, "carga": "nao_executada"}
+    return {**coleta, "carga": "executada", "carga_run_id": run.id}
+
+
+def pipeline_fonte(fonte: str, opcoes_coleta=None, opcoes_carga=None):
+    return chain(
+        coletar_fonte.si(fonte, opcoes_coleta),
+        carregar_fonte.s(opcoes_carga),
+    )
+
+
+@shared_task
+def sincronizar_fontes(fontes: list[str] | None = None):
+    """Dispara uma cadeia coleta -> carga por fonte, todas em paralelo.
+
+    As cadeias sao independentes: a coleta de uma fonte roda nos workers
+    enquanto outra ja esta na carga.
+    """
+    fontes = fontes or list(FONTES)
+    desconhecidas = sorted(set(fontes) - set(FONTES))
+    if desconhecidas:
+        raise ValueError(f"Fontes desconhecidas: {', '.join(desconhecidas)}")
+    resultado = group(pipeline_fonte(fonte) for fonte in fontes).apply_async()
+    return resultado.id
@@ -1,13 +1,13 @@
 from django.urls import path
-from rest_framework.generics import ListAPIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
 from .models import Vereador
 from .serializers import VereadorSerializer
 
 
-class VereadorListAPIView(CSVListExportMixin, ListAPIView):
+class VereadorListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Vereador.objects.all()
     serializer_class = VereadorSerializer
     filterset_fields = ("partido", "mandato")
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Alerta
+from .models import Alerta, KpiSnapshot
 
 
 @admin.register(Alerta)
@@ -8,3 +8,8 @@ class AlertaAdmin(admin.ModelAdmin):
     list_display = ("codigo", "titulo", "severidade", "criado_em")
     list_filter = ("severidade",)
     search_fields = ("codigo", "titulo", "detalhes")
+
+
+@admin.register(KpiSnapshot)
+class KpiSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("ano", "receita_arrecadada", "despesa_paga", "calculado_em")
@@ -1,16 +1,16 @@
 from django.urls import path
-from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
 from .models import Alerta
 from .serializers import AlertaSerializer, JobMetricSerializer
 from .services import metricas_jobs
 
 
-class AlertaListAPIView(CSVListExportMixin, ListAPIView):
+class AlertaListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Alerta.objects.all()
     serializer_class = AlertaSerializer
     filterset_fields = ("severidade",)
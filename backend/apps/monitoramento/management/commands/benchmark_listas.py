@@ -0,0 +1,135 @@
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.common.listas import codificar, conversores
+from apps.contratacoes.api import ContratoListAPIView, LicitacaoListAPIView
+from apps.contratacoes.models import Contrato
+from apps.financas.api import DespesaSecretariaListAPIView
+from apps.financas.models import DespesaSecretaria
+from apps.fornecedores.api import FornecedorListAPIView
+from apps.ingestao.api import (
+    DataProvenanceListAPIView,
+    ManualAuditLogListAPIView,
+    SyncRunListAPIView,
+)
+from apps.ingestao.models import SyncRun
+from apps.pessoal.api import ServidorListAPIView
+from apps.pessoal.models import Servidor
+
+VIEWS = (
+    ServidorListAPIView,
+    DespesaSecretariaListAPIView,
+    LicitacaoListAPIView,
+    ContratoListAPIView,
+    FornecedorListAPIView,
+    SyncRunListAPIView,
+    DataProvenanceListAPIView,
+    ManualAuditLogListAPIView,
+)
+
+
+def _sinteticos(quantidade):
+    agora = timezone.now()
+    Servidor.objects.bulk_create(
+        Servidor(
+            matricula=str(i),
+            nome=f"SERVIDOR {i}",
+            orgao=f"SECRETARIA {i % 12}",
+            vinculo="EFETIVO",
+            valor_bruto=Decimal(i % 9000) + Decimal("0.35"),
+            valor_liquido=Decimal(i % 7000) + Decimal("0.10"),
+        )
+        for i in range(quantidade)
+    )
+    DespesaSecretaria.objects.bulk_create(
+        DespesaSecretaria(
+            ano=2000 + i // 50,
+            secretaria=f"SECRETARIA {i % 50}",
+            orcamento=Decimal(i) * 1000,
+            pago=Decimal(i) * 700 + Decimal("0.99"),
+        )
+        for i in range(quantidade)
+    )
+    Contrato.objects.bulk_create(
+        Contrato(
+            numero=f"{i}/2025",
+            empresa=f"EMPRESA {i % 300}",
+            objeto="Prestacao de servicos",
+            valor=Decimal(i) * 13 + Decimal("0.5"),
+        )
+        for i in range(quantidade)
+    )
+    SyncRun.objects.bulk_create(
+        SyncRun(
+            fonte=f"fonte-{i % 8}",
+            status="sucesso",
+            finalizado_em=agora - timedelta(minutes=i),
+            registro_count=i,
+        )
+        for i in range(quantidade)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o JSON das listagens via serializer e via ListaRapidaAPIView: "
+        "verifica que os bytes sao identicos e mede o tempo de cada caminho."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--linhas", type=int, default=1000)
+        parser.add_argument("--repeticoes", type=int, default=5)
+        parser.add_argument(
+            "--sinteticos",
+            type=int,
+            default=0,
+            help="Cria N linhas de teste em uma transacao desfeita ao final.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["sinteticos"]:
+                _sinteticos(options["sinteticos"])
+            for view_class in VIEWS:
+                self._medir(view_class, options["linhas"], options["repeticoes"])
+            transaction.set_rollback(True)
+
+    def _medir(self, view_class, linhas, repeticoes):
+        view = view_class()
+        view.request = Request(RequestFactory().get("/"))
+        view.format_kwarg = None
+        view.kwargs = {}
+        campos = view.get_csv_fields()
+        renderer = JSONRenderer()
+
+        def via_serializer():
+            objetos = view.get_queryset().order_by("pk")[:linhas]
+            return renderer.render(view.get_serializer(objetos, many=True).data)
+
+        def via_lista_rapida():
+            codigos = conversores(view.get_serializer(), list(campos))
+            valores = view._anotar_campos(campos, view.get_queryset())
+            valores = valores.order_by("pk").values_list(*campos, named=True)
+            return renderer.render(codificar(valores[:linhas], codigos))
+
+        nome = view_class.__name__
+        esperado = via_serializer()
+        if via_lista_rapida() != esperado:
+            raise CommandError(f"{nome}: JSON diferente do serializer.")
+
+        lento = min(timeit.repeat(via_serializer, number=1, repeat=repeticoes))
+        rapido = min(timeit.repeat(via_lista_rapida, number=1, repeat=repeticoes))
+        quantidade = view.get_queryset()[:linhas].count()
+        self.stdout.write(
+            f"{nome}: {quantidade} linhas, identico; "
+            f"serializer {lento * 1000:.1f} ms, lista rapida {rapido * 1000:.1f} ms "
+            f"({lento / rapido if rapido else 0:.1f}x)"
+        )
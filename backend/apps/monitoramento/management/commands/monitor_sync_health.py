@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from apps.monitoramento.models import Alerta
-from apps.monitoramento.services import metricas_jobs
+from apps.monitoramento.services import metricas_jobs, recalcular_kpis
 
 
 class Command(BaseCommand):
@@ -40,6 +40,8 @@ class Command(BaseCommand):
                 )
                 created += 1
 
+        if created:
+            recalcular_kpis()
         self.stdout.write(
             self.style.SUCCESS(f"Monitoramento executado. Alertas: {created}")
         )
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoramento", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KpiSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ano", models.IntegerField(unique=True)),
+                ("secretarias", models.IntegerField(default=0)),
+                ("vereadores", models.IntegerField(default=0)),
+                ("servidores", models.IntegerField(default=0)),
+                ("licitacoes", models.IntegerField(default=0)),
+                ("contratos", models.IntegerField(default=0)),
+                ("fornecedores", models.IntegerField(default=0)),
+                ("emendas", models.IntegerField(default=0)),
+                ("orcamento_itens", models.IntegerField(default=0)),
+                ("alertas_altos", models.IntegerField(default=0)),
+                ("contratos_acima_media", models.IntegerField(default=0)),
+                (
+                    "receita_prevista",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "receita_arrecadada",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "despesa_orcada",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "despesa_paga",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "ticket_medio_contratos",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "fornecedores_valor_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                (
+                    "top5_valor_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("contexto_municipio", models.JSONField(blank=True, default=dict)),
+                ("calculado_em", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-ano"],
+            },
+        ),
+    ]
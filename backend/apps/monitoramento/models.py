@@ -10,3 +10,45 @@ class Alerta(models.Model):
 
     class Meta:
         ordering = ["-criado_em"]
+
+
+class KpiSnapshot(models.Model):
+    """Indicadores do painel por ano, recalculados ao fim de cada carga."""
+
+    ano = models.IntegerField(unique=True)
+    secretarias = models.IntegerField(default=0)
+    vereadores = models.IntegerField(default=0)
+    servidores = models.IntegerField(default=0)
+    licitacoes = models.IntegerField(default=0)
+    contratos = models.IntegerField(default=0)
+    fornecedores = models.IntegerField(default=0)
+    emendas = models.IntegerField(default=0)
+    orcamento_itens = models.IntegerField(default=0)
+    alertas_altos = models.IntegerField(default=0)
+    contratos_acima_media = models.IntegerField(default=0)
+    receita_prevista = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    receita_arrecadada = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    despesa_orcada = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    despesa_paga = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    ticket_medio_contratos = models.DecimalField(
+        max_digits=16, decimal_places=2, default=0
+    )
+    fornecedores_valor_total = models.DecimalField(
+        max_digits=18, decimal_places=2, default=0
+    )
+    top5_valor_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    contexto_municipio = models.JSONField(default=dict, blank=True)
+    calculado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-ano"]
+
+    @property
+    def saldo(self):
+        return self.receita_arrecadada - self.despesa_paga
+
+    @property
+    def concentracao_top5(self):
+        if not self.fornecedores_valor_total:
+            return 0
+        return (self.top5_valor_total / self.fornecedores_valor_total) * 100
@@ -1,8 +1,24 @@
 from collections import defaultdict
+from decimal import Decimal
 
+from django.db.models import Avg, Sum
+from django.http import QueryDict
+from django.utils import timezone
+
+from apps.common.cache import bloco_em_cache, publicar_atualizacao
+from apps.common.seed_data import load_municipio_contexto
+from apps.contratacoes.models import Contrato, Licitacao
+from apps.financas.models import DespesaSecretaria, Emenda, OrcamentoItem, ReceitaResumo
+from apps.fornecedores.models import Fornecedor
+from apps.governanca.models import Secretaria
+from apps.ingestao.bulk import bulk_upsert
 from apps.ingestao.models import SyncRun
+from apps.legislativo.models import Vereador
+from apps.pessoal.models import Servidor
+
+from .models import Alerta, KpiSnapshot
 
-from .models import Alerta
+ANO_PADRAO = 2025
 
 
 def listar_alertas(limite: int = 50):
@@ -46,3 +62,110 @@ def metricas_jobs(limite_por_fonte: int = 30):
         )
 
     return sorted(metricas, key=lambda item: item["taxa_falha"], reverse=True)
+
+
+def _centavos(value) -> Decimal:
+    return Decimal(value or 0).quantize(Decimal("0.01"))
+
+
+def _kpis_gerais() -> dict:
+    """Indicadores que nao dependem do ano (contagens e concentracao)."""
+    fornecedores_total = Fornecedor.objects.aggregate(total=Sum("valor_total"))
+    top5 = Fornecedor.objects.order_by("-valor_total").values_list(
+        "valor_total", flat=True
+    )[:5]
+    ticket_medio = Contrato.objects.aggregate(media=Avg("valor"))["media"] or 0
+    return {
+        "secretarias": Secretaria.objects.count(),
+        "vereadores": Vereador.objects.count(),
+        "servidores": Servidor.objects.count(),
+        "licitacoes": Licitacao.objects.count(),
+        "contratos": Contrato.objects.count(),
+        "fornecedores": Fornecedor.objects.count(),
+        "emendas": Emenda.objects.count(),
+        "orcamento_itens": OrcamentoItem.objects.count(),
+        "alertas_altos": Alerta.objects.filter(severidade__iexact="alta").count(),
+        "contratos_acima_media": Contrato.objects.filter(
+            valor__gt=ticket_medio
+        ).count(),
+        "ticket_medio_contratos": _centavos(ticket_medio),
+        "fornecedores_valor_total": _centavos(fornecedores_total["total"]),
+        "top5_valor_total": _centavos(sum(valor for valor in top5 if valor)),
+        "contexto_municipio": load_municipio_contexto(),
+    }
+
+
+def _calcular_kpis(anos=None) -> list[dict]:
+    """Campos do ``KpiSnapshot`` por ano, sem gravar (ver ``recalcular_kpis``)."""
+    receitas = {
+        row["ano"]: row
+        for row in ReceitaResumo.objects.values("ano").annotate(
+            previsao=Sum("previsao"), arrecadacao=Sum("arrecadacao")
+        )
+    }
+    despesas = {
+        row["ano"]: row
+        for row in DespesaSecretaria.objects.values("ano").annotate(
+            orcamento=Sum("orcamento"), pago=Sum("pago")
+        )
+    }
+    if anos is None:
+        anos = {ANO_PADRAO, *receitas, *despesas}
+        anos.update(KpiSnapshot.objects.values_list("ano", flat=True))
+    anos = sorted(set(anos))
+    gerais = _kpis_gerais()
+    agora = timezone.now()
+    rows = []
+    for ano in anos:
+        receita = receitas.get(ano, {})
+        despesa = despesas.get(ano, {})
+        rows.append(
+            {
+                "ano": ano,
+                **gerais,
+                "receita_prevista": _centavos(receita.get("previsao")),
+                "receita_arrecadada": _centavos(receita.get("arrecadacao")),
+                "despesa_orcada": _centavos(despesa.get("orcamento")),
+                "despesa_paga": _centavos(despesa.get("pago")),
+                "calculado_em": agora,
+            }
+        )
+    return rows
+
+
+def recalcular_kpis(anos=None) -> list[KpiSnapshot]:
+    """Recalcula o ``KpiSnapshot`` dos anos informados.
+
+    Sem ``anos``, recalcula os anos que ja tem snapshot, os anos com receita
+    ou despesa carregada e o ano padrao do painel. Chamado ao fim de cada
+    carga; as paginas so leem a linha pronta.
+    """
+    rows = _calcular_kpis(anos)
+    anos = [row["ano"] for row in rows]
+    agora = rows[0]["calculado_em"]
+    bulk_upsert(
+        KpiSnapshot,
+        rows,
+        key_fields=["ano"],
+        update_fields=[field for field in rows[0] if field != "ano"],
+    )
+    publicar_atualizacao(agora)
+    return list(KpiSnapshot.objects.filter(ano__in=anos).order_by("ano"))
+
+
+def obter_kpis(ano: int = ANO_PADRAO) -> KpiSnapshot:
+    """Snapshot do ano, apenas leitura.
+
+    Um ano sem snapshot nao tem dados carregados: os indicadores sao
+    calculados sem gravar nem publicar uma nova versao dos dados e ficam em
+    cache ate a proxima carga. O deploy por ``loaddata`` cria os snapshots em
+    ``recalcular_derivados``.
+    """
+    snapshot = KpiSnapshot.objects.filter(ano=ano).first()
+    if snapshot is None:
+        snapshot = bloco_em_cache(
+            f"kpis:{ano}",
+            QueryDict(),
+            lambda: KpiSnapshot(**_calcular_kpis([ano])[0]),
+        )
+    return snapshot
@@ -13,5 +13,5 @@ class ServidorAdmin(admin.ModelAdmin):
         "valor_bruto",
         "valor_liquido",
     )
-    list_filter = ("orgao", "vinculo")
+    list_filter = ("secretaria", "orgao", "vinculo")
     search_fields = ("nome", "orgao", "vinculo")
@@ -1,21 +1,22 @@
 from django.urls import path
-from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.csv import CSVListExportMixin
+from apps.common.agregacao import AgregadoAPIView
+from apps.common.cache import GetCondicionalMixin
+from apps.common.listas import ListaRapidaAPIView
 
 from .models import Servidor
 from .serializers import ServidorSerializer
 from .services import resumo_pessoal
 
 
-class ResumoPessoalAPIView(APIView):
+class ResumoPessoalAPIView(GetCondicionalMixin, APIView):
     def get(self, request):
         return Response(resumo_pessoal())
 
 
-class ServidorListAPIView(CSVListExportMixin, ListAPIView):
+class ServidorListAPIView(GetCondicionalMixin, ListaRapidaAPIView):
     queryset = Servidor.objects.all()
     serializer_class = ServidorSerializer
     filterset_fields = ("orgao", "vinculo")
@@ -24,7 +25,12 @@ class ServidorListAPIView(CSVListExportMixin, ListAPIView):
     csv_filename = "funcionarios.csv"
 
 
+class PessoalAgregadoAPIView(GetCondicionalMixin, AgregadoAPIView):
+    modelos = {"funcionarios": Servidor}
+
+
 urlpatterns = [
     path("resumo/", ResumoPessoalAPIView.as_view(), name="pessoal-resumo"),
     path("funcionarios/", ServidorListAPIView.as_view(), name="pessoal-funcionarios"),
+    path("agregado/", PessoalAgregadoAPIView.as_view(), name="pessoal-agregado"),
 ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pessoal", "0004_servidor_carga_horaria_servidor_cargo_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="servidor",
+            index=models.Index(
+                fields=["nome", "id"], name="pessoal_ser_nome_e711a1_idx"
+            ),
+        ),
+    ]
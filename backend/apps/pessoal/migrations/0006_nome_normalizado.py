@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:14
+
+import re
+import unicodedata
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# Copia congelada de apps.common.nomes.normalizar_nome: a migracao nao pode
+# mudar junto com o codigo da aplicacao.
+def _normalizar(value):
+    text = str(value or "").strip().lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# O indice trigram so existe no PostgreSQL; no SQLite a coluna e preenchida
+# e a busca faz LIKE sem indice.
+INDICE = GinIndex(
+    OpClass("nome_normalizado", name="gin_trgm_ops"), name="servidor_nome_trgm"
+)
+
+
+def preencher(apps, schema_editor):
+    model = apps.get_model("pessoal", "servidor")
+    linhas = list(model.objects.only("pk", "nome"))
+    for linha in linhas:
+        linha.nome_normalizado = _normalizar(linha.nome)
+    model.objects.bulk_update(linhas, ["nome_normalizado"], batch_size=1000)
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("pessoal", "servidor"), INDICE)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("pessoal", "servidor"), INDICE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pessoal", "0005_keyset_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="servidor",
+            name="nome_normalizado",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(preencher, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
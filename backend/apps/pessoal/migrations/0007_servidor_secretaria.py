@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+import re
+import unicodedata
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Copia congelada de apps.common.nomes.normalizar_nome e de
+# apps.pessoal.services.mapear_orgaos: a migracao nao pode mudar junto com o
+# codigo da aplicacao. Aqui a busca por substring e direta (mesmo resultado do
+# automato de Aho-Corasick; roda uma unica vez).
+def _normalizar(value):
+    text = str(value or "").strip().lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _mapear_orgaos(orgaos, secretarias):
+    por_nome = {}
+    for secretaria in secretarias:
+        nome = _normalizar(secretaria.nome)
+        if nome:
+            por_nome.setdefault(nome, (len(por_nome), secretaria))
+    mapa = {}
+    for orgao in orgaos:
+        orgao_norm = _normalizar(orgao)
+        if not orgao_norm:
+            mapa[orgao] = None
+        elif orgao_norm in por_nome:
+            mapa[orgao] = por_nome[orgao_norm][1]
+        else:
+            candidatos = [
+                nome for nome in por_nome if nome in orgao_norm or orgao_norm in nome
+            ]
+            if candidatos:
+                melhor = max(candidatos, key=lambda n: (len(n), -por_nome[n][0]))
+                mapa[orgao] = por_nome[melhor][1]
+            else:
+                mapa[orgao] = None
+    return mapa
+
+
+def vincular(apps, schema_editor):
+    servidor_model = apps.get_model("pessoal", "Servidor")
+    secretarias = apps.get_model("governanca", "Secretaria").objects.order_by("nome")
+    orgaos = servidor_model.objects.order_by().values_list("orgao", flat=True)
+    por_secretaria = defaultdict(list)
+    for orgao, secretaria in _mapear_orgaos(set(orgaos), list(secretarias)).items():
+        if secretaria is not None:
+            por_secretaria[secretaria.pk].append(orgao)
+    for secretaria_id, lista in por_secretaria.items():
+        servidor_model.objects.filter(orgao__in=lista).update(
+            secretaria_id=secretaria_id
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("governanca", "0001_initial"),
+        ("pessoal", "0006_nome_normalizado"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servidor",
+            name="secretaria",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="servidores",
+                to="governanca.secretaria",
+            ),
+        ),
+        migrations.RunPython(vincular, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,13 @@
 from django.db import models
 
+from apps.common.nomes import NomeNormalizadoMixin
+
+
+class Servidor(NomeNormalizadoMixin, models.Model):
+    NORMALIZED_FIELDS = {"nome_normalizado": "nome"}
+    AGGREGATE_DIMENSIONS = ("orgao", "vinculo", "cargo", "funcao")
+    AGGREGATE_MEASURES = ("valor_bruto", "valor_liquido")
 
-class Servidor(models.Model):
     matricula = models.CharField(max_length=80, blank=True, db_index=True)
     nome = models.CharField(max_length=255)
     orgao = models.CharField(max_length=255)
@@ -11,10 +17,22 @@ class Servidor(models.Model):
     cargo = models.CharField(max_length=255, blank=True)
     funcao = models.CharField(max_length=255, blank=True)
     carga_horaria = models.CharField(max_length=20, blank=True)
+    nome_normalizado = models.CharField(max_length=255, blank=True, editable=False)
+    # Preenchida na carga a partir do orgao (``services.vincular_secretarias``).
+    secretaria = models.ForeignKey(
+        "governanca.Secretaria",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="servidores",
+    )
 
     class Meta:
         ordering = ["nome"]
-        indexes = [models.Index(fields=["orgao", "vinculo"])]
+        indexes = [
+            models.Index(fields=["orgao", "vinculo"]),
+            models.Index(fields=["nome", "id"]),
+        ]
 
     def __str__(self) -> str:
         return self.nome
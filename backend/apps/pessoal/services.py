@@ -1,3 +1,11 @@
+from collections import defaultdict
+
+from django.db.models import Case, Value, When
+
+from apps.common.aho_corasick import AhoCorasick
+from apps.common.nomes import normalizar_nome
+from apps.governanca.models import Secretaria
+
 from .models import Servidor
 
 
@@ -5,3 +13,74 @@ def resumo_pessoal() -> dict:
     return {
         "total_servidores": Servidor.objects.count(),
     }
+
+
+def mapear_orgaos(orgaos, secretarias) -> dict:
+    """Associa cada orgao a uma secretaria (ou ``None``) pelo nome normalizado.
+
+    Nome igual ganha; senao, entre as secretarias cujo nome contem o orgao ou
+    esta contido nele, fica a de nome mais longo (empate: a primeira de
+    ``secretarias``). As duas direcoes usam um automato de Aho-Corasick.
+    """
+    por_nome = {}
+    for secretaria in secretarias:
+        nome = normalizar_nome(secretaria.nome)
+        if nome:
+            por_nome.setdefault(nome, (len(por_nome), secretaria))
+    orgaos_norm = {orgao: normalizar_nome(orgao) for orgao in orgaos}
+
+    # Secretarias cujo nome contem o orgao: um automato com os orgaos
+    # percorre cada nome de secretaria.
+    contidos = defaultdict(set)
+    automato_orgaos = AhoCorasick(set(orgaos_norm.values()))
+    for nome in por_nome:
+        for orgao in automato_orgaos.encontrar(nome):
+            contidos[orgao].add(nome)
+
+    automato_secretarias = AhoCorasick(por_nome)
+    mapa = {}
+    for orgao, orgao_norm in orgaos_norm.items():
+        if not orgao_norm:
+            mapa[orgao] = None
+        elif orgao_norm in por_nome:
+            mapa[orgao] = por_nome[orgao_norm][1]
+        else:
+            candidatos = automato_secretarias.encontrar(orgao_norm)
+            candidatos |= contidos[orgao_norm]
+            if candidatos:
+                melhor = max(candidatos, key=lambda n: (len(n), -por_nome[n][0]))
+                mapa[orgao] = por_nome[melhor][1]
+            else:
+                mapa[orgao] = None
+    return mapa
+
+
+def vincular_secretarias() -> int:
+    """Recalcula ``Servidor.secretaria`` a partir do orgao; devolve alterados.
+
+    So os orgaos cujo vinculo mudou sao regravados, em um unico ``UPDATE``.
+    """
+    secretarias = list(Secretaria.objects.order_by("nome"))
+    atuais = set(
+        Servidor.objects.order_by().values_list("orgao", "secretaria_id").distinct()
+    )
+    mapa = mapear_orgaos({orgao for orgao, _ in atuais}, secretarias)
+    mudaram = defaultdict(list)
+    for orgao, secretaria_id in atuais:
+        novo = mapa[orgao].pk if mapa[orgao] else None
+        if novo != secretaria_id:
+            mudaram[novo].append(orgao)
+    if not mudaram:
+        return 0
+    return Servidor.objects.filter(
+        orgao__in=[orgao for lista in mudaram.values() for orgao in lista]
+    ).update(
+        secretaria_id=Case(
+            *(
+                When(orgao__in=lista, then=Value(secretaria_id))
+                for secretaria_id, lista in mudaram.items()
+                if secretaria_id is not None
+            ),
+            default=None,
+        )
+    )
@@ -1,74 +1,40 @@
-import csv
-import json
 import re
-import unicodedata
 from collections import defaultdict
 from decimal import Decimal
-from pathlib import Path
 
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.paginator import Paginator
-from django.db.models import Avg, Count, Q, Sum
+from django.db.models import Avg, Count, Q, Subquery, Sum, Value
+from django.db.models.functions import Trim, Upper
 from django.views.generic import TemplateView
 
-from apps.contratacoes.models import Contrato, Licitacao
+from apps.common.cache import (
+    PARAMETROS_PAGINACAO,
+    GetCondicionalMixin,
+    PaginaEmCacheMixin,
+    bloco_em_cache,
+)
+from apps.common.nomes import filtro_texto, normalizar_nome
+from apps.common.pagination import keyset_paginate
+from apps.common.search import busca_textual_disponivel, filtro_busca, ranquear
+from apps.common.seed_data import (
+    IndiceServidores,
+    carregar_em_cache,
+    ler_csv,
+    load_municipio_contexto,
+)
+from apps.contratacoes.models import Contrato, Licitacao, TotalCategoria
+from apps.contratacoes.selectors import contratos_por_categoria, totais_por_categoria
 from apps.financas.models import DespesaSecretaria, Emenda, OrcamentoItem, ReceitaResumo
 from apps.fornecedores.models import Fornecedor
 from apps.governanca.models import Secretaria
 from apps.governanca.services import resumo_governanca
 from apps.legislativo.models import Vereador
 from apps.monitoramento.models import Alerta
-from apps.monitoramento.services import metricas_jobs
+from apps.monitoramento.services import metricas_jobs, obter_kpis
 from apps.pessoal.models import Servidor
 
 
-_BACKEND_DIR = Path(__file__).resolve().parents[2]
-
-
-def _find_data_file(filename):
-    """Look in backend/seed_data/ first (production), then project-root data/exports/ (local)."""
-    candidates = [
-        _BACKEND_DIR / "seed_data" / filename,
-        _BACKEND_DIR.parent / "data" / "exports" / filename,
-    ]
-    for path in candidates:
-        if path.exists():
-            return path
-    return None
-
-
-def load_municipio_contexto():
-    file_path = _find_data_file("municipio-contexto.json")
-    if file_path is None:
-        return {}
-    try:
-        return json.loads(file_path.read_text(encoding="utf-8"))
-    except Exception:  # noqa: BLE001
-        return {}
-
-
-def load_export_data(filename):
-    file_path = _find_data_file(filename)
-    if file_path is None:
-        return []
-    try:
-        payload = json.loads(file_path.read_text(encoding="utf-8"))
-        return payload if isinstance(payload, list) else []
-    except Exception:  # noqa: BLE001
-        return []
-
-
-def load_export_csv(filename):
-    file_path = _find_data_file(filename)
-    if file_path is None:
-        return []
-    try:
-        with file_path.open("r", encoding="utf-8", newline="") as handle:
-            return list(csv.DictReader(handle, delimiter=";"))
-    except Exception:  # noqa: BLE001
-        return []
-
-
 def _extract_number(value):
     if value is None:
         return None
@@ -100,93 +66,105 @@ def _decimal_or_zero(value):
             return Decimal("0")
 
 
-def _normalize_text(value):
-    text = str(value or "").strip().lower()
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+FOLHA_EXPORT = "funcionarios-folha-2026-01.csv"
 
 
-def _match_secretaria(orgao, secretarias_norm):
-    orgao_norm = _normalize_text(orgao)
-    if not orgao_norm:
-        return None
-
-    for sec in secretarias_norm:
-        if orgao_norm == sec["norm"]:
-            return sec
-
-    candidates = [
-        sec
-        for sec in secretarias_norm
-        if sec["norm"] and (sec["norm"] in orgao_norm or orgao_norm in sec["norm"])
-    ]
-    if not candidates:
-        return None
-    return max(candidates, key=lambda item: len(item["norm"]))
+def _indexar_folha_export(path):
+    return IndiceServidores(
+        [
+            {
+                "nome": (row.get("nome") or "").strip(),
+                "orgao": (row.get("orgao") or "").strip(),
+                "vinculo": (row.get("vinculo") or "").strip() or "-",
+                "funcao": (row.get("funcao") or row.get("cargoFuncao") or "").strip(),
+                "matricula": (row.get("numMatricula") or "").strip(),
+                "valor_bruto": _decimal_or_zero(row.get("vlrRemuneracaoBruta")),
+                "valor_liquido": _decimal_or_zero(row.get("vlrRemuAposDescObrig")),
+                "fonte": "export-folha-2026-01",
+            }
+            for row in ler_csv(path)
+        ]
+    )
 
 
 def _pick_servidor_por_nome(nome, servidores_por_nome):
-    key = _normalize_text(nome)
+    key = normalizar_nome(nome)
     candidatos = servidores_por_nome.get(key, [])
     if not candidatos:
         return None
     return max(candidatos, key=lambda row: row.get("valor_bruto") or Decimal("0"))
 
 
-class DashboardView(TemplateView):
+# Parametros que mudam so a pagina exibida, nao o resumo do recorte.
+PARAMETROS_NAVEGACAO = (*PARAMETROS_PAGINACAO, "ordering")
+
+
+def _paginar(request, queryset, quantidade, ordering, por_pagina=25):
+    """Pagina por numero de pagina ou, com ``?cursor=``, por chave (keyset).
+
+    A paginacao numerada reaproveita a contagem ja feita no resumo.
+    """
+    if "cursor" in request.GET:
+        return keyset_paginate(queryset, ordering, request.GET, por_pagina)
+    paginator = Paginator(queryset, por_pagina)
+    paginator.count = quantidade
+    return paginator.get_page(request.GET.get("page", 1))
+
+
+def _relevancia(request, queryset, search, ordering):
+    """Com busca full-text e sem ``?ordering=``, ordena por relevancia."""
+    if (
+        search
+        and "ordering" not in request.GET
+        and busca_textual_disponivel(queryset.model)
+    ):
+        return ranquear(queryset, search), "-rank"
+    return queryset, ordering
+
+
+def _resumo_por_grupo(model, grupos, somas, escalares=None):
+    """Resume um recorte filtrado e conta a tabela por grupo em uma consulta.
+
+    A tabela inteira e agrupada por ``grupos`` com ``registros=Count``;
+    ``somas`` sao agregacoes condicionais (``filter=``) somadas entre os
+    grupos e ``escalares`` sao subconsultas de valor unico. Devolve
+    ``(resumo, linhas)``.
+    """
+    linhas = list(
+        model.objects.order_by()
+        .values(*grupos)
+        .annotate(registros=Count("pk"), **somas, **(escalares or {}))
+    )
+    resumo = {nome: sum(row[nome] or 0 for row in linhas) for nome in somas}
+    for nome in escalares or {}:
+        resumo[nome] = linhas[0][nome] if linhas else 0
+    return resumo, linhas
+
+
+class DashboardView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/index.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        receitas = ReceitaResumo.objects.filter(ano=2025).aggregate(
-            previsao=Sum("previsao"), arrecadacao=Sum("arrecadacao")
-        )
-        despesas = DespesaSecretaria.objects.filter(ano=2025).aggregate(
-            orcamento=Sum("orcamento"), pago=Sum("pago")
-        )
-        context.update(
-            {
-                "kpis": {
-                    "secretarias": Secretaria.objects.count(),
-                    "vereadores": Vereador.objects.count(),
-                    "servidores": Servidor.objects.count(),
-                    "licitacoes": Licitacao.objects.count(),
-                    "contratos": Contrato.objects.count(),
-                    "emendas": Emenda.objects.count(),
-                    "orcamento_itens": OrcamentoItem.objects.count(),
-                    "receita_arrecadada": receitas.get("arrecadacao") or 0,
-                    "despesa_paga": despesas.get("pago") or 0,
-                }
-            }
-        )
-        contexto = load_municipio_contexto()
+        kpis = obter_kpis()
+        context["kpis"] = {
+            "secretarias": kpis.secretarias,
+            "vereadores": kpis.vereadores,
+            "servidores": kpis.servidores,
+            "licitacoes": kpis.licitacoes,
+            "contratos": kpis.contratos,
+            "emendas": kpis.emendas,
+            "orcamento_itens": kpis.orcamento_itens,
+            "receita_arrecadada": kpis.receita_arrecadada,
+            "despesa_paga": kpis.despesa_paga,
+        }
+        contexto = kpis.contexto_municipio
         context["contexto_municipio"] = contexto
 
-        receita_realizada = context["kpis"]["receita_arrecadada"] or 0
-        despesa_paga = context["kpis"]["despesa_paga"] or 0
-        saldo = receita_realizada - despesa_paga
-
-        fornecedores_total = (
-            Fornecedor.objects.aggregate(total=Sum("valor_total")).get("total") or 0
-        )
-        top5_total = sum(
-            item.valor_total
-            for item in Fornecedor.objects.order_by("-valor_total")[:5]
-            if item.valor_total
-        )
-        concentracao_top5 = (
-            (top5_total / fornecedores_total) * 100 if fornecedores_total else 0
-        )
-
-        ticket_medio_contratos = (
-            Contrato.objects.aggregate(media=Avg("valor")).get("media") or 0
-        )
-        contratos_acima_media = Contrato.objects.filter(
-            valor__gt=ticket_medio_contratos
-        ).count()
-        alertas_altos = Alerta.objects.filter(severidade__iexact="alta").count()
+        saldo = kpis.saldo
+        concentracao_top5 = kpis.concentracao_top5
+        contratos_acima_media = kpis.contratos_acima_media
+        alertas_altos = kpis.alertas_altos
 
         ibge = contexto.get("ibge", {})
         tce = contexto.get("tce_rn", {})
@@ -250,8 +228,8 @@ class DashboardView(TemplateView):
         context["operacionais_topsolutions"] = operacionais_rows
         context["one_minute"] = {
             "saldo": saldo,
-            "receita_realizada": receita_realizada,
-            "despesa_paga": despesa_paga,
+            "receita_realizada": kpis.receita_arrecadada,
+            "despesa_paga": kpis.despesa_paga,
             "concentracao_top5": concentracao_top5,
             "alertas_altos": alertas_altos,
             "contratos_acima_media": contratos_acima_media,
@@ -270,7 +248,7 @@ class DashboardView(TemplateView):
         return context
 
 
-class GovernancaView(TemplateView):
+class GovernancaView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/governanca.html"
 
     def get_context_data(self, **kwargs):
@@ -279,7 +257,7 @@ class GovernancaView(TemplateView):
         return context
 
 
-class LegislativoView(TemplateView):
+class LegislativoView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/legislativo.html"
 
     def get_context_data(self, **kwargs):
@@ -288,7 +266,7 @@ class LegislativoView(TemplateView):
         return context
 
 
-class FinancasView(TemplateView):
+class FinancasView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/financas.html"
 
     def get_context_data(self, **kwargs):
@@ -359,7 +337,7 @@ class FinancasView(TemplateView):
         return context
 
 
-class LicitacoesView(TemplateView):
+class LicitacoesView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/licitacoes.html"
 
     def get_context_data(self, **kwargs):
@@ -374,78 +352,87 @@ class LicitacoesView(TemplateView):
         if ordering not in allowed_order:
             ordering = "-valor"
 
-        queryset = Licitacao.objects.all()
+        filtro = Q()
         if search:
-            queryset = queryset.filter(
-                Q(certame__icontains=search)
-                | Q(modalidade__icontains=search)
-                | Q(objeto__icontains=search)
+            filtro &= filtro_busca(
+                Licitacao, search, ["certame", "modalidade", "objeto"]
             )
         if modalidade:
-            queryset = queryset.filter(modalidade__iexact=modalidade)
+            filtro &= Q(modalidade__iexact=modalidade)
         if status:
-            queryset = queryset.filter(status__iexact=status)
+            filtro &= Q(status__iexact=status)
         if valor_min:
-            queryset = queryset.filter(valor__gte=valor_min)
+            filtro &= Q(valor__gte=valor_min)
         if valor_max:
-            queryset = queryset.filter(valor__lte=valor_max)
-
+            filtro &= Q(valor__lte=valor_max)
+        queryset, ordering = _relevancia(
+            self.request, Licitacao.objects.filter(filtro), search, ordering
+        )
         queryset = queryset.order_by(ordering)
-        totais = queryset.aggregate(total=Sum("valor"))
-        certames_unicos = set(
-            (item or "").strip().upper()
-            for item in queryset.values_list("certame", flat=True)
-            if (item or "").strip()
+
+        def resumir():
+            # Certames normalizados distintos no recorte: subconsulta escalar
+            # embutida na mesma consulta do histograma de status.
+            certames = (
+                Licitacao.objects.filter(filtro)
+                .annotate(certame_norm=Upper(Trim("certame")))
+                .exclude(certame_norm="")
+                .order_by()
+                .values(grupo=Value(1))
+                .annotate(distintos=Count("certame_norm", distinct=True))
+                .values("distintos")
+            )
+            return _resumo_por_grupo(
+                Licitacao,
+                ["status"],
+                {
+                    "quantidade": Count("pk", filter=filtro),
+                    "total": Sum("valor", filter=filtro),
+                },
+                {"certames_unicos": Subquery(certames)},
+            )
+
+        totais, por_status = bloco_em_cache(
+            "licitacoes:resumo", self.request.GET, resumir, PARAMETROS_NAVEGACAO
         )
+        quantidade = totais["quantidade"]
+        certames_unicos = totais["certames_unicos"] or 0
         contexto = load_municipio_contexto().get("tce_rn", {})
         status_counts = {
-            row["status"]: row["total"]
-            for row in Licitacao.objects.values("status")
-            .annotate(total=Count("id"))
-            .order_by()
-            if row["status"]
+            row["status"]: row["registros"] for row in por_status if row["status"]
         }
-        paginator = Paginator(queryset, 25)
-        page_number = self.request.GET.get("page", 1)
-        page_obj = paginator.get_page(page_number)
+        page_obj = _paginar(self.request, queryset, quantidade, ordering)
 
-        statuses = list(
-            Licitacao.objects.values_list("status", flat=True)
-            .distinct()
-            .order_by("status")
-        )
         context.update(
             {
                 "page_obj": page_obj,
                 "search": search,
                 "modalidade": modalidade,
                 "status": status,
-                "statuses": [s for s in statuses if s],
+                "statuses": sorted(status_counts),
                 "valor_min": valor_min,
                 "valor_max": valor_max,
                 "ordering": ordering,
                 "resumo": {
-                    "total_filtrado": totais.get("total") or 0,
-                    "quantidade": queryset.count(),
-                    "certames_unicos": len(certames_unicos),
-                    "lotes_estimados": max(queryset.count() - len(certames_unicos), 0),
+                    "total_filtrado": totais["total"],
+                    "quantidade": quantidade,
+                    "certames_unicos": certames_unicos,
+                    "lotes_estimados": max(quantidade - certames_unicos, 0),
                     "homologadas": contexto.get("licitacoes_homologadas"),
                     "em_andamento": contexto.get("licitacoes_em_andamento"),
                     "valor_unico_tce": contexto.get(
                         "licitacoes_valor_total_orcado_unico"
                     ),
                     "ticket_medio": (
-                        (totais.get("total") or 0) / queryset.count()
-                        if queryset.count()
-                        else 0
+                        totais["total"] / quantidade if quantidade else 0
                     ),
                     "status_counts": status_counts,
                 },
                 "insights": [
                     (
                         "A base filtrada possui "
-                        f"{len(certames_unicos)} certames unicos "
-                        f"em {queryset.count()} registros."
+                        f"{certames_unicos} certames unicos "
+                        f"em {quantidade} registros."
                     ),
                     (
                         "No recorte oficial do TCE-RN, ha "
@@ -462,7 +449,7 @@ class LicitacoesView(TemplateView):
         return context
 
 
-class ContratosView(TemplateView):
+class ContratosView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/contratos.html"
 
     def get_context_data(self, **kwargs):
@@ -481,15 +468,14 @@ class ContratosView(TemplateView):
         queryset = Contrato.objects.all()
         if search:
             queryset = queryset.filter(
-                Q(numero__icontains=search)
-                | Q(empresa__icontains=search)
-                | Q(modalidade__icontains=search)
-                | Q(objeto__icontains=search)
+                filtro_busca(
+                    Contrato, search, ["numero", "empresa", "modalidade", "objeto"]
+                )
             )
         if modalidade:
             queryset = queryset.filter(modalidade__iexact=modalidade)
         if empresa:
-            queryset = queryset.filter(empresa__icontains=empresa)
+            queryset = queryset.filter(filtro_texto(Contrato, "empresa", empresa))
         if ativo in ("1", "true"):
             queryset = queryset.filter(ativo=True)
         elif ativo in ("0", "false"):
@@ -499,12 +485,17 @@ class ContratosView(TemplateView):
         if valor_max:
             queryset = queryset.filter(valor__lte=valor_max)
 
+        queryset, ordering = _relevancia(self.request, queryset, search, ordering)
         queryset = queryset.order_by(ordering)
-        totais = queryset.aggregate(total=Sum("valor"))
-        media = (totais.get("total") or 0) / queryset.count() if queryset.count() else 0
-        paginator = Paginator(queryset, 25)
-        page_number = self.request.GET.get("page", 1)
-        page_obj = paginator.get_page(page_number)
+        totais = bloco_em_cache(
+            "contratos:resumo",
+            self.request.GET,
+            lambda: queryset.aggregate(quantidade=Count("pk"), total=Sum("valor")),
+            PARAMETROS_NAVEGACAO,
+        )
+        quantidade = totais["quantidade"]
+        media = (totais["total"] or 0) / quantidade if quantidade else 0
+        page_obj = _paginar(self.request, queryset, quantidade, ordering)
 
         context.update(
             {
@@ -517,9 +508,9 @@ class ContratosView(TemplateView):
                 "valor_max": valor_max,
                 "ordering": ordering,
                 "resumo": {
-                    "total_filtrado": totais.get("total") or 0,
-                    "quantidade": queryset.count(),
-                    "ticket_medio": (media if queryset.count() else 0),
+                    "total_filtrado": totais["total"] or 0,
+                    "quantidade": quantidade,
+                    "ticket_medio": media,
                 },
                 "insights": [
                     (f"O valor medio por contrato no recorte atual e R$ {media:,.2f}.")
@@ -540,7 +531,7 @@ class ContratosView(TemplateView):
         return context
 
 
-class FornecedoresView(TemplateView):
+class FornecedoresView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/fornecedores.html"
 
     def get_context_data(self, **kwargs):
@@ -557,7 +548,7 @@ class FornecedoresView(TemplateView):
         queryset = Fornecedor.objects.all()
         if search:
             queryset = queryset.filter(
-                Q(nome__icontains=search) | Q(cnpj__icontains=search)
+                filtro_texto(Fornecedor, "nome", search) | Q(cnpj__icontains=search)
             )
         if cnpj:
             queryset = queryset.filter(cnpj__icontains=cnpj)
@@ -600,7 +591,7 @@ class FornecedoresView(TemplateView):
         return context
 
 
-class AlertasView(TemplateView):
+class AlertasView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/alertas.html"
 
     def get_context_data(self, **kwargs):
@@ -638,7 +629,7 @@ class AlertasView(TemplateView):
         return context
 
 
-class SecretariasOrcamentoView(TemplateView):
+class SecretariasOrcamentoView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/secretarias.html"
 
     def get_context_data(self, **kwargs):
@@ -680,7 +671,7 @@ class SecretariasOrcamentoView(TemplateView):
         return context
 
 
-class FuncionariosView(TemplateView):
+class FuncionariosView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/funcionarios.html"
 
     def get_context_data(self, **kwargs):
@@ -691,7 +682,7 @@ class FuncionariosView(TemplateView):
         cargo = self.request.GET.get("cargo", "").strip()
         queryset = Servidor.objects.all()
         if search:
-            queryset = queryset.filter(nome__icontains=search)
+            queryset = queryset.filter(filtro_texto(Servidor, "nome", search))
         if orgao:
             queryset = queryset.filter(orgao__icontains=orgao)
         if vinculo:
@@ -699,14 +690,21 @@ class FuncionariosView(TemplateView):
         if cargo:
             queryset = queryset.filter(cargo__icontains=cargo)
 
-        totais = queryset.aggregate(
-            total_bruto=Sum("valor_bruto"),
-            total_liquido=Sum("valor_liquido"),
-            media_bruto=Avg("valor_bruto"),
+        totais = bloco_em_cache(
+            "funcionarios:resumo",
+            self.request.GET,
+            lambda: queryset.aggregate(
+                quantidade=Count("pk"),
+                total_bruto=Sum("valor_bruto"),
+                total_liquido=Sum("valor_liquido"),
+                media_bruto=Avg("valor_bruto"),
+            ),
+            PARAMETROS_NAVEGACAO,
         )
 
-        paginator = Paginator(queryset.order_by("nome"), 25)
-        context["page_obj"] = paginator.get_page(self.request.GET.get("page", 1))
+        context["page_obj"] = _paginar(
+            self.request, queryset.order_by("nome"), totais["quantidade"], "nome"
+        )
         context.update(
             {
                 "search": search,
@@ -714,7 +712,7 @@ class FuncionariosView(TemplateView):
                 "vinculo": vinculo,
                 "cargo": cargo,
                 "resumo": {
-                    "total_servidores": queryset.count(),
+                    "total_servidores": totais["quantidade"],
                     "total_bruto": totais.get("total_bruto") or 0,
                     "total_liquido": totais.get("total_liquido") or 0,
                     "media_bruto": totais.get("media_bruto") or 0,
@@ -724,34 +722,27 @@ class FuncionariosView(TemplateView):
         return context
 
 
-class TecnologiaView(TemplateView):
+class TecnologiaView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/tecnologia.html"
+    categoria = "tecnologia"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        terms = [
-            "tecnolog",
-            "software",
-            "sistema",
-            "internet",
-            "telecom",
-            "dados",
-            "informat",
-        ]
-        q = Q()
-        for term in terms:
-            q |= Q(objeto__icontains=term) | Q(empresa__icontains=term)
-        context["contratos_tech"] = Contrato.objects.filter(q).order_by("-valor")[:200]
-        context["total_tech"] = (
-            Contrato.objects.filter(q).aggregate(total=Sum("valor")).get("total") or 0
-        )
-        context["total_geral"] = (
-            Contrato.objects.aggregate(total=Sum("valor")).get("total") or 0
-        )
+        # Tags e totais vem da carga (``contratacoes.categorias``).
+        totais = totais_por_categoria("contrato")
+        categoria = totais.get(self.categoria)
+        geral = totais.get(TotalCategoria.TODAS)
+        context["contratos_tech"] = contratos_por_categoria(self.categoria).order_by(
+            "-valor"
+        )[:200]
+        context["total_tech"] = categoria.valor_total if categoria else 0
+        context["total_geral"] = geral.valor_total if geral else 0
         return context
 
 
-class HierarquiaOrganizacionalView(TemplateView):
+class HierarquiaOrganizacionalView(
+    GetCondicionalMixin, PaginaEmCacheMixin, TemplateView
+):
     template_name = "dashboard/hierarquia.html"
 
     def get_context_data(self, **kwargs):
@@ -759,24 +750,14 @@ class HierarquiaOrganizacionalView(TemplateView):
         governanca = resumo_governanca()
 
         secretarias = list(Secretaria.objects.order_by("nome"))
-        secretarias_norm = [
-            {
-                "id": sec.id,
-                "nome": sec.nome,
-                "norm": _normalize_text(sec.nome),
-                "obj": sec,
-            }
-            for sec in secretarias
-        ]
-
+        # A secretaria de cada servidor vem da carga (``vincular_secretarias``).
         grupos = {sec.id: {"secretaria": sec, "servidores": []} for sec in secretarias}
         servidores_sem_vinculo = []
         servidores = list(Servidor.objects.order_by("nome"))
 
         for servidor in servidores:
-            matched = _match_secretaria(servidor.orgao, secretarias_norm)
-            if matched:
-                grupos[matched["id"]]["servidores"].append(servidor)
+            if servidor.secretaria_id in grupos:
+                grupos[servidor.secretaria_id]["servidores"].append(servidor)
             else:
                 servidores_sem_vinculo.append(servidor)
 
@@ -815,7 +796,7 @@ class HierarquiaOrganizacionalView(TemplateView):
         return context
 
 
-class RemuneracoesView(TemplateView):
+class RemuneracoesView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/remuneracoes.html"
 
     def get_context_data(self, **kwargs):
@@ -825,27 +806,11 @@ class RemuneracoesView(TemplateView):
         secretarias = list(Secretaria.objects.order_by("nome"))
         vereadores = list(Vereador.objects.order_by("nome"))
 
-        folha_export = load_export_csv("funcionarios-folha-2026-01.csv")
-        servidores = []
-        for row in folha_export:
-            servidores.append(
-                {
-                    "nome": (row.get("nome") or "").strip(),
-                    "orgao": (row.get("orgao") or "").strip(),
-                    "vinculo": (row.get("vinculo") or "").strip() or "-",
-                    "funcao": (
-                        row.get("funcao") or row.get("cargoFuncao") or ""
-                    ).strip(),
-                    "matricula": (row.get("numMatricula") or "").strip(),
-                    "valor_bruto": _decimal_or_zero(row.get("vlrRemuneracaoBruta")),
-                    "valor_liquido": _decimal_or_zero(row.get("vlrRemuAposDescObrig")),
-                    "fonte": "export-folha-2026-01",
-                }
-            )
-
-        if not servidores:
-            for servidor in Servidor.objects.order_by("nome"):
-                servidores.append(
+        folha = carregar_em_cache(FOLHA_EXPORT, _indexar_folha_export)
+        folha_export = bool(folha)
+        if not folha_export:
+            folha = IndiceServidores(
+                [
                     {
                         "nome": servidor.nome,
                         "orgao": servidor.orgao,
@@ -856,11 +821,10 @@ class RemuneracoesView(TemplateView):
                         "valor_liquido": servidor.valor_liquido or Decimal("0"),
                         "fonte": "banco-local",
                     }
-                )
-
-        servidores_por_nome = defaultdict(list)
-        for servidor in servidores:
-            servidores_por_nome[_normalize_text(servidor.get("nome"))].append(servidor)
+                    for servidor in Servidor.objects.order_by("nome")
+                ]
+            )
+        servidores_por_nome = folha.por_nome
 
         cargos_estrategicos = [
             (
@@ -945,28 +909,6 @@ class RemuneracoesView(TemplateView):
                 }
             )
 
-        rows_servidores = [
-            {
-                "esfera": "Executivo",
-                "cargo": "Servidor",
-                "nome": servidor.get("nome"),
-                "orgao": servidor.get("orgao"),
-                "vinculo": servidor.get("vinculo") or "-",
-                "funcao": servidor.get("funcao") or "-",
-                "valor_bruto": servidor.get("valor_bruto") or Decimal("0"),
-                "valor_liquido": servidor.get("valor_liquido") or Decimal("0"),
-                "fonte_salario": servidor.get("fonte"),
-                "matricula": servidor.get("matricula") or "-",
-            }
-            for servidor in servidores
-        ]
-
-        total_bruto = sum(
-            (item.get("valor_bruto") or Decimal("0")) for item in servidores
-        )
-        total_liquido = sum(
-            (item.get("valor_liquido") or Decimal("0")) for item in servidores
-        )
         estrategicos_sem_salario = sum(
             1 for item in rows_estrategicos if item.get("valor_bruto") is None
         )
@@ -976,16 +918,7 @@ class RemuneracoesView(TemplateView):
 
         # Search and paginate servidores
         search = self.request.GET.get("search", "").strip()
-        filtered_servidores = rows_servidores
-        if search:
-            search_lower = search.lower()
-            filtered_servidores = [
-                r for r in rows_servidores
-                if search_lower in (r["nome"] or "").lower()
-                or search_lower in (r["orgao"] or "").lower()
-            ]
-
-        paginator = Paginator(filtered_servidores, 25)
+        paginator = Paginator(folha.buscar(search), 25)
         page_number = self.request.GET.get("page", 1)
         page_obj = paginator.get_page(page_number)
 
@@ -994,9 +927,9 @@ class RemuneracoesView(TemplateView):
                 "resumo": {
                     "estrategicos": len(rows_estrategicos),
                     "vereadores": len(rows_vereadores),
-                    "servidores": len(rows_servidores),
-                    "total_bruto": total_bruto,
-                    "total_liquido": total_liquido,
+                    "servidores": len(folha),
+                    "total_bruto": folha.total_bruto,
+                    "total_liquido": folha.total_liquido,
                     "estrategicos_sem_salario": estrategicos_sem_salario,
                     "vereadores_sem_salario": vereadores_sem_salario,
                     "fonte_principal": "export-folha-2026-01"
@@ -1102,7 +1035,7 @@ class FontesAuditoriaView(LoginRequiredMixin, UserPassesTestMixin, TemplateView)
         return context
 
 
-class EmendasView(TemplateView):
+class EmendasView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/emendas.html"
 
     def get_context_data(self, **kwargs):
@@ -1111,42 +1044,41 @@ class EmendasView(TemplateView):
         tipo = self.request.GET.get("tipo", "").strip()
         origem_recurso = self.request.GET.get("origem_recurso", "").strip()
 
-        queryset = Emenda.objects.all()
+        filtro = Q()
         if search:
-            queryset = queryset.filter(
-                Q(autoria__icontains=search)
-                | Q(objeto__icontains=search)
-                | Q(beneficiario__icontains=search)
-            )
+            filtro &= filtro_busca(Emenda, search)
         if tipo:
-            queryset = queryset.filter(tipo__iexact=tipo)
+            filtro &= Q(tipo__iexact=tipo)
         if origem_recurso:
-            queryset = queryset.filter(origem_recurso__iexact=origem_recurso)
+            filtro &= Q(origem_recurso__iexact=origem_recurso)
+        queryset, ordering = _relevancia(
+            self.request, Emenda.objects.filter(filtro), search, "-valor_previsto"
+        )
+        queryset = queryset.order_by(ordering)
 
-        totais = queryset.aggregate(
-            previsto=Sum("valor_previsto"),
-            empenhado=Sum("valor_empenhado"),
-            liquidado=Sum("valor_liquidado"),
-            pago=Sum("valor_pago"),
+        totais, grupos = bloco_em_cache(
+            "emendas:resumo",
+            self.request.GET,
+            lambda: _resumo_por_grupo(
+                Emenda,
+                ["tipo", "origem_recurso"],
+                {
+                    "quantidade": Count("pk", filter=filtro),
+                    "previsto": Sum("valor_previsto", filter=filtro),
+                    "empenhado": Sum("valor_empenhado", filter=filtro),
+                    "pago": Sum("valor_pago", filter=filtro),
+                },
+            ),
+            PARAMETROS_NAVEGACAO,
         )
-        total_previsto = totais.get("previsto") or 0
-        total_empenhado = totais.get("empenhado") or 0
-        total_pago = totais.get("pago") or 0
+        total_previsto = totais["previsto"]
+        total_empenhado = totais["empenhado"]
+        total_pago = totais["pago"]
 
-        paginator = Paginator(queryset, 25)
-        page_number = self.request.GET.get("page", 1)
-        page_obj = paginator.get_page(page_number)
+        page_obj = _paginar(self.request, queryset, totais["quantidade"], ordering)
 
-        tipos = list(
-            Emenda.objects.values_list("tipo", flat=True)
-            .distinct()
-            .order_by("tipo")
-        )
-        origens = list(
-            Emenda.objects.values_list("origem_recurso", flat=True)
-            .distinct()
-            .order_by("origem_recurso")
-        )
+        tipos = sorted({row["tipo"] for row in grupos})
+        origens = sorted({row["origem_recurso"] for row in grupos})
 
         context.update(
             {
@@ -1157,7 +1089,7 @@ class EmendasView(TemplateView):
                 "tipos": [t for t in tipos if t],
                 "origens": [o for o in origens if o],
                 "resumo": {
-                    "quantidade": queryset.count(),
+                    "quantidade": totais["quantidade"],
                     "previsto": total_previsto,
                     "empenhado": total_empenhado,
                     "pago": total_pago,
@@ -1176,7 +1108,7 @@ class EmendasView(TemplateView):
         return context
 
 
-class OrcamentoDetalhadoView(TemplateView):
+class OrcamentoDetalhadoView(GetCondicionalMixin, PaginaEmCacheMixin, TemplateView):
     template_name = "dashboard/orcamento-detalhado.html"
 
     def get_context_data(self, **kwargs):
@@ -1184,32 +1116,38 @@ class OrcamentoDetalhadoView(TemplateView):
         search = self.request.GET.get("search", "").strip()
         funcao = self.request.GET.get("funcao", "").strip()
 
-        queryset = OrcamentoItem.objects.all()
+        filtro = Q()
         if search:
-            queryset = queryset.filter(
-                Q(unidade__icontains=search) | Q(acao__icontains=search)
-            )
+            filtro &= filtro_busca(OrcamentoItem, search)
         if funcao:
-            queryset = queryset.filter(funcao__iexact=funcao)
+            filtro &= Q(funcao__iexact=funcao)
+        queryset, ordering = _relevancia(
+            self.request, OrcamentoItem.objects.filter(filtro), search, "-valor_inicial"
+        )
+        queryset = queryset.order_by(ordering)
 
-        totais = queryset.aggregate(
-            inicial=Sum("valor_inicial"),
-            atualizado=Sum("valor_atualizado"),
-            disponivel=Sum("valor_disponivel"),
+        totais, por_funcao = bloco_em_cache(
+            "orcamento-detalhado:resumo",
+            self.request.GET,
+            lambda: _resumo_por_grupo(
+                OrcamentoItem,
+                ["funcao"],
+                {
+                    "quantidade": Count("pk", filter=filtro),
+                    "inicial": Sum("valor_inicial", filter=filtro),
+                    "atualizado": Sum("valor_atualizado", filter=filtro),
+                    "disponivel": Sum("valor_disponivel", filter=filtro),
+                },
+            ),
+            PARAMETROS_NAVEGACAO,
         )
-        total_inicial = totais.get("inicial") or 0
-        total_atualizado = totais.get("atualizado") or 0
-        total_disponivel = totais.get("disponivel") or 0
+        total_inicial = totais["inicial"]
+        total_atualizado = totais["atualizado"]
+        total_disponivel = totais["disponivel"]
 
-        paginator = Paginator(queryset, 25)
-        page_number = self.request.GET.get("page", 1)
-        page_obj = paginator.get_page(page_number)
+        page_obj = _paginar(self.request, queryset, totais["quantidade"], ordering)
 
-        funcoes = list(
-            OrcamentoItem.objects.values_list("funcao", flat=True)
-            .distinct()
-            .order_by("funcao")
-        )
+        funcoes = sorted(row["funcao"] for row in por_funcao)
         context.update(
             {
                 "page_obj": page_obj,
@@ -1217,7 +1155,7 @@ class OrcamentoDetalhadoView(TemplateView):
                 "funcao": funcao,
                 "funcoes": [f for f in funcoes if f],
                 "resumo": {
-                    "quantidade": queryset.count(),
+                    "quantidade": totais["quantidade"],
                     "inicial": total_inicial,
                     "atualizado": total_atualizado,
                     "disponivel": total_disponivel,
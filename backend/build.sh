@@ -11,3 +11,6 @@ python manage.py migrate
 
 # Load seed data if fixture exists and database is empty
 python manage.py loaddata fixtures/seed.json || echo "Warning: fixture load failed"
+
+# loaddata grava sem save(): recalcula colunas e tabelas derivadas
+python manage.py recalcular_derivados
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "django_filters",
     "apps.governanca.apps.GovernancaConfig",
@@ -102,15 +103,64 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
-        "rest_framework.filters.SearchFilter",
+        "apps.common.search.FullTextSearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.common.pagination.PaginacaoAPI",
     "PAGE_SIZE": 25,
 }
 
 CELERY_BROKER_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
+# Syncs sao longos: cada worker pega uma task por vez e so confirma ao final,
+# distribuindo as fontes entre todos os processos (um por core por padrao).
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Cache das paginas do painel (apps.common.cache): o Redis do Celery quando
+# configurado, senao memoria local do processo.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "web",
+        }
+    }
+    WEB_CACHE_VERSAO_TTL = None
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    # Sem cache compartilhado, cada processo reconsulta a versao dos dados.
+    WEB_CACHE_VERSAO_TTL = 5
+WEB_CACHE_ENABLED = os.getenv("WEB_CACHE_ENABLED", "True").lower() == "true"
+WEB_CACHE_TIMEOUT = int(os.getenv("WEB_CACHE_TIMEOUT", 24 * 3600))
+# Identifica o deploy (codigo, templates, seed_data) nas chaves de cache e
+# nos ETags: um deploy novo invalida o HTML guardado e as respostas ja
+# validadas pelos clientes. No Render vem do commit publicado.
+WEB_CACHE_BUILD = os.getenv("BUILD_ID") or os.getenv("RENDER_GIT_COMMIT", "")
+
+# Cache em disco das respostas HTTP dos conectores (comandos sync_*).
+INGESTAO_HTTP_CACHE_DIR = Path(
+    os.getenv("INGESTAO_HTTP_CACHE_DIR", BASE_DIR.parent / "data" / "cache" / "http")
+)
+INGESTAO_HTTP_CACHE_TTL = int(os.getenv("INGESTAO_HTTP_CACHE_TTL", 7 * 24 * 3600))
+INGESTAO_HTTP_CACHE_MAX_BYTES = int(
+    os.getenv("INGESTAO_HTTP_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+)
+# Parametros aceitos por endpoint TopSolutions descobertos na sondagem.
+INGESTAO_RESOLVED_PARAMS_FILE = Path(
+    os.getenv(
+        "INGESTAO_RESOLVED_PARAMS_FILE",
+        BASE_DIR.parent / "data" / "cache" / "topsolutions-params.json",
+    )
+)
+# Janelas ja carregadas pelo backfill historico (backfill_prefeitura).
+INGESTAO_BACKFILL_CHECKPOINT_FILE = Path(
+    os.getenv(
+        "INGESTAO_BACKFILL_CHECKPOINT_FILE",
+        BASE_DIR.parent / "data" / "cache" / "backfill-prefeitura.json",
+    )
+)
 
 LOGGING = {
     "version": 1,
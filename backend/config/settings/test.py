@@ -8,3 +8,6 @@ DATABASES = {
         "NAME": BASE_DIR / "test.sqlite3",  # noqa: F405
     }
 }
+
+# Cada teste monta os proprios dados; os testes de cache o religam.
+WEB_CACHE_ENABLED = False
@@ -4,9 +4,10 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
 from django.test import Client
+from django.utils import timezone
 
 from apps.contratacoes.models import Contrato, Licitacao
-from apps.financas.models import DespesaSecretaria, ReceitaResumo
+from apps.financas.models import DespesaSecretaria, Emenda, ReceitaResumo
 from apps.fornecedores.models import Fornecedor
 from apps.governanca.models import Secretaria
 from apps.ingestao.models import DataProvenance, SyncRun
@@ -30,6 +31,59 @@ def test_api_dashboard_overview():
     assert "ano" in response.json()
 
 
+def test_dashboard_overview_served_from_kpi_snapshot(django_assert_max_num_queries):
+    from apps.monitoramento.services import recalcular_kpis
+
+    ReceitaResumo.objects.create(ano=2024, previsao=100, arrecadacao=80)
+    DespesaSecretaria.objects.create(ano=2024, secretaria="SEC. A", pago=30)
+    Contrato.objects.create(numero="1/2024", empresa="ACME", valor=10)
+    recalcular_kpis()
+
+    # Alteracoes depois do recalculo so aparecem na proxima carga.
+    Contrato.objects.create(numero="2/2024", empresa="ACME", valor=10)
+    client = Client()
+    with django_assert_max_num_queries(1):
+        data = client.get("/api/dashboard/overview/?ano=2024").json()
+    assert data["contratos"] == 1
+    assert data["receita_arrecadada"] == 80
+    assert data["despesa_paga"] == 30
+
+    with django_assert_max_num_queries(1):
+        assert client.get("/").status_code == 200
+
+
+def test_dashboard_overview_for_unloaded_year_is_read_only(monkeypatch):
+    from apps.monitoramento import services
+    from apps.monitoramento.models import KpiSnapshot
+
+    publicadas = []
+    monkeypatch.setattr(services, "publicar_atualizacao", publicadas.append)
+    ReceitaResumo.objects.create(ano=1999, previsao=100, arrecadacao=80)
+
+    response = Client().get("/api/dashboard/overview/?ano=1999")
+
+    assert response.status_code == 200
+    assert response.json()["receita_arrecadada"] == 80
+    assert not KpiSnapshot.objects.exists()
+    assert publicadas == []
+
+
+def test_dashboard_overview_fallback_computed_once_per_version(
+    settings, django_assert_max_num_queries
+):
+    from django.core.cache import cache
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    ReceitaResumo.objects.create(ano=1999, previsao=100, arrecadacao=80)
+    client = Client()
+    client.get("/api/dashboard/overview/?ano=1999")
+    # Segunda leitura: so a busca do snapshot.
+    with django_assert_max_num_queries(1):
+        data = client.get("/api/dashboard/overview/?ano=1999").json()
+    assert data["receita_arrecadada"] == 80
+
+
 def test_api_legislativo_vereadores_list():
     Vereador.objects.create(nome="Teste", partido="ABC", mandato="2025-2028")
     client = Client()
@@ -274,3 +328,340 @@ def test_csv_exports_for_core_list_endpoints():
         response = client.get(url)
         assert response.status_code == 200
         assert response["Content-Type"].startswith("text/csv")
+
+
+def test_get_condicional_responde_304_sem_consultas(
+    settings, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    Vereador.objects.create(nome="Teste", partido="ABC", mandato="2025-2028")
+    run = iniciar_execucao("teste")
+    with django_capture_on_commit_callbacks(execute=True):
+        finalizar_execucao(run, "sucesso")
+
+    client = Client()
+    url = "/api/legislativo/vereadores/?search=teste"
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+
+    with django_assert_num_queries(0):
+        repetida = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert repetida.status_code == 304
+    assert repetida["ETag"] == etag
+    assert (
+        client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code
+        == 304
+    )
+    # Outros parametros ou outro formato: outra ETag.
+    outra = client.get(f"{url}&ordering=nome", HTTP_IF_NONE_MATCH=etag)
+    assert outra.status_code == 200
+    assert outra["ETag"] != etag
+
+    # Carga nova muda a versao.
+    run = iniciar_execucao("teste")
+    with django_capture_on_commit_callbacks(execute=True):
+        finalizar_execucao(run, "sucesso")
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_get_condicional_so_em_dados_versionados(
+    settings, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    run = iniciar_execucao("teste")
+    with django_capture_on_commit_callbacks(execute=True):
+        finalizar_execucao(run, "sucesso")
+
+    client = Client()
+    response = client.get("/api/monitoramento/alertas/")
+    assert response.status_code == 200
+    # Status das cargas muda a cada execucao (inclusive com erro): sem ETag.
+    assert not client.get("/api/ingestao/status/").has_header("ETag")
+
+
+def test_csv_em_streaming_com_as_colunas_do_serializer(django_assert_max_num_queries):
+    import csv
+
+    User = get_user_model()
+    admin = User.objects.create_user("admin-csv", password="admin123")
+    admin.is_staff = True
+    admin.save()
+    LogEntry.objects.create(
+        user_id=admin.pk,
+        content_type_id=ContentType.objects.get_for_model(Fornecedor).pk,
+        object_id="1",
+        object_repr="Fornecedor Teste",
+        action_flag=2,
+        change_message="Atualizacao manual",
+    )
+    for matricula in range(5):
+        Servidor.objects.create(
+            matricula=str(matricula), nome="ANA", valor_bruto="1234.50"
+        )
+
+    client = Client()
+    client.force_login(admin)
+    for url in ("/api/ingestao/auditoria-manual/", "/api/pessoal/funcionarios/"):
+        response = client.get(f"{url}?export=csv")
+        assert response.streaming
+        with django_assert_max_num_queries(1):
+            conteudo = b"".join(response.streaming_content).decode()
+        linhas = list(csv.DictReader(conteudo.splitlines(), delimiter=";"))
+        esperado = client.get(url).json()["results"]
+        assert linhas == [
+            {campo: "" if v is None else str(v) for campo, v in row.items()}
+            for row in esperado
+        ]
+
+
+def test_exportacao_ndjson_mesmos_valores_do_json():
+    import json
+
+    DespesaSecretaria.objects.create(ano=2025, secretaria="SEC. A", pago="10.50")
+
+    client = Client()
+    response = client.get("/api/financas/por-secretaria/?ano=2025&export=ndjson")
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert 'filename="despesas-por-secretaria.ndjson"' in (
+        response["Content-Disposition"]
+    )
+    linhas = b"".join(response.streaming_content).decode().splitlines()
+    esperado = client.get("/api/financas/por-secretaria/?ano=2025").json()
+    assert [json.loads(linha) for linha in linhas] == esperado["results"]
+
+
+def test_exportacao_colunar_com_tipos(monkeypatch):
+    import datetime
+    import io
+    from decimal import Decimal
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from apps.common import arrow
+
+    User = get_user_model()
+    admin = User.objects.create_user("admin-arrow", password="admin123")
+    admin.is_staff = True
+    admin.save()
+    SyncRun.objects.create(fonte="teste", status="sucesso")
+    for matricula in range(5):
+        Servidor.objects.create(
+            matricula=str(matricula), nome="ANA", valor_bruto="1234.50"
+        )
+
+    client = Client()
+    response = client.get("/api/pessoal/funcionarios/?export=parquet")
+    assert response["Content-Type"] == "application/vnd.apache.parquet"
+    tabela = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+    assert tabela.num_rows == 5
+    assert pa.types.is_decimal(tabela.schema.field("valor_bruto").type)
+    assert tabela.column("valor_bruto")[0].as_py() == Decimal("1234.50")
+
+    client.force_login(admin)
+    response = client.get("/api/ingestao/status/?export=arrow")
+    tabela = pa.ipc.open_stream(b"".join(response.streaming_content)).read_all()
+    assert tabela.column_names[:3] == ["id", "fonte", "status"]
+    assert pa.types.is_timestamp(tabela.schema.field("iniciado_em").type)
+    assert isinstance(tabela.column("iniciado_em")[0].as_py(), datetime.datetime)
+
+    # Sem pyarrow os formatos colunares respondem 406; CSV e NDJSON seguem.
+    monkeypatch.setattr(arrow, "pa", None)
+    assert client.get("/api/ingestao/status/?export=parquet").status_code == 406
+    assert client.get("/api/ingestao/status/?export=ndjson").status_code == 200
+
+
+def test_paginacao_page_size_limitado_e_sem_contagem(django_assert_num_queries):
+    from urllib.parse import parse_qs, urlsplit
+
+    for matricula in range(30):
+        Servidor.objects.create(matricula=str(matricula), nome=f"SERVIDOR {matricula}")
+
+    client = Client()
+    data = client.get("/api/pessoal/funcionarios/?page_size=10").json()
+    assert (data["count"], len(data["results"])) == (30, 10)
+    data = client.get("/api/pessoal/funcionarios/?page_size=100000").json()
+    assert len(data["results"]) == 30
+
+    # Sem COUNT(*): so a consulta da pagina.
+    with django_assert_num_queries(1):
+        data = client.get(
+            "/api/pessoal/funcionarios/?count=false&page_size=20&page=2"
+        ).json()
+    assert data["count"] is None
+    assert len(data["results"]) == 10
+    assert data["next"] is None
+    assert "page" not in parse_qs(urlsplit(data["previous"]).query)
+    primeira = client.get("/api/pessoal/funcionarios/?count=false&page_size=20")
+    assert "page=2" in primeira.json()["next"]
+    assert (
+        client.get("/api/pessoal/funcionarios/?count=false&page=0").status_code == 404
+    )
+
+
+def test_paginacao_por_cursor_percorre_tabela_inteira(django_assert_num_queries):
+    for matricula in range(30):
+        Servidor.objects.create(
+            matricula=str(matricula), nome="ANA", valor_bruto=matricula % 7
+        )
+
+    client = Client()
+    for query, chave in (("", "id"), ("&ordering=-valor_bruto", "valor_bruto")):
+        url = f"/api/pessoal/funcionarios/?cursor=&page_size=8{query}"
+        vistos = []
+        while url:
+            with django_assert_num_queries(1):
+                data = client.get(url).json()
+            assert data["count"] is None
+            vistos.extend(data["results"])
+            url = data["next"]
+        assert len({row["id"] for row in vistos}) == 30
+        valores = [row[chave] for row in vistos]
+        if chave == "id":
+            assert valores == sorted(valores)
+        else:
+            assert valores == sorted(valores, key=float, reverse=True)
+
+    # Voltando uma pagina a partir da segunda.
+    primeira = client.get("/api/pessoal/funcionarios/?cursor=&page_size=8").json()
+    segunda = client.get(primeira["next"]).json()
+    assert client.get(segunda["previous"]).json()["results"] == primeira["results"]
+
+
+def test_lista_rapida_identica_ao_serializer():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    User = get_user_model()
+    admin = User.objects.create_user("admin-lista", password="admin123")
+    LogEntry.objects.create(
+        user_id=admin.pk,
+        content_type_id=ContentType.objects.get_for_model(Fornecedor).pk,
+        object_id="1",
+        object_repr="Fornecedor Teste",
+        action_flag=1,
+    )
+    LogEntry.objects.create(
+        user_id=admin.pk,
+        content_type_id=ContentType.objects.get_for_model(Fornecedor).pk,
+        object_id="2",
+        object_repr="Removido",
+        action_flag=3,
+    )
+    DataProvenance.objects.create(
+        fonte="teste", recurso="contrato", external_id="1", payload_hash="abc"
+    )
+    Fornecedor.objects.create(nome="ACME", cnpj="1", valor_total="10.5")
+    Licitacao.objects.create(certame="1/2025", objeto="Obra", valor="0.1")
+
+    saida = StringIO()
+    call_command(
+        "benchmark_listas", linhas=50, repeticoes=1, sinteticos=20, stdout=saida
+    )
+    assert saida.getvalue().count("identico") == 8
+    # Os dados sinteticos sao desfeitos ao final.
+    assert not Servidor.objects.exists()
+
+
+def test_agregado_em_um_group_by(django_assert_num_queries):
+    for numero, (modalidade, ano, valor) in enumerate(
+        [("PREGAO", 2024, "10.50"), ("PREGAO", 2024, "4.50"), ("PREGAO", 2025, "1")]
+        + [("DISPENSA", 2025, "7.25")]
+    ):
+        Contrato.objects.create(
+            numero=str(numero),
+            empresa="ACME",
+            modalidade=modalidade,
+            ano=ano,
+            valor=valor,
+        )
+
+    client = Client()
+    url = "/api/contratacoes/agregado/?group_by=modalidade,ano&metrics=sum:valor,count"
+    with django_assert_num_queries(1):
+        data = client.get(url).json()
+    assert data["modelo"] == "contratos"
+    assert data["results"] == [
+        {"modalidade": "DISPENSA", "ano": 2025, "sum_valor": "7.25", "count": 1},
+        {"modalidade": "PREGAO", "ano": 2024, "sum_valor": "15.00", "count": 2},
+        {"modalidade": "PREGAO", "ano": 2025, "sum_valor": "1.00", "count": 1},
+    ]
+
+    data = client.get(
+        "/api/contratacoes/agregado/?group_by=modalidade&metrics=max:valor"
+        "&ano=2025&ordering=-max_valor"
+    ).json()
+    assert data["results"] == [
+        {"modalidade": "DISPENSA", "max_valor": "7.25"},
+        {"modalidade": "PREGAO", "max_valor": "1.00"},
+    ]
+    total = client.get("/api/contratacoes/agregado/?metrics=count,sum:valor").json()
+    assert total["results"] == [{"count": 4, "sum_valor": "23.25"}]
+
+    Servidor.objects.create(matricula="1", nome="ANA", orgao="SAUDE", valor_bruto=100)
+    data = client.get(
+        "/api/pessoal/agregado/?group_by=orgao&metrics=avg:valor_bruto"
+    ).json()
+    assert data["results"] == [{"orgao": "SAUDE", "avg_valor_bruto": "100.00"}]
+
+
+def test_agregado_recusa_campos_fora_da_lista():
+    client = Client()
+    base = "/api/contratacoes/agregado/"
+    for query in (
+        "?group_by=objeto",
+        "?metrics=sum:ano",
+        "?metrics=median:valor",
+        "?modelo=fornecedores",
+        "?ano=abc",
+    ):
+        assert client.get(base + query).status_code == 400
+    assert client.get(f"{base}?modelo=licitacoes&group_by=status").status_code == 200
+    assert client.get("/api/financas/agregado/?modelo=orcamento").status_code == 200
+
+
+def test_agregado_filtra_booleano_como_as_listagens():
+    Contrato.objects.create(numero="1", empresa="ACME", valor=10, ativo=True)
+    Contrato.objects.create(numero="2", empresa="ACME", valor=5, ativo=False)
+    client = Client()
+    base = "/api/contratacoes/agregado/?group_by=ativo&metrics=count"
+    for valor, esperado in (("true", True), ("True", True), ("1", True)):
+        data = client.get(f"{base}&ativo={valor}").json()
+        assert data["results"] == [{"ativo": esperado, "count": 1}]
+    for valor in ("false", "False", "0"):
+        data = client.get(f"{base}&ativo={valor}").json()
+        assert data["results"] == [{"ativo": False, "count": 1}]
+
+
+def test_agregado_em_cache_pela_versao(settings, django_assert_num_queries):
+    from django.core.cache import cache
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    Emenda.objects.create(ano=2025, autoria="VEREADOR A", valor_previsto=10)
+    SyncRun.objects.create(
+        fonte="teste", status="sucesso", finalizado_em=timezone.now()
+    )
+
+    client = Client()
+    url = "/api/financas/agregado/?group_by=autoria&metrics=sum:valor_previsto"
+    primeira = client.get(url).json()
+    with django_assert_num_queries(0):
+        # Mesmos parametros em outra ordem; sem ETag, o corpo vem do cache.
+        repetida = client.get(
+            "/api/financas/agregado/?metrics=sum:valor_previsto&group_by=autoria"
+        ).json()
+    assert repetida == primeira
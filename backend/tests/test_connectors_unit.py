@@ -0,0 +1,387 @@
+import gzip
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import brotli
+import pytest
+
+from apps.ingestao import connectors
+from apps.ingestao.http_cache import (
+    CorpoEmCache,
+    ResponseCache,
+    carregar,
+    fetch_session,
+)
+from apps.ingestao.http_client import PooledHTTPClient
+from apps.ingestao.jsonstream import iter_json_rows
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.peers.add(self.client_address)
+            server.current += 1
+            server.peak = max(server.peak, server.current)
+        if self.path.startswith("/lento"):
+            time.sleep(0.05)
+        # Sai da contagem antes de responder: depois disso o cliente pode
+        # liberar a vaga e abrir outra requisicao.
+        with server.lock:
+            server.current -= 1
+        self._respond()
+
+    def _respond(self):
+        server = self.server
+        if self.path.startswith("/etag"):
+            body = json.dumps({"data": server.etag_rows}).encode("utf-8")
+            etag = '"v%d"' % len(server.etag_rows)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", "/dados")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"data": [{"id": 1}, {"id": 2}]}).encode("utf-8")
+        encoding = self.path.rsplit("/", 1)[-1]
+        if encoding == "gzip":
+            body = gzip.compress(body)
+        elif encoding == "deflate":
+            body = zlib.compress(body)
+        elif encoding == "br":
+            body = brotli.compress(body)
+        else:
+            encoding = ""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.peers = set()
+    server.current = 0
+    server.peak = 0
+    server.etag_rows = [{"id": 1}]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _base_url(server):
+    host, port = server.server_address
+    return f"http://{host}:{port}"
+
+
+def test_fetch_prefeitura_runs_endpoints_concurrently(monkeypatch):
+    barrier = threading.Barrier(4, timeout=5)
+
+    def fake_fetch_json(url, timeout=30, adiado=False):
+        # Only passes if the four requests are in flight at the same time.
+        barrier.wait()
+        return {"url": url}
+
+    monkeypatch.setattr(connectors, "_fetch_json", fake_fetch_json)
+
+    payload = connectors.fetch_prefeitura_2025("https://exemplo.test")
+
+    assert list(payload) == ["receitas", "despesas", "licitacoes", "contratos"]
+    assert "licitacaopordataasync" in payload["licitacoes"]["url"]
+
+
+def test_fetch_concurrently_propagates_first_error():
+    def ok():
+        return 1
+
+    def boom():
+        raise connectors.ConnectorError("falhou")
+
+    with pytest.raises(connectors.ConnectorError, match="falhou"):
+        connectors.fetch_concurrently({"a": ok, "b": boom, "c": ok})
+
+
+def test_pooled_client_reuses_connection(http_server):
+    client = PooledHTTPClient()
+    for _ in range(3):
+        with client.open(f"{_base_url(http_server)}/dados") as response:
+            assert json.loads(response.read())["data"][0]["id"] == 1
+    client.close()
+
+    assert len(http_server.peers) == 1
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate", "br"])
+def test_pooled_client_decodes_content_encoding(http_server, encoding):
+    client = PooledHTTPClient()
+    with client.open(f"{_base_url(http_server)}/dados/{encoding}") as response:
+        assert response.headers["Content-Encoding"] == encoding
+        assert json.loads(response.read()) == {"data": [{"id": 1}, {"id": 2}]}
+    client.close()
+
+
+def test_pooled_client_follows_redirects(http_server):
+    client = PooledHTTPClient()
+    with client.open(f"{_base_url(http_server)}/redirect") as response:
+        assert response.status == 200
+        assert response.url.endswith("/dados")
+        assert json.loads(response.read())["data"]
+    client.close()
+
+
+def test_pooled_client_caps_connections_per_host(http_server):
+    host = "{}:{}".format(*http_server.server_address)
+    client = PooledHTTPClient(max_per_host=4, host_limits={host: 2})
+
+    def job():
+        with client.open(f"http://{host}/lento") as response:
+            return response.status
+
+    results = connectors.fetch_concurrently({i: job for i in range(6)})
+    client.close()
+
+    assert set(results.values()) == {200}
+    assert http_server.peak == 2
+
+
+def _chunked(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 4096])
+def test_iter_json_rows_streams_data_array(chunk_size):
+    payload = {
+        "metadata": {"message": "ok", "itens": [1, 2]},
+        "data": [
+            {"id": 1, "valor": 12345.67, "txt": "Secretaria de Saúde ]}"},
+            {"id": 2, "valor": 10, "txt": 'aspas "escapadas" e \\\\'},
+            {"id": 3, "valor": -0.5, "lista": [1, {"a": None}]},
+        ],
+        "total": 3,
+    }
+    raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    rows = list(iter_json_rows(_chunked(raw, chunk_size)))
+
+    assert rows == payload["data"]
+
+
+def test_iter_json_rows_accepts_top_level_array_and_trailing_numbers():
+    raw = b"[1, 22, 333, 4444]"
+    assert list(iter_json_rows(_chunked(raw, 1))) == [1, 22, 333, 4444]
+    assert list(iter_json_rows([b"{}"])) == []
+    assert list(iter_json_rows([b""])) == []
+
+
+def test_stream_json_rows_from_pooled_client(http_server, monkeypatch):
+    monkeypatch.setattr(connectors, "http_client", PooledHTTPClient())
+
+    rows = list(connectors.stream_json_rows(f"{_base_url(http_server)}/dados/gzip"))
+
+    assert rows == [{"id": 1}, {"id": 2}]
+
+
+def test_fetch_session_sends_validators_and_detects_unchanged(
+    http_server, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(connectors, "http_client", PooledHTTPClient())
+    cache = ResponseCache(tmp_path)
+    url = f"{_base_url(http_server)}/etag"
+
+    with fetch_session(cache) as primeira:
+        assert connectors._fetch_json(url) == {"data": [{"id": 1}]}
+    assert not primeira.unchanged
+
+    with fetch_session(cache) as segunda:
+        assert connectors._fetch_json(url) == {"data": [{"id": 1}]}
+        assert list(connectors.stream_json_rows(url)) == [{"id": 1}]
+    assert segunda.unchanged
+
+    http_server.etag_rows = [{"id": 1}, {"id": 2}]
+    with fetch_session(cache) as terceira:
+        assert list(connectors.stream_json_rows(url)) == [{"id": 1}, {"id": 2}]
+    assert not terceira.unchanged
+    assert cache.lookup(url)["etag"] == '"v2"'
+
+
+def test_fetch_session_falls_back_to_content_hash(http_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(connectors, "http_client", PooledHTTPClient())
+    cache = ResponseCache(tmp_path)
+    url = f"{_base_url(http_server)}/dados/gzip"
+
+    with fetch_session(cache):
+        connectors.fetch_concurrently({"a": lambda: connectors._fetch_json(url)})
+    with fetch_session(cache) as session:
+        connectors.fetch_concurrently({"a": lambda: connectors._fetch_json(url)})
+
+    assert session.urls == {url: False}
+    assert session.unchanged
+
+
+def test_response_cache_evicts_by_ttl_and_size(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, ttl=100, max_bytes=10)
+    agora = [1000.0]
+    monkeypatch.setattr("apps.ingestao.http_cache.time.time", lambda: agora[0])
+
+    cache.store("https://a.test", b"123456", {"ETag": '"a"'})
+    agora[0] += 1
+    cache.store("https://b.test", b"123456", {})
+
+    assert cache.lookup("https://a.test") is None
+    assert cache.read_body("https://b.test") == b"123456"
+
+    agora[0] += 101
+    assert cache.lookup("https://b.test") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def _fake_status_factory(aceitos: dict, chamadas: list):
+    lock = threading.Lock()
+
+    def fake_fetch_json_status(url, timeout=30):
+        with lock:
+            chamadas.append(url)
+        base, _, query = url.partition("?")
+        if aceitos.get(base) == query:
+            return {"ok": True, "status_code": 200, "payload": {"data": [1, 2]}}
+        return {"ok": False, "status_code": 400, "payload": {}, "error_code": "ERR"}
+
+    return fake_fetch_json_status
+
+
+def test_operacionais_probes_race_and_persist_resolved_params(monkeypatch, tmp_path):
+    base = "https://dadosabertos.topsolutionsrn.com.br/pmtibausulrn"
+    aceitos = {
+        f"{base}/diaria/diariaasync": "numExercicio=2025",
+        f"{base}/obra/ObraAsync": "",
+        f"{base}/planocontratacaoanual/planocontratacaoanualasync": "strExercicio=2025",
+    }
+    chamadas = []
+    monkeypatch.setattr(
+        connectors, "_fetch_json_status", _fake_status_factory(aceitos, chamadas)
+    )
+    store = connectors.ResolvedParamsStore(tmp_path / "params.json")
+
+    result = connectors.fetch_topsolutions_operacionais(2025, params_store=store)
+
+    assert result["diarias"]["ok"] and result["diarias"]["count"] == 2
+    assert result["diarias"]["resolved_params"] == {"numExercicio": 2025}
+    assert result["obras"]["resolved_params"] == {}
+    assert result["pca"]["resolved_params"] == {"strExercicio": 2025}
+    assert store.get(f"{base}/diaria/diariaasync") == ["numExercicio"]
+
+    # Na coleta seguinte (outro exercicio) o formato salvo e usado direto.
+    aceitos[f"{base}/diaria/diariaasync"] = "numExercicio=2026"
+    aceitos[f"{base}/planocontratacaoanual/planocontratacaoanualasync"] = (
+        "strExercicio=2026"
+    )
+    chamadas.clear()
+    result = connectors.fetch_topsolutions_operacionais(2026, params_store=store)
+
+    assert len(chamadas) == 3
+    assert all(result[key]["ok"] for key in ("diarias", "obras", "pca"))
+
+
+def test_probe_cancels_remaining_candidates_after_success(monkeypatch):
+    endpoint = "https://exemplo.test/diaria"
+    chamadas = []
+    monkeypatch.setattr(
+        connectors,
+        "_fetch_json_status",
+        _fake_status_factory({endpoint: "ano=2025"}, chamadas),
+    )
+    candidates = [{}, {"ano": 2025}, {"exercicio": 2025}, {"numExercicio": 2025}]
+
+    result = connectors._probe_topsolutions_endpoints(
+        {"diarias": {"url": endpoint, "candidates": candidates}}, max_workers=1
+    )
+
+    assert result["diarias"]["resolved_params"] == {"ano": 2025}
+    assert chamadas == [endpoint, f"{endpoint}?ano=2025"]
+    assert [a["ok"] for a in result["diarias"]["attempts"]] == [False, True]
+
+
+def test_fetch_json_defers_cached_body_on_304(http_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(connectors, "http_client", PooledHTTPClient())
+    cache = ResponseCache(tmp_path)
+    url = f"{_base_url(http_server)}/etag"
+    with fetch_session(cache):
+        connectors._fetch_json(url)
+
+    lidos = []
+    read_body = cache.read_body
+    monkeypatch.setattr(cache, "read_body", lambda u: lidos.append(u) or read_body(u))
+    with fetch_session(cache) as session:
+        corpo = connectors._fetch_json(url, adiado=True)
+        assert session.unchanged
+
+    assert isinstance(corpo, CorpoEmCache)
+    assert lidos == []
+    assert carregar(corpo) == {"data": [{"id": 1}]}
+    assert lidos == [url]
+
+
+@pytest.mark.django_db
+def test_sync_command_caches_responses_only_after_write(
+    http_server, monkeypatch, tmp_path
+):
+    from django.core.management import call_command
+
+    from apps.ingestao.management.commands import sync_camara_portal as cmd
+    from apps.ingestao.models import SyncRun
+
+    monkeypatch.setattr(connectors, "http_client", PooledHTTPClient())
+    url = f"{_base_url(http_server)}/etag"
+    monkeypatch.setattr(
+        cmd, "fetch_camara_portal", lambda _url: connectors._fetch_json(url, True)
+    )
+    output_file = tmp_path / "camara-init-data.json"
+    opcoes = {"output_file": str(output_file), "cache_dir": str(tmp_path / "cache")}
+    write = cmd.Command.write
+
+    def falhar(self, payload, options):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(cmd.Command, "write", falhar)
+    with pytest.raises(OSError):
+        call_command("sync_camara_portal", **opcoes)
+    assert ResponseCache(tmp_path / "cache").lookup(url) is None
+    assert list((tmp_path / "cache").iterdir()) == []
+
+    # A escrita volta a funcionar: a origem nao mudou, mas o snapshot e gravado.
+    monkeypatch.setattr(cmd.Command, "write", write)
+    call_command("sync_camara_portal", **opcoes)
+    assert json.loads(output_file.read_text(encoding="utf-8")) == {"data": [{"id": 1}]}
+    call_command("sync_camara_portal", **opcoes)
+    assert list(
+        SyncRun.objects.filter(fonte="sync_camara_portal")
+        .order_by("pk")
+        .values_list("status", flat=True)
+    ) == ["erro", "sucesso", "sem_alteracao"]
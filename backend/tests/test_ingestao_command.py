@@ -4,12 +4,14 @@ from pathlib import Path
 import pytest
 from django.contrib.auth.models import Group
 from django.core.management import call_command
+from django.test import Client
 
 from apps.contratacoes.models import Contrato, Licitacao
 from apps.financas.models import DespesaSecretaria, ReceitaResumo
 from apps.fornecedores.models import Fornecedor
 from apps.ingestao.models import SyncRun
 from apps.legislativo.models import Vereador
+from apps.monitoramento.models import KpiSnapshot
 from apps.pessoal.models import Servidor
 
 pytestmark = pytest.mark.django_db
@@ -99,6 +101,89 @@ def test_load_legacy_snapshot(tmp_path):
     assert SyncRun.objects.filter(fonte="legacy_snapshot", status="sucesso").exists()
 
 
+def _write_legacy_snapshot(path: Path, quantidade: int, valor: int):
+    _write_json(path / "receitas2025.json", {"data": []})
+    _write_json(
+        path / "despesasOrgao2025.json",
+        {
+            "data": [
+                {
+                    "exercicio": 2025,
+                    "txtDescricaoUnidade": f"SEC. {i}",
+                    "vlrOrcadoAtualizado": valor,
+                }
+                for i in range(quantidade)
+            ]
+        },
+    )
+    _write_json(
+        path / "licitacoes2025.json",
+        {
+            "data": [
+                {"numCertame": f"{i}/2025", "vlrTotal": valor}
+                for i in range(quantidade)
+            ]
+        },
+    )
+    _write_json(
+        path / "contratos2025.json",
+        {
+            "data": [
+                {
+                    "numContrato": f"{i}/2025",
+                    "txtNomeRazaoContratada": f"Empresa {i}",
+                    "vlrContrato": valor,
+                }
+                for i in range(quantidade)
+            ]
+        },
+    )
+    _write_json(
+        path / "servidores2025.json",
+        [
+            {
+                "mes": 12,
+                "payload": {
+                    "data": [
+                        {
+                            "nome": f"Servidor {i}",
+                            "orgao": f"SEC. {i}",
+                            "vlrRemuneracaoBruta": valor,
+                        }
+                        for i in range(quantidade)
+                    ]
+                },
+            }
+        ],
+    )
+
+
+def test_load_legacy_snapshot_uses_bulk_upsert(tmp_path, django_assert_max_num_queries):
+    _write_legacy_snapshot(tmp_path, quantidade=200, valor=10)
+    # Limite fixo, independente da quantidade de linhas; inclui as etapas do
+    # fim da carga (secretarias, categorias e KpiSnapshot).
+    with django_assert_max_num_queries(100):
+        call_command("load_legacy_snapshot", data_dir=str(tmp_path))
+
+    assert Licitacao.objects.count() == 200
+    assert Servidor.objects.count() == 200
+
+    _write_legacy_snapshot(tmp_path, quantidade=200, valor=20)
+    with django_assert_max_num_queries(100):
+        call_command("load_legacy_snapshot", data_dir=str(tmp_path))
+
+    assert Licitacao.objects.count() == 200
+    assert Contrato.objects.count() == 200
+    assert DespesaSecretaria.objects.count() == 200
+    assert Fornecedor.objects.count() == 200
+    assert set(Licitacao.objects.values_list("valor", flat=True)) == {20}
+    assert set(Servidor.objects.values_list("valor_bruto", flat=True)) == {20}
+    assert set(DespesaSecretaria.objects.values_list("orcamento", flat=True)) == {20}
+
+    kpis = KpiSnapshot.objects.get(ano=2025)
+    assert (kpis.licitacoes, kpis.despesa_orcada) == (200, 4000)
+
+
 def test_create_access_profiles_command():
     call_command("create_access_profiles")
 
@@ -287,3 +372,341 @@ def test_load_legacy_snapshot_is_idempotent(tmp_path):
     }
 
     assert second_counts == first_counts
+
+
+def test_load_legacy_snapshot_keeps_other_sources_and_years(tmp_path):
+    from apps.ingestao.bulk import bulk_upsert
+
+    tce = Licitacao.objects.create(certame="0/2025", fonte="tce_rn", valor=1)
+    anterior = Contrato.objects.create(
+        numero="0/2025", empresa="EMPRESA 0", ano=2024, fonte="topsolutions", valor=1
+    )
+    _write_legacy_snapshot(tmp_path, quantidade=2, valor=10)
+
+    call_command("load_legacy_snapshot", data_dir=str(tmp_path))
+
+    tce.refresh_from_db()
+    anterior.refresh_from_db()
+    assert (tce.valor, anterior.valor) == (1, 1)
+    legado = Licitacao.objects.get(certame="0/2025", fonte="topsolutions")
+    assert (legado.ano, legado.valor) == (2025, 10)
+
+    Licitacao.objects.create(certame="0/2025", ano=2025, fonte="topsolutions")
+    with pytest.raises(Licitacao.MultipleObjectsReturned):
+        bulk_upsert(
+            Licitacao,
+            [{"certame": "0/2025", "ano": 2025, "fonte": "topsolutions", "valor": 5}],
+            key_fields=["certame", "ano", "fonte"],
+            update_fields=["valor"],
+        )
+    assert not Licitacao.objects.filter(valor=5).exists()
+
+
+def test_load_investigation_data_streams_orcamento_and_servidores(tmp_path):
+    from apps.financas.models import OrcamentoItem
+    from apps.governanca.models import Secretaria
+
+    data_dir = tmp_path / "investigation"
+    data_dir.mkdir()
+    _write_json(
+        data_dir / "ts-orcamento-2025-full.json",
+        {
+            "metadata": {"message": ""},
+            "data": [
+                {
+                    "numExercicioFinanc": 2025,
+                    "codOrgao": "02",
+                    "txtDescricaoUnidade": "Sec. de Saude",
+                    "txtDescricaoAcao": "Manutencao",
+                    "vlrOrcamentoInicial": "1.000,50",
+                },
+                {
+                    "numExercicioFinanc": 2025,
+                    "codOrgao": "03",
+                    "txtDescricaoUnidade": "Sec. de Educacao",
+                    "txtDescricaoAcao": "Merenda",
+                    "vlrOrcamentoInicial": 200,
+                },
+            ],
+        },
+    )
+    _write_json(
+        data_dir / "ts-servidores-2026-01-full.json",
+        [
+            {
+                "numMatricula": "001",
+                "nome": "Servidor A",
+                "orgao": "SEC. DE SAUDE - EF",
+                "dtMesAno": "2025-12-01T00:00:00",
+                "vlrRemuneracaoBruta": 1000,
+            },
+            {
+                "numMatricula": "001",
+                "nome": "Servidor A",
+                "orgao": "SEC. DE SAUDE - EF",
+                "dtMesAno": "2026-01-01T00:00:00",
+                "vlrRemuneracaoBruta": 1100,
+            },
+        ],
+    )
+
+    call_command(
+        "load_investigation_data",
+        data_dir=str(data_dir),
+        exports_dir=str(tmp_path / "exports"),
+    )
+
+    assert OrcamentoItem.objects.count() == 2
+    assert str(OrcamentoItem.objects.get(orgao_cod="02").valor_inicial) == "1000.50"
+    assert Secretaria.objects.filter(nome="SEC. DE EDUCACAO").exists()
+    servidor = Servidor.objects.get(matricula="001")
+    assert servidor.valor_bruto == 1100
+    assert servidor.orgao == "SEC. DE SAUDE"
+
+
+def test_load_investigation_data_applies_delta(tmp_path):
+    from apps.financas.models import Emenda
+    from apps.monitoramento.models import Alerta
+
+    data_dir = tmp_path / "investigation"
+    data_dir.mkdir()
+
+    def _emenda(numero, pago):
+        return {
+            "numEmenda": numero,
+            "anoEmenda": "2025",
+            "autoria": "Vereador A",
+            "vlrPrevisto": "1000,00",
+            "vlrPago": pago,
+            "dtEmenda": "2025-03-01T00:00:00",
+        }
+
+    def _servidor(matricula, bruto):
+        return {
+            "numMatricula": matricula,
+            "nome": f"Servidor {matricula}",
+            "orgao": "SEC. DE SAUDE - EF",
+            "vinculo": "Efetivo",
+            "dtMesAno": "2026-01-01T00:00:00",
+            "vlrRemuneracaoBruta": bruto,
+        }
+
+    _write_json(data_dir / "ts-emendas-full.json", [_emenda("1", 0), _emenda("2", 0)])
+    _write_json(
+        data_dir / "ts-servidores-2026-01-full.json",
+        [_servidor("001", 1000), _servidor("002", 1000)],
+    )
+    load = dict(data_dir=str(data_dir), exports_dir=str(tmp_path / "exports"))
+    call_command("load_investigation_data", **load)
+
+    emenda_1 = Emenda.objects.get(numero="1")
+    servidor_1 = Servidor.objects.get(matricula="001")
+    alerta = Alerta.objects.get(codigo="EMENDA-EXEC-001")
+    primeira = SyncRun.objects.get(fonte="investigation_data")
+    assert primeira.inseridos >= 4
+    assert primeira.removidos == 0
+
+    # Emenda 2 paga, emenda 3 nova; servidor 002 saiu e 003 entrou.
+    _write_json(
+        data_dir / "ts-emendas-full.json",
+        [_emenda("1", 0), _emenda("2", 100), _emenda("3", 0)],
+    )
+    _write_json(
+        data_dir / "ts-servidores-2026-01-full.json",
+        [_servidor("001", 1000), _servidor("003", 1200)],
+    )
+    call_command("load_investigation_data", **load)
+
+    segunda = SyncRun.objects.filter(fonte="investigation_data").first()
+    assert segunda.pk != primeira.pk
+    # +emenda 3, +servidor 003; ~emenda 2, ~texto do alerta; -servidor 002.
+    assert segunda.inseridos == 2
+    assert segunda.atualizados == 2
+    assert segunda.removidos == 1
+    assert Emenda.objects.get(numero="1").pk == emenda_1.pk
+    assert Emenda.objects.get(numero="2").valor_pago == 100
+    assert Servidor.objects.get(matricula="001").pk == servidor_1.pk
+    assert set(Servidor.objects.values_list("matricula", flat=True)) == {"001", "003"}
+    assert Alerta.objects.get(codigo="EMENDA-EXEC-001").pk == alerta.pk
+
+
+def test_apply_delta_handles_repeated_keys():
+    from apps.financas.models import OrcamentoItem
+    from apps.ingestao.bulk import apply_delta
+
+    def _item(acao, valor):
+        return {"ano": 2025, "unidade": "SEC", "acao": acao, "valor_inicial": valor}
+
+    fields = ("ano", "unidade", "acao", "valor_inicial")
+    key = ("ano", "acao")
+    apply_delta(
+        OrcamentoItem, [_item("A", 1), _item("A", 2), _item("B", 3)], key, fields
+    )
+    ids = dict(OrcamentoItem.objects.values_list("valor_inicial", "pk"))
+
+    resultado = apply_delta(
+        OrcamentoItem, [_item("A", 2), _item("A", 5), _item("A", 6)], key, fields
+    )
+
+    assert resultado == {
+        "inseridos": 1,
+        "atualizados": 1,
+        "removidos": 1,
+        "inalterados": 1,
+    }
+    assert sorted(OrcamentoItem.objects.values_list("valor_inicial", flat=True)) == [
+        2,
+        5,
+        6,
+    ]
+    assert OrcamentoItem.objects.get(valor_inicial=2).pk == ids[2]
+
+
+def test_apply_delta_streams_in_batches_within_scope():
+    from apps.financas.models import OrcamentoItem
+    from apps.ingestao.bulk import apply_delta
+
+    def _item(ano, acao, valor):
+        return {"ano": ano, "unidade": "SEC", "acao": acao, "valor_inicial": valor}
+
+    fields = ("ano", "unidade", "acao", "valor_inicial")
+    key = ("ano", "acao")
+    outro_ano = OrcamentoItem.objects.create(**_item(2024, "A", 9))
+    apply_delta(
+        OrcamentoItem,
+        iter([_item(2025, "A", 1), _item(2025, "B", 2), _item(2025, "A", 3)]),
+        key,
+        fields,
+        escopo="ano",
+        batch_size=2,
+    )
+    ids = dict(
+        OrcamentoItem.objects.filter(ano=2025).values_list("valor_inicial", "pk")
+    )
+
+    # A chave "A" se repete em lotes diferentes.
+    resultado = apply_delta(
+        OrcamentoItem,
+        (item for item in [_item(2025, "A", 3), _item(2025, "C", 4)]),
+        key,
+        fields,
+        escopo="ano",
+        batch_size=1,
+    )
+
+    assert resultado == {
+        "inseridos": 1,
+        "atualizados": 0,
+        "removidos": 2,
+        "inalterados": 1,
+    }
+    assert OrcamentoItem.objects.get(ano=2025, acao="A").pk == ids[3]
+    assert sorted(
+        OrcamentoItem.objects.filter(ano=2025).values_list("acao", flat=True)
+    ) == ["A", "C"]
+    assert OrcamentoItem.objects.get(pk=outro_ano.pk).valor_inicial == 9
+
+
+def test_provenance_recorder_creates_only_new_hashes(django_assert_num_queries):
+    from apps.ingestao.models import DataProvenance
+    from apps.ingestao.provenance import ProvenanceRecorder, payload_hash
+
+    DataProvenance.objects.create(
+        fonte="teste",
+        endpoint="arquivo.json",
+        recurso="linha",
+        payload_hash=payload_hash({"id": 0}),
+    )
+
+    # 5 linhas (1 ja existente, 1 repetida) em lotes de 2: 2 consultas por lote.
+    with django_assert_num_queries(4):
+        with ProvenanceRecorder(batch_size=2) as recorder:
+            for row in [{"id": 0}, {"id": 1}, {"id": 1}, {"id": 2}, {"id": 3}]:
+                recorder.track("teste", "arquivo.json", "linha", row["id"], row)
+
+    assert recorder.criados == 3
+    assert recorder.existentes == 1
+    assert DataProvenance.objects.count() == 4
+
+
+def test_bulk_loads_fill_normalized_name_columns():
+    from apps.ingestao.bulk import apply_delta, bulk_upsert
+
+    # ``empresa`` so aparece na chave; a coluna normalizada e preenchida mesmo
+    # assim.
+    bulk_upsert(
+        Contrato,
+        [{"numero": "1/2025", "empresa": "CONSTRUÇÕES SÃO JOÃO", "valor": 10}],
+        key_fields=["numero", "empresa"],
+        update_fields=["valor"],
+    )
+    apply_delta(
+        Servidor,
+        [{"matricula": "1", "nome": "JOSÉ  D'ÁVILA", "orgao": "SAUDE"}],
+        key_fields=("matricula",),
+        fields=("matricula", "nome", "orgao"),
+    )
+    Fornecedor.objects.create(nome="Água Pura Ltda.")
+
+    contrato = Contrato.objects.get()
+    assert contrato.empresa_normalizada == "construcoes sao joao"
+    assert Servidor.objects.get().nome_normalizado == "jose d avila"
+    assert Fornecedor.objects.get().nome_normalizado == "agua pura ltda"
+
+    contrato.empresa = "Outra Empresa"
+    contrato.save(update_fields=["empresa"])
+    contrato.refresh_from_db()
+    assert contrato.empresa_normalizada == "outra empresa"
+
+
+def test_recalcular_derivados_after_loaddata(tmp_path):
+    fixture = tmp_path / "seed.json"
+    fixture.write_text(
+        json.dumps(
+            [
+                {
+                    "model": "governanca.secretaria",
+                    "pk": 1,
+                    "fields": {"nome": "SECRETARIA DE SAUDE"},
+                },
+                {
+                    "model": "pessoal.servidor",
+                    "pk": 1,
+                    "fields": {"nome": "ABIGAIL SOUZA", "orgao": "SECRETARIA DE SAUDE"},
+                },
+                {
+                    "model": "contratacoes.contrato",
+                    "pk": 1,
+                    "fields": {
+                        "numero": "1/2025",
+                        "empresa": "SOLAR LTDA",
+                        "objeto": "Licenca de software",
+                        "valor": "10.00",
+                    },
+                },
+                {
+                    "model": "fornecedores.fornecedor",
+                    "pk": 1,
+                    "fields": {"nome": "Solar Ltda."},
+                },
+            ]
+        ),
+        encoding="utf-8",
+    )
+    call_command("loaddata", str(fixture))
+    # loaddata grava sem save(): as colunas derivadas ficam vazias.
+    assert Servidor.objects.get().nome_normalizado == ""
+
+    call_command("recalcular_derivados")
+
+    assert Servidor.objects.get().nome_normalizado == "abigail souza"
+    assert Servidor.objects.get().secretaria_id == 1
+    assert Contrato.objects.filter(categorias__categoria="tecnologia").count() == 1
+    assert Contrato.objects.get().empresa_normalizada == "solar ltda"
+    assert Fornecedor.objects.get().nome_normalizado == "solar ltda"
+    client = Client()
+    response = client.get("/api/pessoal/funcionarios/?search=abigail")
+    assert response.json()["count"] == 1
+    assert client.get("/tecnologia/").context["total_tech"] == 10
+    # O painel le o KpiSnapshot em vez de recalcular a cada requisicao.
+    assert KpiSnapshot.objects.get(ano=2025).contratos == 1
@@ -37,3 +37,34 @@ def test_servidor_dedupe_key_prefers_matricula():
 
 def test_servidor_dedupe_key_fallback_composite():
     assert servidor_dedupe_key("Maria", "Saude", "Efetivo", "") == "MARIA|SAUDE|EFETIVO"
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    from apps.common.aho_corasick import AhoCorasick
+
+    automato = AhoCorasick(["he", "she", "his", "hers", ""])
+    assert automato.encontrar("ushers") == {"she", "he", "hers"}
+    assert automato.encontrar("ahishe") == {"his", "she", "he"}
+    assert automato.encontrar("xyz") == set()
+
+
+def test_mapear_orgaos_follows_secretaria_matching_rules():
+    from types import SimpleNamespace
+
+    from apps.pessoal.services import mapear_orgaos
+
+    saude = SimpleNamespace(nome="Saude")
+    saude_publica = SimpleNamespace(nome="Secretaria de Saúde Pública")
+    educacao = SimpleNamespace(nome="Secretaria de Educacao")
+    mapa = mapear_orgaos(
+        ["SAÚDE", "SEC. DE SAUDE PUBLICA", "EDUCACAO", "FUNDEB", ""],
+        [saude, saude_publica, educacao],
+    )
+    # Nome igual ganha da secretaria mais longa que tambem contem o orgao.
+    assert mapa["SAÚDE"] is saude
+    # Secretaria contida no orgao.
+    assert mapa["SEC. DE SAUDE PUBLICA"] is saude
+    # Orgao contido no nome da secretaria.
+    assert mapa["EDUCACAO"] is educacao
+    assert mapa["FUNDEB"] is None
+    assert mapa[""] is None
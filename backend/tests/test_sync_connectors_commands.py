@@ -66,3 +66,308 @@ def test_sync_camara_portal_command_writes_file(tmp_path, monkeypatch):
 
     assert output_file.exists()
     assert json.loads(output_file.read_text(encoding="utf-8"))["ok"] is True
+
+
+def test_sync_municipio_contexto_refreshes_kpi_snapshot(tmp_path, monkeypatch):
+    from apps.common import seed_data
+    from apps.ingestao.management.commands import sync_municipio_contexto as cmd
+    from apps.monitoramento.models import KpiSnapshot
+    from apps.monitoramento.services import recalcular_kpis
+
+    monkeypatch.setattr(seed_data, "_BACKEND_DIR", tmp_path / "backend")
+    output_dir = tmp_path / "data" / "exports"
+    recalcular_kpis([2025])
+    assert KpiSnapshot.objects.get(ano=2025).contexto_municipio == {}
+
+    fontes = []
+
+    def fake_fetch_concurrently(fetchers):
+        fontes.extend(fetchers)
+        return {
+            "detalhes": {
+                "orcamento": [
+                    {"vlrOrcamentoInicial": 10, "vlrOrcamentoAtualizado": 12},
+                    {"vlrOrcamentoInicial": 5, "vlrOrcamentoAtualizado": 6},
+                ],
+                "emendas": [{"autoria": "Fulano", "vlrPago": 3}],
+            },
+            "operacionais": {},
+            "ibge": {"populacao": 1000},
+            "tce_rn": {},
+        }
+
+    monkeypatch.setattr(cmd, "fetch_concurrently", fake_fetch_concurrently)
+    call_command(
+        "sync_municipio_contexto",
+        output_dir=str(output_dir),
+        output_file=str(output_dir / "municipio-contexto.json"),
+    )
+
+    # O orcamento e baixado uma vez so: o resumo sai dos detalhes.
+    assert sorted(fontes) == ["detalhes", "ibge", "operacionais", "tce_rn"]
+    contexto = KpiSnapshot.objects.get(ano=2025).contexto_municipio
+    assert contexto["ibge"] == {"populacao": 1000}
+    assert contexto["topsolutions"]["orcamento_registros"] == 2
+    assert contexto["topsolutions"]["orcamento_inicial_total"] == 15
+    assert contexto["topsolutions"]["orcamento_atualizado_total"] == 18
+    assert contexto["topsolutions"]["emendas_pago_total"] == 3
+
+
+def test_sync_command_skips_writes_when_source_unchanged(tmp_path, monkeypatch):
+    from apps.ingestao.http_cache import current_session
+    from apps.ingestao.management.commands import sync_camara_portal as cmd
+    from apps.ingestao.models import SyncRun
+
+    def fake_fetch(url):
+        current_session().record(url, alterado=False)
+        return {"ok": True}
+
+    monkeypatch.setattr(cmd, "fetch_camara_portal", fake_fetch)
+    output_file = tmp_path / "camara-init-data.json"
+
+    call_command(
+        "sync_camara_portal",
+        output_file=str(output_file),
+        cache_dir=str(tmp_path / "cache"),
+    )
+
+    assert not output_file.exists()
+    run = SyncRun.objects.get(fonte="sync_camara_portal")
+    assert run.status == "sem_alteracao"
+    assert run.finalizado_em is not None
+
+    call_command(
+        "sync_camara_portal",
+        output_file=str(output_file),
+        cache_dir=str(tmp_path / "cache"),
+        force=True,
+    )
+    assert output_file.exists()
+    assert SyncRun.objects.filter(fonte="sync_camara_portal", status="sucesso").exists()
+
+
+@pytest.fixture
+def celery_eager():
+    from config.celery import app
+
+    previous = (app.conf.task_always_eager, app.conf.task_eager_propagates)
+    app.conf.task_always_eager = True
+    app.conf.task_eager_propagates = False
+    yield app
+    app.conf.task_always_eager, app.conf.task_eager_propagates = previous
+
+
+def test_orchestrator_pipelines_fetch_and_load_with_retry(
+    tmp_path, monkeypatch, celery_eager
+):
+    from apps.contratacoes.models import Licitacao
+    from apps.ingestao import tasks
+    from apps.ingestao.connectors import ConnectorError
+    from apps.ingestao.management.commands import sync_prefeitura_topsolutions as cmd
+    from apps.ingestao.models import SyncRun
+
+    chamadas = []
+
+    def flaky_fetch(_base_url):
+        chamadas.append(_base_url)
+        if len(chamadas) == 1:
+            raise ConnectorError("timeout")
+        return {
+            "receitas": {"data": []},
+            "despesas": {"data": []},
+            "licitacoes": {"data": [{"numCertame": "1/2025", "vlrTotal": 10}]},
+            "contratos": {"data": []},
+        }
+
+    monkeypatch.setattr(cmd, "fetch_prefeitura_2025", flaky_fetch)
+    # A folha nao vem dessa coleta; ja esta no diretorio da snapshot.
+    (tmp_path / "servidores2025.json").write_text("[]", encoding="utf-8")
+
+    # Sem opcoes de carga: o loader le do diretorio gravado pela coleta.
+    resultado = tasks.pipeline_fonte(
+        "prefeitura",
+        {"output_dir": str(tmp_path), "cache_dir": str(tmp_path / "cache")},
+    ).apply()
+
+    assert resultado.get()["carga"] == "executada"
+    assert len(chamadas) == 2
+    runs = SyncRun.objects.filter(fonte="sync_prefeitura_topsolutions")
+    assert sorted(runs.values_list("status", flat=True)) == ["erro", "sucesso"]
+    assert all(run.finalizado_em >= run.iniciado_em for run in runs)
+    carga = SyncRun.objects.get(fonte="legacy_snapshot")
+    assert (carga.pk, carga.status) == (resultado.get()["carga_run_id"], "sucesso")
+    assert Licitacao.objects.filter(certame="1/2025").exists()
+
+
+def test_orchestrator_reports_load_that_did_not_start(tmp_path, celery_eager):
+    from apps.ingestao import tasks
+
+    coleta = {
+        "fonte": "prefeitura",
+        "run_id": 1,
+        "status": "sucesso",
+        "opcoes_carga": {"data_dir": str(tmp_path / "inexistente")},
+    }
+    resultado = tasks.carregar_fonte.apply(args=(coleta,))
+
+    assert resultado.get()["carga"] == "nao_executada"
+
+
+def test_orchestrator_skips_load_when_source_unchanged(tmp_path, celery_eager):
+    from apps.ingestao import tasks
+    from apps.ingestao.models import SyncRun
+
+    coleta = {
+        "fonte": "prefeitura",
+        "run_id": 1,
+        "status": "sem_alteracao",
+        "opcoes_carga": {"data_dir": str(tmp_path / "inexistente")},
+    }
+    SyncRun.objects.create(fonte="legacy_snapshot", status="sucesso")
+    resultado = tasks.carregar_fonte.apply(args=(coleta,))
+    assert resultado.get()["carga"] == "ignorada"
+
+    # A ultima carga falhou: roda de novo mesmo sem alteracao na origem.
+    SyncRun.objects.create(fonte="legacy_snapshot", status="erro")
+    resultado = tasks.carregar_fonte.apply(args=(coleta,))
+    assert resultado.get()["carga"] == "nao_executada"
+
+
+def test_backfill_prefeitura_loads_windows_and_resumes(tmp_path, monkeypatch):
+    from django.core.management.base import CommandError
+
+    from apps.contratacoes.models import Licitacao
+    from apps.financas.models import ReceitaResumo
+    from apps.ingestao.connectors import ConnectorError
+    from apps.ingestao.management.commands import backfill_prefeitura as cmd
+    from apps.ingestao.models import SyncRun
+
+    chamadas = []
+    falhar = {"dtInicio=2024-04-01"}
+
+    def fake_fetch(url):
+        chamadas.append(url)
+        if any(trecho in url for trecho in falhar):
+            raise ConnectorError("timeout")
+        if "receita" in url:
+            return {"data": [{"vlrPrevisaoAtualizado": 10, "vlrArrecadacao": 7}]}
+        inicio = url.split("dtInicio=")[1].split("&")[0]
+        return {"data": [{"numCertame": f"L-{inicio}", "vlrTotal": 100}]}
+
+    monkeypatch.setattr(cmd, "_fetch_json", fake_fetch)
+    checkpoint = tmp_path / "checkpoint.json"
+    opcoes = {
+        "ano_inicio": 2024,
+        "ano_fim": 2024,
+        "janela": "trimestre",
+        "recurso": ["receitas", "licitacoes"],
+        "checkpoint": str(checkpoint),
+    }
+
+    with pytest.raises(CommandError):
+        call_command("backfill_prefeitura", **opcoes)
+
+    assert len(chamadas) == 5
+    assert Licitacao.objects.filter(ano=2024, fonte="topsolutions").count() == 3
+    assert ReceitaResumo.objects.get(ano=2024).arrecadacao == 7
+    assert len(json.loads(checkpoint.read_text(encoding="utf-8"))) == 4
+    run = SyncRun.objects.get(fonte="backfill_prefeitura")
+    assert (run.status, run.erro_count, run.inseridos) == ("erro", 1, 4)
+
+    chamadas.clear()
+    falhar.clear()
+    call_command("backfill_prefeitura", **opcoes)
+
+    assert chamadas == [
+        "https://pmtibausulrn.apitransparencia.topsolutionsrn.com.br"
+        "/licitacao/licitacaopordataasync?dtInicio=2024-04-01&dtFim=2024-06-30"
+    ]
+    assert Licitacao.objects.filter(ano=2024, fonte="topsolutions").count() == 4
+    assert SyncRun.objects.filter(
+        fonte="backfill_prefeitura", status="sucesso"
+    ).exists()
+
+
+def test_backfill_does_not_checkpoint_open_windows(tmp_path):
+    from datetime import date
+
+    from apps.ingestao.backfill import (
+        BackfillCheckpoint,
+        executar_backfill,
+        gerar_janelas,
+    )
+    from apps.ingestao.provenance import ProvenanceRecorder
+
+    hoje = date(2024, 5, 15)
+    janelas = gerar_janelas(2024, 2024, "trimestre", ["receitas", "licitacoes"], hoje)
+    assert janelas == [
+        ("receitas", date(2024, 1, 1), hoje),
+        ("licitacoes", date(2024, 1, 1), date(2024, 3, 31)),
+        ("licitacoes", date(2024, 4, 1), hoje),
+    ]
+
+    checkpoint = BackfillCheckpoint(tmp_path / "checkpoint.json")
+    resultado = executar_backfill(
+        janelas,
+        lambda _janela: {"data": []},
+        checkpoint,
+        ProvenanceRecorder(),
+        hoje=hoje,
+    )
+    assert resultado["janelas"] == 3
+    assert list(checkpoint.concluidas) == ["licitacoes:2024-01-01:2024-03-31"]
+
+
+def test_backfill_and_legacy_snapshot_share_2025_rows(tmp_path, monkeypatch):
+    import importlib
+
+    from django.apps import apps
+
+    from apps.contratacoes.models import Contrato, Licitacao
+    from apps.ingestao.management.commands import backfill_prefeitura as cmd
+
+    licitacoes = {"data": [{"numCertame": "1/2025", "vlrTotal": 10}]}
+    contratos = {
+        "data": [
+            {"numContrato": "7/2025", "txtNomeRazaoContratada": "A", "vlrContrato": 5}
+        ]
+    }
+    for nome, payload in {
+        "receitas2025.json": {"data": []},
+        "despesasOrgao2025.json": {"data": []},
+        "licitacoes2025.json": licitacoes,
+        "contratos2025.json": contratos,
+        "servidores2025.json": [],
+    }.items():
+        (tmp_path / nome).write_text(json.dumps(payload), encoding="utf-8")
+    call_command("load_legacy_snapshot", data_dir=str(tmp_path))
+
+    monkeypatch.setattr(
+        cmd,
+        "_fetch_json",
+        lambda url: licitacoes if "licitacao" in url else contratos,
+    )
+    call_command(
+        "backfill_prefeitura",
+        ano_inicio=2025,
+        ano_fim=2025,
+        janela="trimestre",
+        recurso=["licitacoes", "contratos"],
+        checkpoint=str(tmp_path / "checkpoint.json"),
+    )
+
+    assert Licitacao.objects.count() == 1
+    assert Contrato.objects.count() == 1
+
+    # Linhas legadas gravadas antes da chave (ano, fonte) sao reconciliadas.
+    Licitacao.objects.create(certame="1/2025", valor=10)
+    Licitacao.objects.create(certame="2/2025", valor=20)
+    migracao = importlib.import_module(
+        "apps.contratacoes.migrations.0007_legado_topsolutions"
+    )
+    migracao.reconciliar(apps, None)
+
+    assert sorted(Licitacao.objects.values_list("certame", "ano", "fonte")) == [
+        ("1/2025", 2025, "topsolutions"),
+        ("2/2025", 2025, "topsolutions"),
+    ]
@@ -0,0 +1,425 @@
+import pytest
+from django.test import Client
+
+from apps.common.search import atualizar_vetores, filtro_busca
+from apps.contratacoes.models import Contrato, Licitacao
+from apps.financas.models import Emenda, OrcamentoItem
+from apps.pessoal.models import Servidor
+
+pytestmark = pytest.mark.django_db
+
+
+def test_licitacoes_summary_in_single_query(django_assert_max_num_queries):
+    Licitacao.objects.create(
+        certame="1/2025", modalidade="PREGAO", status="Homologada", valor=100
+    )
+    Licitacao.objects.create(
+        certame=" 1/2025 ", modalidade="PREGAO", status="Aberta", valor=50
+    )
+    Licitacao.objects.create(
+        certame="2/2025", modalidade="PREGAO", status="Aberta", valor=30
+    )
+    Licitacao.objects.create(
+        certame="3/2025", modalidade="CONVITE", status="Aberta", valor=999
+    )
+
+    client = Client()
+    # Resumo + linhas da pagina.
+    with django_assert_max_num_queries(2):
+        response = client.get("/licitacoes/?modalidade=pregao")
+    resumo = response.context["resumo"]
+    assert resumo["quantidade"] == 3
+    assert resumo["total_filtrado"] == 180
+    assert resumo["certames_unicos"] == 2
+    assert resumo["lotes_estimados"] == 1
+    assert resumo["ticket_medio"] == 60
+    assert resumo["status_counts"] == {"Homologada": 1, "Aberta": 3}
+    assert response.context["statuses"] == ["Aberta", "Homologada"]
+
+    # Paginacao numerada (padrao) reaproveita a contagem do resumo.
+    assert response.context["page_obj"].paginator.count == 3
+    with django_assert_max_num_queries(2):
+        response = client.get("/licitacoes/?modalidade=pregao&page=1")
+    assert response.context["page_obj"].paginator.count == 3
+
+    # Keyset so com ?cursor=.
+    with django_assert_max_num_queries(2):
+        response = client.get("/licitacoes/?modalidade=pregao&cursor=")
+    assert response.context["page_obj"].keyset
+
+
+def test_filtered_list_views_use_one_summary_query(django_assert_max_num_queries):
+    Contrato.objects.create(numero="1", empresa="ACME", valor=10)
+    Contrato.objects.create(numero="2", empresa="OUTRA", valor=30)
+    Emenda.objects.create(
+        ano=2025,
+        autoria="A",
+        tipo="Individual",
+        origem_recurso="Federal",
+        valor_previsto=100,
+        valor_empenhado=40,
+    )
+    Emenda.objects.create(ano=2025, autoria="B", tipo="Bancada", valor_previsto=10)
+    OrcamentoItem.objects.create(
+        ano=2025, unidade="SEC. A", funcao="Saude", valor_inicial=50
+    )
+    OrcamentoItem.objects.create(
+        ano=2025, unidade="SEC. B", funcao="Educacao", valor_inicial=20
+    )
+    Servidor.objects.create(nome="Ana", orgao="SEC. A", valor_bruto=1000)
+    Servidor.objects.create(nome="Bia", orgao="SEC. B", valor_bruto=3000)
+
+    client = Client()
+    with django_assert_max_num_queries(2):
+        contratos = client.get("/contratos/?empresa=acme").context["resumo"]
+    assert (contratos["quantidade"], contratos["ticket_medio"]) == (1, 10)
+
+    with django_assert_max_num_queries(2):
+        response = client.get("/emendas/?tipo=individual")
+    assert response.context["resumo"]["quantidade"] == 1
+    assert response.context["resumo"]["empenhado"] == 40
+    assert response.context["tipos"] == ["Bancada", "Individual"]
+    assert response.context["origens"] == ["Federal"]
+
+    with django_assert_max_num_queries(2):
+        response = client.get("/orcamento-detalhado/?funcao=saude")
+    assert response.context["resumo"]["inicial"] == 50
+    assert response.context["funcoes"] == ["Educacao", "Saude"]
+
+    with django_assert_max_num_queries(2):
+        resumo = client.get("/funcionarios/").context["resumo"]
+    assert (resumo["total_servidores"], resumo["media_bruto"]) == (2, 2000)
+
+
+def _coletar(client, url, sentido="next_query"):
+    paginas = []
+    while url:
+        page_obj = client.get(url).context["page_obj"]
+        paginas.append([item.certame for item in page_obj])
+        consulta = getattr(page_obj, sentido)
+        url = f"/licitacoes/?{consulta}" if consulta else None
+    return paginas
+
+
+def test_licitacoes_keyset_pagination_walks_both_directions(monkeypatch):
+    from apps.web import views
+
+    original = views.keyset_paginate
+    monkeypatch.setattr(
+        views,
+        "keyset_paginate",
+        lambda qs, ordering, params, _por_pagina: original(qs, ordering, params, 2),
+    )
+    for i, valor in enumerate([50, 40, 40, 40, 10]):
+        Licitacao.objects.create(certame=f"{i}/2025", modalidade="PREGAO", valor=valor)
+
+    client = Client()
+    paginas = _coletar(client, "/licitacoes/?modalidade=pregao&ordering=-valor&cursor=")
+    # Empates em valor seguem o id na mesma direcao da ordenacao.
+    assert paginas == [["0/2025", "3/2025"], ["2/2025", "1/2025"], ["4/2025"]]
+
+    ultima = client.get("/licitacoes/?modalidade=pregao&ordering=-valor&cursor=")
+    proxima = client.get(f"/licitacoes/?{ultima.context['page_obj'].next_query}")
+    final = client.get(f"/licitacoes/?{proxima.context['page_obj'].next_query}")
+    page_obj = final.context["page_obj"]
+    assert not page_obj.has_next
+    assert "modalidade=pregao" in page_obj.previous_query
+    voltando = _coletar(
+        client, f"/licitacoes/?{page_obj.previous_query}", "previous_query"
+    )
+    assert voltando == [["2/2025", "1/2025"], ["0/2025", "3/2025"]]
+
+    invalido = client.get("/licitacoes/?cursor=nao-e-um-cursor")
+    assert [item.certame for item in invalido.context["page_obj"]] == [
+        "0/2025",
+        "3/2025",
+    ]
+
+
+def test_vetores_de_busca_so_das_linhas_tocadas(monkeypatch):
+    from django.db.models import Value
+
+    from apps.common import search
+    from apps.ingestao import bulk
+
+    # SQLite guarda o tsvector como texto; basta para ver quais linhas mudam.
+    monkeypatch.setattr(search, "busca_textual_disponivel", lambda _model: True)
+    monkeypatch.setattr(search, "vetor", lambda _model: Value("v"))
+    linhas = [
+        {"certame": str(i), "fonte": "x", "objeto": f"objeto {i}"} for i in range(3)
+    ]
+    bulk.bulk_upsert(Licitacao, linhas, ["certame", "fonte"], ["objeto"])
+    assert atualizar_vetores(Licitacao) == 3
+    assert atualizar_vetores(Licitacao) == 0
+
+    alteradas = []
+    original = bulk.atualizar_vetores
+
+    def registrar(model, queryset):
+        alteradas.extend(queryset.values_list("certame", flat=True))
+        return original(model, queryset)
+
+    monkeypatch.setattr(bulk, "atualizar_vetores", registrar)
+    linhas[1]["objeto"] = "objeto alterado"
+    bulk.bulk_upsert(Licitacao, linhas, ["certame", "fonte"], ["objeto"])
+    assert alteradas == ["1"]
+    assert atualizar_vetores(Licitacao) == 0
+
+    # ``save`` de campo de busca limpa o vetor; os demais campos nao.
+    licitacao = Licitacao.objects.get(certame="2")
+    licitacao.valor = 10
+    licitacao.save(update_fields=["valor"])
+    assert atualizar_vetores(Licitacao) == 0
+    licitacao.objeto = "outro objeto"
+    licitacao.save(update_fields=["objeto"])
+    assert atualizar_vetores(Licitacao) == 1
+
+
+def test_busca_textual_sem_postgres_usa_icontains():
+    Contrato.objects.create(
+        numero="1/2025", empresa="ALFA LTDA", objeto="Merenda escolar", valor=10
+    )
+    Contrato.objects.create(
+        numero="2/2025", empresa="BETA SA", objeto="Obras de pavimentacao", valor=20
+    )
+
+    # SQLite: sem search_vector, a busca cai no icontains dos mesmos campos.
+    assert atualizar_vetores(Contrato) == 0
+    filtro = filtro_busca(Contrato, "merenda")
+    assert list(Contrato.objects.filter(filtro).values_list("numero", flat=True)) == [
+        "1/2025"
+    ]
+
+    client = Client()
+    pagina = client.get("/contratos/?search=pavimentacao")
+    assert [c.numero for c in pagina.context["page_obj"]] == ["2/2025"]
+    api = client.get("/api/contratacoes/contratos/?search=alfa").json()
+    assert [c["numero"] for c in api["results"]] == ["1/2025"]
+
+
+def test_busca_por_nome_ignora_acentos():
+    from apps.fornecedores.models import Fornecedor
+    from apps.fornecedores.selectors import buscar_por_nome
+
+    Servidor.objects.create(nome="JOSÉ DA CONCEIÇÃO", orgao="SAUDE")
+    Servidor.objects.create(nome="MARIA SOUZA", orgao="SAUDE")
+    Fornecedor.objects.create(nome="PADARIA SÃO JOÃO", cnpj="1")
+    Contrato.objects.create(numero="1/2025", empresa="CONSTRUÇÕES ÁGUIA", valor=1)
+
+    client = Client()
+    pagina = client.get("/funcionarios/?search=jose da conceicao")
+    assert [s.nome for s in pagina.context["page_obj"]] == ["JOSÉ DA CONCEIÇÃO"]
+    api = client.get("/api/pessoal/funcionarios/?search=Conceição").json()
+    assert [s["nome"] for s in api["results"]] == ["JOSÉ DA CONCEIÇÃO"]
+
+    pagina = client.get("/contratos/?empresa=construcoes aguia")
+    assert [c.numero for c in pagina.context["page_obj"]] == ["1/2025"]
+    pagina = client.get("/fornecedores/?search=sao joao")
+    assert [f.nome for f in pagina.context["page_obj"]] == ["PADARIA SÃO JOÃO"]
+    assert [f.nome for f in buscar_por_nome("São João")] == ["PADARIA SÃO JOÃO"]
+
+
+def test_seed_data_em_cache_ate_o_arquivo_mudar(tmp_path, monkeypatch):
+    import os
+
+    from apps.common import seed_data
+
+    monkeypatch.setattr(seed_data, "_BACKEND_DIR", tmp_path)
+    (tmp_path / "seed_data").mkdir()
+    arquivo = tmp_path / "seed_data" / "municipio-contexto.json"
+    arquivo.write_text('{"tce_rn": {"a": 1}}', encoding="utf-8")
+
+    primeiro = seed_data.load_municipio_contexto()
+    assert primeiro == {"tce_rn": {"a": 1}}
+    assert seed_data.load_municipio_contexto() is primeiro
+
+    arquivo.write_text('{"tce_rn": {"a": 22}}', encoding="utf-8")
+    os.utime(arquivo, ns=(1, 1))
+    assert seed_data.load_municipio_contexto() == {"tce_rn": {"a": 22}}
+
+    arquivo.write_text("{invalido", encoding="utf-8")
+    assert seed_data.load_municipio_contexto() == {}
+
+
+def test_remuneracoes_usa_indice_da_folha(tmp_path, monkeypatch):
+    from apps.common import seed_data
+
+    monkeypatch.setattr(seed_data, "_BACKEND_DIR", tmp_path)
+    (tmp_path / "seed_data").mkdir()
+    (tmp_path / "seed_data" / "funcionarios-folha-2026-01.csv").write_text(
+        "nome;orgao;vinculo;vlrRemuneracaoBruta;vlrRemuAposDescObrig\n"
+        "JOSÉ LIMA;SECRETARIA DE SAÚDE;EFETIVO;1.000,00;900,00\n"
+        "ANA PAZ;SECRETARIA DE EDUCAÇÃO;EFETIVO;2.000,00;1.800,00\n",
+        encoding="utf-8",
+    )
+
+    response = Client().get("/remuneracoes/?search=saude")
+    assert [s["nome"] for s in response.context["page_obj"]] == ["JOSÉ LIMA"]
+    resumo = response.context["resumo"]
+    assert resumo["servidores"] == 2
+    assert resumo["total_bruto"] == 3000
+    assert resumo["fonte_principal"] == "export-folha-2026-01"
+
+
+def test_hierarquia_usa_secretaria_vinculada_na_carga(django_assert_max_num_queries):
+    from apps.governanca.models import Secretaria
+    from apps.pessoal.services import vincular_secretarias
+
+    saude = Secretaria.objects.create(nome="SECRETARIA DE SAUDE")
+    Secretaria.objects.create(nome="SECRETARIA DE OBRAS")
+    Servidor.objects.create(nome="ANA", orgao="SECRETARIA DE SAÚDE", vinculo="X")
+    Servidor.objects.create(nome="BIA", orgao="FUNDEB", vinculo="X")
+
+    assert vincular_secretarias() == 1
+    assert vincular_secretarias() == 0
+    assert Servidor.objects.get(nome="ANA").secretaria == saude
+
+    with django_assert_max_num_queries(2):
+        response = Client().get("/hierarquia/")
+    rows = response.context["hierarquia_rows"]
+    assert [(r["secretaria"].nome, len(r["servidores"])) for r in rows] == [
+        ("SECRETARIA DE SAUDE", 1)
+    ]
+    assert [s.nome for s in response.context["servidores_sem_vinculo"]] == ["BIA"]
+
+    # Orgao que deixa de casar volta a ficar sem secretaria.
+    saude.nome = "SECRETARIA DE SAUDE E ASSISTENCIA SOCIAL DO MUNICIPIO"
+    saude.save()
+    Servidor.objects.filter(nome="ANA").update(orgao="GABINETE")
+    assert vincular_secretarias() == 1
+    assert Servidor.objects.get(nome="ANA").secretaria is None
+
+
+def test_tecnologia_filtra_pela_categoria_da_carga(django_assert_max_num_queries):
+    from apps.contratacoes.categorias import classificar, classificar_contratacoes
+    from apps.contratacoes.models import CategoriaLicitacao, TotalCategoria
+
+    assert classificar("Licença de SOFTWARE", "ALFA") == {"tecnologia"}
+    assert classificar("Reforma da escola", "") == {"obras", "educacao"}
+
+    Contrato.objects.create(numero="1", empresa="ALFA INFORMÁTICA", valor=100)
+    Contrato.objects.create(numero="2", empresa="BETA", objeto="Sistema web", valor=50)
+    Contrato.objects.create(numero="3", empresa="GAMA", objeto="Pavimentacao", valor=7)
+    Licitacao.objects.create(certame="1", objeto="Aquisição de medicamentos")
+
+    resultado = classificar_contratacoes()
+    assert resultado["contrato"]["inseridos"] == 3
+    assert CategoriaLicitacao.objects.get().categoria == "saude"
+    assert classificar_contratacoes()["contrato"]["inseridos"] == 0
+
+    with django_assert_max_num_queries(2):
+        response = Client().get("/tecnologia/")
+        assert [c.numero for c in response.context["contratos_tech"]] == ["1", "2"]
+    assert response.context["total_tech"] == 150
+    assert response.context["total_geral"] == 157
+
+    Contrato.objects.filter(numero="2").update(objeto="Consultoria")
+    classificar_contratacoes()
+    total = TotalCategoria.objects.get(modelo="contrato", categoria="tecnologia")
+    assert (total.quantidade, total.valor_total) == (1, 100)
+
+
+def test_paginas_em_cache_por_versao_dos_dados(
+    settings, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    Contrato.objects.create(numero="1/2025", empresa="ALFA", valor=10)
+
+    client = Client()
+    primeira = client.get("/contratos/?modalidade=&ordering=-valor&search=")
+    assert b"1/2025" in primeira.content
+    # Mesma query normalizada (ordem e parametros vazios nao importam).
+    with django_assert_num_queries(0):
+        repetida = client.get("/contratos/?search=&ordering=-valor")
+    assert repetida.content == primeira.content
+
+    # Dado novo so aparece depois que uma carga termina com sucesso.
+    Contrato.objects.create(numero="2/2025", empresa="BETA", valor=20)
+    assert b"2/2025" not in client.get("/contratos/?ordering=-valor").content
+    run = iniciar_execucao("teste")
+    with django_capture_on_commit_callbacks(execute=True):
+        finalizar_execucao(run, "sucesso")
+    assert b"2/2025" in client.get("/contratos/?ordering=-valor").content
+
+
+def test_resumo_em_cache_compartilhado_entre_paginas(
+    settings, django_assert_max_num_queries
+):
+    from django.core.cache import cache
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    for numero in range(30):
+        Contrato.objects.create(numero=str(numero), empresa="ALFA", valor=numero)
+
+    client = Client()
+    client.get("/contratos/?empresa=alfa")
+    # Segunda pagina: so a consulta das linhas, o resumo vem do cache.
+    with django_assert_max_num_queries(1):
+        segunda = client.get("/contratos/?empresa=alfa&page=2")
+    assert segunda.context["resumo"]["quantidade"] == 30
+    assert segunda.context["page_obj"].number == 2
+
+    primeira = client.get("/contratos/?empresa=alfa&cursor=")
+    proxima = primeira.context["page_obj"].next_query
+    with django_assert_max_num_queries(1):
+        segunda = client.get(f"/contratos/?{proxima}")
+    assert segunda.context["resumo"]["quantidade"] == 30
+
+    for numero in range(30):
+        Emenda.objects.create(ano=2025, autoria=str(numero), valor_previsto=numero)
+        OrcamentoItem.objects.create(ano=2025, funcao="Saude", valor_inicial=numero)
+    for url in ("/emendas/", "/orcamento-detalhado/?funcao=saude"):
+        client.get(url)
+        with django_assert_max_num_queries(1):
+            segunda = client.get(f"{url}{'&' if '?' in url else '?'}page=2")
+        assert segunda.context["resumo"]["quantidade"] == 30
+
+
+def test_pagina_em_cache_invalida_no_deploy(settings):
+    from django.core.cache import cache
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    client = Client()
+    assert client.get("/contratos/").context is not None
+    # Mesmo deploy: o HTML vem do cache, sem renderizar.
+    assert client.get("/contratos/").context is None
+
+    settings.WEB_CACHE_BUILD = "outro-deploy"
+    assert client.get("/contratos/").context is not None
+
+
+def test_paginas_respondem_304_pela_versao_dos_dados(
+    settings, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    from apps.ingestao.services import finalizar_execucao, iniciar_execucao
+
+    settings.WEB_CACHE_ENABLED = True
+    cache.clear()
+    client = Client()
+    # Sem nenhuma carga registrada nao ha versao para validar.
+    assert not client.get("/contratos/").has_header("ETag")
+
+    run = iniciar_execucao("teste")
+    with django_capture_on_commit_callbacks(execute=True):
+        finalizar_execucao(run, "sucesso")
+    etag = client.get("/contratos/?ordering=-valor")["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get(
+            "/contratos/?ordering=-valor&search=", HTTP_IF_NONE_MATCH=etag
+        )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Deploy novo: o ETag antigo deixa de valer.
+    settings.WEB_CACHE_BUILD = "outro-deploy"
+    response = client.get("/contratos/?ordering=-valor", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200